@@ -0,0 +1,340 @@
+import hashlib
+import json
+import math
+import os
+from itertools import combinations
+
+import numpy as np
+
+from base.urdf_kinematics import UrdfChain
+
+_STL_RECORD = np.dtype([
+    ("normal", "<f4", (3,)),
+    ("vertices", "<f4", (3, 3)),
+    ("attribute", "<u2"),
+])
+
+# Folded rest pose of a calibrated SO101 (lerobot degrees), where the arms start and park
+SO101_REST_POSITION = {
+    "shoulder_pan.pos": 0.0,
+    "shoulder_lift.pos": -100.0,
+    "elbow_flex.pos": 97.0,
+    "wrist_flex.pos": 70.0,
+    "wrist_roll.pos": 0.0,
+    "gripper.pos": 1.0,
+}
+
+
+def load_stl_vertices(path: str) -> np.ndarray:
+    """Unique vertices (N, 3) of a binary STL file."""
+    with open(path, "rb") as f:
+        f.seek(80)
+        count = int(np.frombuffer(f.read(4), dtype="<u4")[0])
+        records = np.frombuffer(f.read(count * _STL_RECORD.itemsize), dtype=_STL_RECORD, count=count)
+    return np.unique(records["vertices"].reshape(-1, 3).astype(np.float64), axis=0)
+
+
+def point_segment_distances(points: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    ab = b - a
+    length_sq = float(ab @ ab)
+    t = np.zeros(len(points)) if length_sq < 1e-12 else np.clip((points - a) @ ab / length_sq, 0.0, 1.0)
+    return np.linalg.norm(points - (a + t[:, None] * ab), axis=1)
+
+
+def fit_capsule(points: np.ndarray) -> tuple[np.ndarray, np.ndarray, float]:
+    """
+    Capsule (segment a-b, radius) enclosing every point.
+
+    The segment lies on the principal axis of the points with the smallest
+    radius that encloses them; each end is then pulled in as far as the
+    spherical caps still cover every point.
+    """
+    center = points.mean(axis=0)
+    _, _, vt = np.linalg.svd(points - center, full_matrices=False)
+    axis = vt[0]
+    t = (points - center) @ axis
+    radial = np.linalg.norm((points - center) - t[:, None] * axis, axis=1)
+    radius = float(radial.max())
+    reach = np.sqrt(np.maximum(radius * radius - radial * radial, 0.0))
+    # Lowest end that still covers the points beyond it, same for the highest end
+    t_min, t_max = float((t + reach).min()), float((t - reach).max())
+    if t_min > t_max:
+        t_min = t_max = 0.5 * (t_min + t_max)
+        radius = float(np.linalg.norm(points - (center + t_min * axis), axis=1).max())
+    return center + t_min * axis, center + t_max * axis, radius
+
+
+def fit_link_capsules(chain: UrdfChain) -> dict[str, tuple[np.ndarray, np.ndarray, float]]:
+    """One capsule per link, in the link frame, enclosing all of its visual meshes."""
+    points_by_link: dict[str, list[np.ndarray]] = {}
+    meshes: dict[str, np.ndarray] = {}
+    for visual in chain.visuals:
+        if visual.mesh not in meshes:
+            meshes[visual.mesh] = load_stl_vertices(visual.mesh)
+        vertices = meshes[visual.mesh] * visual.scale
+        points = vertices @ visual.origin[:3, :3].T + visual.origin[:3, 3]
+        points_by_link.setdefault(visual.link, []).append(points)
+    return {link: fit_capsule(np.concatenate(points)) for link, points in points_by_link.items()}
+
+
+def default_capsule_cache_path(urdf_path: str) -> str:
+    """Capsule cache of a URDF in the user cache directory ($XDG_CACHE_HOME or ~/.cache), keyed by its path."""
+    cache_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    key = hashlib.sha1(os.path.abspath(urdf_path).encode()).hexdigest()[:12]
+    name = os.path.splitext(os.path.basename(urdf_path))[0]
+    return os.path.join(cache_dir, "lerobot-duo", f"{name}_{key}_capsules.json")
+
+
+def load_link_capsules(urdf_path: str, cache_path: str | None = None) -> dict[str, tuple[np.ndarray, np.ndarray, float]]:
+    """
+    Link capsules of a URDF, fitted once and cached as JSON (by default in the user cache directory).
+
+    The cache is rebuilt when the URDF is newer than it.
+    """
+    cache_path = cache_path or default_capsule_cache_path(urdf_path)
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(urdf_path):
+        with open(cache_path, encoding="utf-8") as f:
+            cached = json.load(f)
+        return {link: (np.array(c["a"]), np.array(c["b"]), c["radius"]) for link, c in cached.items()}
+
+    capsules = fit_link_capsules(UrdfChain(urdf_path))
+    os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+    with open(cache_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {link: {"a": a.tolist(), "b": b.tolist(), "radius": r} for link, (a, b, r) in capsules.items()},
+            f,
+            indent=2,
+        )
+    return capsules
+
+
+def segment_distances(p1: np.ndarray, q1: np.ndarray, p2: np.ndarray, q2: np.ndarray) -> np.ndarray:
+    """
+    Closest distances between (N, 3) segments p1-q1 and p2-q2, pairwise and vectorized.
+
+    Closest-point computation from Ericson, Real-Time Collision Detection, 5.1.9,
+    with every branch evaluated as a mask.
+    """
+    d1 = q1 - p1
+    d2 = q2 - p2
+    r = p1 - p2
+    a = np.einsum("ij,ij->i", d1, d1)
+    e = np.einsum("ij,ij->i", d2, d2)
+    f = np.einsum("ij,ij->i", d2, r)
+    c = np.einsum("ij,ij->i", d1, r)
+    b = np.einsum("ij,ij->i", d1, d2)
+    eps = 1e-12
+
+    denom = a * e - b * b
+    s = np.where(denom > eps, np.clip((b * f - c * e) / np.where(denom > eps, denom, 1.0), 0.0, 1.0), 0.0)
+    t = np.where(e > eps, (b * s + f) / np.where(e > eps, e, 1.0), 0.0)
+
+    # Re-clamp t, then recompute s for the clamped t
+    safe_a = np.where(a > eps, a, 1.0)
+    below = t < 0.0
+    above = t > 1.0
+    s = np.where(below, np.clip(-c / safe_a, 0.0, 1.0), s)
+    s = np.where(above, np.clip((b - c) / safe_a, 0.0, 1.0), s)
+    t = np.clip(t, 0.0, 1.0)
+    # Degenerate segments: a point against a segment
+    s = np.where(e > eps, s, np.clip(-c / safe_a, 0.0, 1.0))
+    s = np.where(a > eps, s, 0.0)
+
+    closest1 = p1 + d1 * s[:, None]
+    closest2 = p2 + d2 * t[:, None]
+    return np.linalg.norm(closest1 - closest2, axis=1)
+
+
+def side_by_side_base_poses(spacing: float) -> dict[str, np.ndarray]:
+    """Base poses of two arms facing +x, the left one at +y, spacing apart."""
+    left, right = np.eye(4), np.eye(4)
+    left[1, 3] = 0.5 * spacing
+    right[1, 3] = -0.5 * spacing
+    return {"left_arm": left, "right_arm": right}
+
+
+class DualArmCollisionChecker:
+    """
+    Self- and inter-arm collision checks of two SO101 arms with capsule link geometry.
+
+    Link capsules are fitted once from the URDF meshes (`load_link_capsules`)
+    and posed with the vectorized `UrdfChain` FK of both arms; all capsule
+    pairs of all checked configurations are then tested in one batched
+    segment-distance query.
+
+    Capsules around the motor housings are conservative, so self-collision
+    pairs that touch by construction are excluded: links at most two joints
+    apart in the kinematic tree, and pairs already overlapping in the zero
+    configuration or in one of the rest configurations (the folded SO101
+    rest pose nests the forearm and wrist against the base and shoulder).
+
+    `check` can be given the configurations the arms are moving from (the
+    streamers' current commands). It then samples the joint-space path to the
+    targets, which the streamers interpolate along, and only rejects a motion
+    that brings a pair within the margin closer than it was at the start: arms
+    already within the margin may always move apart.
+
+    Joint positions are the robot's action/observation dicts (`"<motor>.pos"`,
+    degrees, gripper 0 = closed .. 100 = open).
+
+    Attributes:
+        base_poses: 4x4 pose of each arm's base in the common frame.
+        margin: Extra clearance (m) required between capsules.
+        max_step_deg: Joint step between the sampled configurations of a path.
+        max_path_samples: Most configurations sampled along a path.
+        tolerance: Clearance loss (m) of a pair within the margin still allowed, for IK jitter.
+        last_min_distance: Smallest clearance found by the last check (m).
+        last_pair: Closest pair of the last check (the colliding one if it failed),
+            as ((arm, link), (arm, link)).
+    """
+
+    ARMS = ("left_arm", "right_arm")
+
+    def __init__(
+        self,
+        urdf_path: str,
+        base_poses: dict[str, np.ndarray],
+        joint_names: list[str] | None = None,
+        margin: float = 0.01,
+        self_collision: bool = True,
+        cache_path: str | None = None,
+        rest_positions: list[dict] | None = None,
+        max_step_deg: float = 5.0,
+        max_path_samples: int = 16,
+        tolerance: float = 0.001,
+    ):
+        self.chain = UrdfChain(urdf_path)
+        self.joint_names = joint_names or self.chain.joint_names
+        self.keys = [f"{joint}.pos" for joint in self.joint_names]
+        self.base_poses = {arm: np.asarray(base_poses[arm], dtype=float) for arm in self.ARMS}
+        self._bases = np.stack([self.base_poses[arm] for arm in self.ARMS])
+        self.margin = margin
+        self.max_step_deg = max_step_deg
+        self.max_path_samples = max_path_samples
+        self.tolerance = tolerance
+        self.last_min_distance = float("inf")
+        self.last_pair = None
+
+        capsules = load_link_capsules(urdf_path, cache_path)
+        self.links = [link for link in self.chain.links if link in capsules]
+        self._a = np.array([capsules[link][0] for link in self.links])
+        self._b = np.array([capsules[link][1] for link in self.links])
+        self._radius = np.array([capsules[link][2] for link in self.links])
+
+        lower, upper = self.chain.limits(self.joint_names)
+        self._scale = np.full(len(self.joint_names), np.pi / 180.0)
+        self._offset = np.zeros(len(self.joint_names))
+        if "gripper" in self.joint_names:
+            # lerobot drives the gripper as a 0..100 linear range over the joint limits
+            g = self.joint_names.index("gripper")
+            self._scale[g] = (upper[g] - lower[g]) / 100.0
+            self._offset[g] = lower[g]
+
+        if rest_positions is None:
+            rest_positions = [SO101_REST_POSITION] if set(self.keys) <= set(SO101_REST_POSITION) else []
+        n = len(self.links)
+        pairs = [(("left_arm", i), ("right_arm", j)) for i in range(n) for j in range(n)]
+        if self_collision:
+            excluded = self._excluded_self_pairs(rest_positions)
+            pairs += [((arm, i), (arm, j)) for arm in self.ARMS for i, j in combinations(range(n), 2)
+                      if (i, j) not in excluded]
+        self.pairs = pairs
+        slot = {arm: k * n for k, arm in enumerate(self.ARMS)}
+        self._first = np.array([slot[arm] + i for (arm, i), _ in pairs])
+        self._second = np.array([slot[arm] + j for _, (arm, j) in pairs])
+        self._clearance = self._radius[self._first % n] + self._radius[self._second % n] + margin
+
+    def _excluded_self_pairs(self, rest_positions: list[dict]) -> set[tuple[int, int]]:
+        index = {link: i for i, link in enumerate(self.links)}
+        neighbours = {link: set() for link in self.chain.links}
+        for joint in self.chain.joints.values():
+            neighbours[joint.parent].add(joint.child)
+            neighbours[joint.child].add(joint.parent)
+
+        excluded = set()
+        for link, i in index.items():
+            # Links at most two joints apart (e.g. the forearm and the gripper across the
+            # short wrist link) are kept apart by the joint limits, not by the check
+            near = set(neighbours[link])
+            for neighbour in neighbours[link]:
+                near |= neighbours[neighbour]
+            excluded |= {tuple(sorted((i, index[other]))) for other in near if other in index and other != link}
+
+        # Pairs within the margin in the zero or a rest configuration, all configurations in one FK
+        q = np.stack([np.zeros(len(self.joint_names))] + [self._joints(rest) for rest in rest_positions])
+        a, b = self._posed_segments(q, np.repeat(np.eye(4)[None], len(q), axis=0))
+        n = len(self.links)
+        first, second = np.array(list(combinations(range(n), 2))).T
+        offsets = (np.arange(len(q)) * n)[:, None]
+        i, j = (offsets + first).ravel(), (offsets + second).ravel()
+        distance = segment_distances(a[i], b[i], a[j], b[j]).reshape(len(q), -1)
+        overlapping = (distance < self._radius[first] + self._radius[second] + self.margin).any(axis=0)
+        excluded |= {(int(i), int(j)) for i, j in zip(first[overlapping], second[overlapping])}
+        return excluded
+
+    def _posed_segments(self, q: np.ndarray, bases: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Capsule segments of K configurations (K, J) with base poses (K, 4, 4), as (K * L, 3) arrays."""
+        poses = self.chain.forward_kinematics(q, self.joint_names, links=self.links)
+        # (K, L, 4, 4) link poses in the common frame
+        transforms = bases[:, None] @ np.stack([poses[link] for link in self.links], axis=1)
+        rotations, translations = transforms[..., :3, :3], transforms[..., :3, 3]
+        a = np.einsum("klij,lj->kli", rotations, self._a) + translations
+        b = np.einsum("klij,lj->kli", rotations, self._b) + translations
+        return a.reshape(-1, 3), b.reshape(-1, 3)
+
+    def _joints(self, action: dict) -> np.ndarray:
+        return np.array([float(action[key]) for key in self.keys]) * self._scale + self._offset
+
+    def _clearances(self, q: np.ndarray) -> np.ndarray:
+        """Signed clearance (S, pairs) of S configurations of both arms (S, 2, J)."""
+        samples = len(q)
+        # Both arms of every sample in a single batched FK
+        a, b = self._posed_segments(q.reshape(-1, q.shape[-1]), np.tile(self._bases, (samples, 1, 1)))
+        a = a.reshape(samples, -1, 3)
+        b = b.reshape(samples, -1, 3)
+        distance = segment_distances(
+            a[:, self._first].reshape(-1, 3),
+            b[:, self._first].reshape(-1, 3),
+            a[:, self._second].reshape(-1, 3),
+            b[:, self._second].reshape(-1, 3),
+        )
+        return distance.reshape(samples, -1) - self._clearance
+
+    def distances(self, left_action: dict, right_action: dict) -> np.ndarray:
+        """Signed clearance of every checked pair (negative = penetrating the margin)."""
+        return self._clearances(np.stack([self._joints(left_action), self._joints(right_action)])[None])[0]
+
+    def check(
+        self,
+        left_action: dict,
+        right_action: dict,
+        left_start: dict | None = None,
+        right_start: dict | None = None,
+    ) -> bool:
+        """
+        True if moving to the two joint configurations collides (within the margin).
+
+        Without start configurations only the targets are checked.
+        """
+        target = np.stack([self._joints(left_action), self._joints(right_action)])
+        if left_start is None or right_start is None:
+            clearance = self._clearances(target[None])
+            colliding = clearance < 0.0
+        else:
+            start = np.stack([self._joints(left_start), self._joints(right_start)])
+            step = math.radians(self.max_step_deg)
+            samples = min(max(math.ceil(float(np.abs(target - start).max()) / step), 1), self.max_path_samples)
+            fractions = np.arange(samples + 1) / samples
+            clearance = self._clearances(start + fractions[:, None, None] * (target - start))
+            # Within the margin is only a collision where the pair is closer than at the start
+            colliding = (clearance < 0.0) & (clearance < clearance[0] - self.tolerance)
+            clearance, colliding = clearance[1:], colliding[1:]
+
+        collides = bool(colliding.any())
+        # Report the deepest colliding pair, or the closest one of a free motion
+        ranked = np.where(colliding, clearance, np.inf) if collides else clearance
+        _, closest = np.unravel_index(int(np.argmin(ranked)), ranked.shape)
+        self.last_min_distance = float(clearance.min() + self.margin)
+        (arm1, i), (arm2, j) = self.pairs[closest]
+        self.last_pair = ((arm1, self.links[i]), (arm2, self.links[j]))
+        return collides
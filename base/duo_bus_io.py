@@ -0,0 +1,54 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class DuoBusIO:
+    """
+    Bulk I/O for the two Feetech buses of a `BiSO100Follower`.
+
+    Every read issues exactly one `sync_read("Present_Position")` per bus. The
+    two buses are separate serial ports, so both transactions run concurrently
+    on a small thread pool. Reads are not cached here: the teleop reads
+    through a `TickObservationCache`, which shares one read per tick.
+
+    Writes do not go through this class: each arm's `JointTrajectoryStreamer`
+    sends one `sync_write` per command tick on its own thread, so the two
+    buses are already written concurrently, at the command rate rather than
+    the planning rate. Each bus has a lock that the streamers hold around
+    their writes.
+
+    Attributes:
+        arms: Mapping from arm name (`"left_arm"`, `"right_arm"`) to its follower.
+        locks: Per-arm bus locks.
+    """
+
+    def __init__(self, robot):
+        self.arms = {"left_arm": robot.left_arm, "right_arm": robot.right_arm}
+        self.locks = {name: threading.Lock() for name in self.arms}
+        self._executor = ThreadPoolExecutor(max_workers=len(self.arms), thread_name_prefix="bus_io")
+        self.reads = 0
+
+    def _read_arm(self, name: str) -> dict[str, float]:
+        with self.locks[name]:
+            positions = self.arms[name].bus.sync_read("Present_Position")
+        return {f"{motor}.pos": value for motor, value in positions.items()}
+
+    def read(self) -> dict[str, dict[str, float]]:
+        """
+        Read joint positions of both arms, overlapping the two bus transactions.
+
+        Returns:
+            `{"left_arm": {"<motor>.pos": value}, "right_arm": {...}}`
+        """
+        futures = {name: self._executor.submit(self._read_arm, name) for name in self.arms}
+        observation = {name: future.result() for name, future in futures.items()}
+        self.reads += 1
+        return observation
+
+    def read_arm(self, name: str) -> dict[str, float]:
+        """Read a single arm."""
+        self.reads += 1
+        return self._read_arm(name)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
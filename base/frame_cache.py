@@ -0,0 +1,179 @@
+import threading
+import time
+from collections.abc import Callable, Iterable
+
+import numpy as np
+
+# cv2 is imported where the products are computed, so importing this module stays cheap at startup
+
+
+class CapturedFrame:
+    """
+    One captured camera frame and the products derived from it.
+
+    Every product - RGB, YUV420 for the video encoder, thumbnails - is
+    computed on first use and then shared by all consumers of this frame
+    (WebRTC tracks, rerun logging, recorders). The frame and its products are
+    immutable once published: consumers must not modify the arrays they get.
+
+    Attributes:
+        camera_name: Camera the frame comes from.
+        index: Capture counter of the camera.
+        timestamp: Capture time (`time.perf_counter`).
+        color_order: "rgb" or "bgr", the channel order of the raw frame.
+        computed: Names of the products computed so far.
+    """
+
+    def __init__(
+        self,
+        frame: np.ndarray,
+        color_order: str = "bgr",
+        camera_name: str = "",
+        index: int = 0,
+        timestamp: float | None = None,
+    ):
+        if color_order not in ("rgb", "bgr"):
+            raise ValueError(f"Unknown color order {color_order!r}, expected 'rgb' or 'bgr'")
+        self.frame = frame
+        self.color_order = color_order
+        self.camera_name = camera_name
+        self.index = index
+        self.timestamp = time.perf_counter() if timestamp is None else timestamp
+        self.computed: list[str] = []
+        self._products: dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+        self._owner: "FrameProductCache | None" = None
+
+    @property
+    def height(self) -> int:
+        return self.frame.shape[0]
+
+    @property
+    def width(self) -> int:
+        return self.frame.shape[1]
+
+    def product(self, name: str, compute: Callable[[], np.ndarray]) -> np.ndarray:
+        """The product called name, computing it with compute the first time it is asked for."""
+        value = self._products.get(name)
+        if value is not None:
+            if self._owner is not None:
+                self._owner.hits += 1
+            return value
+        with self._lock:
+            # Another consumer may have computed it while we waited for the lock
+            value = self._products.get(name)
+            if value is None:
+                value = compute()
+                self._products[name] = value
+                self.computed.append(name)
+                if self._owner is not None:
+                    self._owner.computations += 1
+            elif self._owner is not None:
+                self._owner.hits += 1
+        return value
+
+    def seed(self, name: str, value: np.ndarray):
+        """Provide a product that came for free with the frame, e.g. the I420 planes of a decoded video."""
+        with self._lock:
+            if name not in self._products:
+                self._products[name] = value
+                self.computed.append(name)
+
+    @property
+    def rgb(self) -> np.ndarray:
+        if self.color_order == "rgb":
+            return self.frame
+        return self.product("rgb", lambda: _cvt_color(self.frame, "COLOR_BGR2RGB"))
+
+    @property
+    def bgr(self) -> np.ndarray:
+        if self.color_order == "bgr":
+            return self.frame
+        return self.product("bgr", lambda: _cvt_color(self.frame, "COLOR_RGB2BGR"))
+
+    @property
+    def has_yuv420(self) -> bool:
+        """I420 needs even dimensions (the chroma planes are subsampled by 2)."""
+        return self.height % 2 == 0 and self.width % 2 == 0
+
+    @property
+    def yuv420(self) -> np.ndarray:
+        """
+        Planar I420 frame of shape (height * 3 / 2, width), the layout of
+        `av.VideoFrame.from_ndarray(..., format="yuv420p")`.
+        """
+        if not self.has_yuv420:
+            raise ValueError(f"YUV420 needs even frame dimensions, got {self.width}x{self.height}")
+        code = "COLOR_RGB2YUV_I420" if self.color_order == "rgb" else "COLOR_BGR2YUV_I420"
+        return self.product("yuv420", lambda: _cvt_color(self.frame, code))
+
+    def thumbnail(self, width: int) -> np.ndarray:
+        """RGB copy downscaled to width, keeping the aspect ratio."""
+        if width >= self.width:
+            return self.rgb
+        height = max(1, round(self.height * width / self.width))
+
+        def compute():
+            import cv2
+
+            # Resizing the raw frame first makes the color conversion run on the small image
+            small = cv2.resize(self.frame, (width, height), interpolation=cv2.INTER_AREA)
+            return cv2.cvtColor(small, cv2.COLOR_BGR2RGB) if self.color_order == "bgr" else small
+
+        return self.product(f"thumbnail_{width}", compute)
+
+
+def _cvt_color(frame: np.ndarray, code: str) -> np.ndarray:
+    import cv2
+
+    return cv2.cvtColor(frame, getattr(cv2, code))
+
+
+class FrameProductCache:
+    """
+    Latest `CapturedFrame` of every camera.
+
+    Publishing a new frame for a camera replaces the previous one, so the
+    products of the previous frame are dropped with it and never outlive
+    their source frame.
+
+    Attributes:
+        frames_published: Frames published over all cameras.
+        computations: Products computed, at most one per product per frame.
+        hits: Product lookups served without computing.
+    """
+
+    def __init__(self, camera_names: Iterable[str] = (), color_order: str = "bgr"):
+        self.color_order = color_order
+        self._latest: dict[str, CapturedFrame] = {}
+        self._counters: dict[str, int] = {name: 0 for name in camera_names}
+        self._lock = threading.Lock()
+        self.frames_published = 0
+        self.computations = 0
+        self.hits = 0
+
+    def publish(self, camera_name: str, frame: np.ndarray, timestamp: float | None = None) -> CapturedFrame:
+        """Make frame the current frame of camera_name, evicting the previous one."""
+        with self._lock:
+            index = self._counters.get(camera_name, 0)
+            self._counters[camera_name] = index + 1
+            captured = CapturedFrame(frame, self.color_order, camera_name, index, timestamp)
+            captured._owner = self
+            self._latest[camera_name] = captured
+            self.frames_published += 1
+        return captured
+
+    def latest(self, camera_name: str) -> CapturedFrame | None:
+        return self._latest.get(camera_name)
+
+    def latest_frames(self) -> dict[str, CapturedFrame]:
+        return dict(self._latest)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.computations
+        return {
+            "frames": self.frames_published,
+            "computations": self.computations,
+            "computations_per_frame": self.computations / self.frames_published if self.frames_published else 0.0,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,163 @@
+import math
+
+import numpy as np
+
+
+class GripperController:
+    """
+    Time-aware gripper command generator for several grippers at once.
+
+    Each gripper is driven either by a velocity command (the joystick, -1..1
+    scaled to max_speed) or by an absolute position command (the analog
+    trigger, 0 = open .. 1 = closed). The commanded position is integrated
+    with the measured tick dt, so the gripper moves at the same speed however
+    fast the control loop runs, and its velocity is shaped by acceleration and
+    jerk limits so it starts and stops smoothly instead of stepping.
+
+    The output leads the internal position by velocity * lookahead_s to make
+    up for the servo lag, and is kept within max_lead of the measured
+    position so the command does not wind up while the jaws are blocked by an
+    object. All state is one array per quantity, updated in place.
+
+    Positions use the robot units (0 = closed .. 100 = open).
+
+    Attributes:
+        max_speed: Velocity at full joystick deflection (units/s).
+        max_accel: Acceleration limit (units/s^2).
+        max_jerk: Jerk limit (units/s^3).
+        position_gain: Proportional gain (1/s) of the absolute mode.
+        lookahead_s: Prediction horizon of the output command.
+        max_lead: Largest distance between the command and the measured position
+            (longer ticks allow max_speed * dt).
+        max_step_s: Longest integration step; longer ticks are split into sub-steps.
+        max_dt: Longer ticks (a suspended process) are integrated as max_dt.
+        position: Current integrated position per gripper.
+        velocity: Current velocity per gripper.
+        acceleration: Current acceleration per gripper.
+    """
+
+    def __init__(
+        self,
+        count: int = 2,
+        max_speed: float = 150.0,
+        max_accel: float = 1500.0,
+        max_jerk: float = 30000.0,
+        position_gain: float = 10.0,
+        lookahead_s: float = 0.03,
+        max_lead: float = 25.0,
+        max_step_s: float = 0.05,
+        max_dt: float = 1.0,
+        clip_min: float = 0.0,
+        clip_max: float = 100.0,
+    ):
+        self.count = count
+        self.max_speed = max_speed
+        self.max_accel = max_accel
+        self.max_jerk = max_jerk
+        self.position_gain = position_gain
+        self.lookahead_s = lookahead_s
+        self.max_lead = max_lead
+        self.max_step_s = max_step_s
+        self.max_dt = max_dt
+        self.clip_min = clip_min
+        self.clip_max = clip_max
+        self.position = np.zeros(count)
+        self.velocity = np.zeros(count)
+        self.acceleration = np.zeros(count)
+        self.command = np.zeros(count)
+        self._target_velocity = np.zeros(count)
+        self._initialized = np.zeros(count, dtype=bool)
+
+    def reset(self, index: int | None = None):
+        """Forget the state (of one gripper); the next step starts from the measured position."""
+        selection = slice(None) if index is None else index
+        self.velocity[selection] = 0.0
+        self.acceleration[selection] = 0.0
+        self._initialized[selection] = False
+
+    def step(
+        self,
+        dt: float,
+        velocity_command: np.ndarray,
+        position_command: np.ndarray,
+        measured: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Advance every gripper by dt seconds and return the position commands.
+
+        Args:
+            dt: Measured time since the previous step (s).
+            velocity_command: Joystick value per gripper (-1..1), used where
+                position_command is NaN.
+            position_command: Trigger value per gripper (0 = open .. 1 = closed),
+                NaN for grippers in velocity mode.
+            measured: Measured gripper position per gripper.
+        """
+        measured = np.asarray(measured, dtype=float)
+        fresh = ~self._initialized
+        if fresh.any():
+            self.position[fresh] = measured[fresh]
+            self._initialized[:] = True
+        dt = min(max(dt, 0.0), self.max_dt)
+        if dt == 0.0:
+            return self.command
+
+        # Desired velocity: the joystick directly, or a P controller towards the trigger position
+        position_command = np.asarray(position_command, dtype=float)
+        absolute = ~np.isnan(position_command)
+        target = self.clip_max - np.nan_to_num(position_command) * (self.clip_max - self.clip_min)
+        velocity_command = np.clip(np.asarray(velocity_command, dtype=float), -1.0, 1.0) * self.max_speed
+        # Hard limits (joint range and anti-windup) stop the motion. The measurement is as old
+        # as the tick, so a long tick may lead it by as much as the gripper travels meanwhile
+        lead = max(self.max_lead, self.max_speed * dt)
+        low = np.maximum(self.clip_min, measured - lead)
+        high = np.minimum(self.clip_max, measured + lead)
+
+        # Long ticks are integrated in sub-steps, so a slow or overrunning loop covers the
+        # same distance as a fast one
+        steps = max(1, math.ceil(dt / self.max_step_s - 1e-9))
+        for _ in range(steps):
+            self._advance(dt / steps, velocity_command, absolute, target, low, high)
+
+        np.clip(self.position + self.velocity * self.lookahead_s, low, high, out=self.command)
+        return self.command
+
+    def _advance(
+        self,
+        dt: float,
+        velocity_command: np.ndarray,
+        absolute: np.ndarray,
+        target: np.ndarray,
+        low: np.ndarray,
+        high: np.ndarray,
+    ):
+        """Integrate one sub-step of at most max_step_s."""
+        np.copyto(self._target_velocity, velocity_command)
+        np.copyto(
+            self._target_velocity,
+            np.clip(self.position_gain * (target - self.position), -self.max_speed, self.max_speed),
+            where=absolute,
+        )
+
+        # Acceleration that reaches the target velocity with zero acceleration under the jerk
+        # limit (a = sqrt(2 j dv)), approached at no more than max_jerk
+        velocity_error = self._target_velocity - self.velocity
+        desired_accel = np.sign(velocity_error) * np.minimum(
+            self.max_accel, np.sqrt(2.0 * self.max_jerk * np.abs(velocity_error))
+        )
+        max_change = self.max_jerk * dt
+        self.acceleration += np.clip(desired_accel - self.acceleration, -max_change, max_change)
+
+        new_velocity = self.velocity + self.acceleration * dt
+        # Long ticks could step past the target velocity, land on it instead
+        overshoot = (new_velocity - self._target_velocity) * velocity_error > 0.0
+        new_velocity[overshoot] = self._target_velocity[overshoot]
+        self.acceleration[overshoot] = 0.0
+
+        self.position += 0.5 * (self.velocity + new_velocity) * dt
+        self.velocity[:] = new_velocity
+
+        limited = (self.position < low) | (self.position > high)
+        np.clip(self.position, low, high, out=self.position)
+        self.velocity[limited] = 0.0
+        self.acceleration[limited] = 0.0
@@ -0,0 +1,70 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+SO101_URDF_PATH = "Simulation/SO101/so101_new_calib.urdf"
+
+_solvers: dict[tuple, object] = {}
+_solver_locks: dict[tuple, threading.Lock] = {}
+_cache_lock = threading.Lock()
+
+
+def _build_solver(urdf_path: str, target_frame_name: str, motor_names: list[str], regularization: float):
+    # Imported here: placo and the URDF parsing are the slowest part of startup
+    from lerobot.model.kinematics import RobotKinematics
+
+    kin = RobotKinematics(
+        urdf_path=urdf_path,
+        target_frame_name=target_frame_name,
+        joint_names=motor_names,
+    )
+    # Regularization prevents singularity-induced oscillation at full extension.
+    # The L2 penalty on ||dq||² keeps the QP well-conditioned so the solver
+    # returns a stable, unique solution near workspace boundaries.
+    kin.solver.add_regularization_task(regularization)
+    return kin
+
+
+# NOTE: It is highly recommended to use the urdf in the SO-ARM100 repo: https://github.com/TheRobotStudio/SO-ARM100/blob/main/Simulation/SO101/so101_new_calib.urdf
+def get_kinematics_solver(
+    motor_names: list[str],
+    key: str = "default",
+    urdf_path: str = SO101_URDF_PATH,
+    target_frame_name: str = "gripper_frame_link",
+    regularization: float = 2e-3,
+):
+    """
+    Return a cached `RobotKinematics` solver, building it on first use.
+
+    Solvers carry internal state, so each arm must use its own `key`; rebuilding
+    a pipeline for the same arm (e.g. on reset) reuses the solver instead of
+    parsing the URDF again. Different keys can be built concurrently.
+    """
+    cache_key = (key, urdf_path, target_frame_name, tuple(motor_names), regularization)
+    solver = _solvers.get(cache_key)
+    if solver is not None:
+        return solver
+
+    with _cache_lock:
+        lock = _solver_locks.setdefault(cache_key, threading.Lock())
+    with lock:
+        solver = _solvers.get(cache_key)
+        if solver is None:
+            solver = _build_solver(urdf_path, target_frame_name, list(motor_names), regularization)
+            _solvers[cache_key] = solver
+    return solver
+
+
+def prewarm_kinematics_solvers(motor_names_by_key: dict[str, list[str]], **kwargs):
+    """Build the solvers of several arms concurrently."""
+    with ThreadPoolExecutor(max_workers=len(motor_names_by_key), thread_name_prefix="kinematics") as pool:
+        futures = [
+            pool.submit(get_kinematics_solver, motor_names, key, **kwargs)
+            for key, motor_names in motor_names_by_key.items()
+        ]
+        return [future.result() for future in futures]
+
+
+def clear_kinematics_cache():
+    with _cache_lock:
+        _solvers.clear()
+        _solver_locks.clear()
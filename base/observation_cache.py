@@ -0,0 +1,87 @@
+from collections.abc import Callable
+
+
+class TickObservationCache:
+    """
+    Observation cache scoped to a single control tick.
+
+    The cache is filled once per tick per arm (both arms in one bulk read when
+    `read_all` is given) and every consumer of that tick - the kinematic
+    processor steps, rerun logging, the reset logic - reads from it. An entry
+    only goes back to the hardware after an explicit `invalidate` or on the
+    next `begin_tick`.
+
+    Attributes:
+        tick: Index of the current tick.
+        hits: Lookups served from the cache.
+        misses: Lookups that had to read the bus.
+        bus_reads: Bus reads issued, one per arm per fill.
+    """
+
+    def __init__(
+        self,
+        read_one: Callable[[str], dict],
+        read_all: Callable[[], dict[str, dict]] | None = None,
+    ):
+        self._read_one = read_one
+        self._read_all = read_all
+        self._entries: dict[str, dict] = {}
+        self.tick = 0
+        self.hits = 0
+        self.misses = 0
+        self.bus_reads = 0
+
+    def begin_tick(self, prefetch: bool = True):
+        """Start a new tick, dropping the previous entries and optionally bulk-reading every arm."""
+        self.tick += 1
+        self._entries.clear()
+        if prefetch and self._read_all is not None:
+            self._entries.update(self._read_all())
+            self.bus_reads += len(self._entries)
+
+    def get(self, arm: str) -> dict:
+        observation = self._entries.get(arm)
+        if observation is not None:
+            self.hits += 1
+            return observation
+        self.misses += 1
+        self.bus_reads += 1
+        observation = self._read_one(arm)
+        self._entries[arm] = observation
+        return observation
+
+    def invalidate(self, arm: str | None = None):
+        """Force the next lookup of arm (or of every arm) to read the bus again."""
+        if arm is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(arm, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "ticks": self.tick,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "bus_reads_per_tick": self.bus_reads / self.tick if self.tick else 0.0,
+        }
+
+
+def make_cached_transition_converter(cache: TickObservationCache, arm: str):
+    """
+    Build a `to_transition` converter that takes the observation from the tick cache.
+
+    The returned converter accepts the usual `(action, observation)` tuple, but the
+    observation may be None, in which case the cached one for arm is used, so every
+    processor step reads the joints of this tick's bus read from the transition.
+    """
+    from lerobot.processor.converters import robot_action_observation_to_transition
+
+    def to_transition(action_observation):
+        action, observation = action_observation
+        if observation is None:
+            observation = cache.get(arm)
+        return robot_action_observation_to_transition((action, observation))
+
+    return to_transition
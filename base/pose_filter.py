@@ -0,0 +1,297 @@
+import math
+
+import numpy as np
+
+
+def quat_multiply(a: np.ndarray, b: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    """Hamilton product of two [x, y, z, w] quaternions."""
+    ax, ay, az, aw = a
+    bx, by, bz, bw = b
+    if out is None:
+        out = np.empty(4)
+    out[0] = aw * bx + ax * bw + ay * bz - az * by
+    out[1] = aw * by - ax * bz + ay * bw + az * bx
+    out[2] = aw * bz + ax * by - ay * bx + az * bw
+    out[3] = aw * bw - ax * bx - ay * by - az * bz
+    return out
+
+
+def quat_conjugate(q: np.ndarray) -> np.ndarray:
+    return np.array([-q[0], -q[1], -q[2], q[3]])
+
+
+def quat_to_rotvec(q: np.ndarray) -> np.ndarray:
+    """Convert an [x, y, z, w] quaternion to a rotation vector."""
+    if q[3] < 0.0:
+        q = -q
+    sin_half = math.sqrt(q[0] * q[0] + q[1] * q[1] + q[2] * q[2])
+    if sin_half < 1e-9:
+        return 2.0 * q[:3]
+    angle = 2.0 * math.atan2(sin_half, q[3])
+    return q[:3] * (angle / sin_half)
+
+
+def rotvec_to_quat(v: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    """Convert a rotation vector to an [x, y, z, w] quaternion."""
+    if out is None:
+        out = np.empty(4)
+    angle = math.sqrt(v[0] * v[0] + v[1] * v[1] + v[2] * v[2])
+    if angle < 1e-9:
+        out[:3] = 0.5 * v
+        out[3] = 1.0
+    else:
+        out[:3] = v * (math.sin(0.5 * angle) / angle)
+        out[3] = math.cos(0.5 * angle)
+    return out
+
+
+class OneEuroFilter:
+    """
+    One-Euro low-pass filter over a fixed-size vector.
+
+    The cutoff frequency adapts to the signal speed: slow motion is smoothed
+    heavily to reject jitter, fast motion passes through with little lag.
+    All state is preallocated and updated in place.
+
+    Attributes:
+        min_cutoff: Cutoff frequency (Hz) used when the signal is at rest.
+        beta: How fast the cutoff grows with the signal speed.
+        d_cutoff: Cutoff frequency (Hz) of the derivative estimate.
+    """
+
+    def __init__(self, size: int, min_cutoff: float = 1.0, beta: float = 0.0, d_cutoff: float = 1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self._x = np.zeros(size)
+        self._dx = np.zeros(size)
+        self._delta = np.zeros(size)
+        self._alpha = np.zeros(size)
+        self._initialized = False
+
+    @staticmethod
+    def _smoothing_factor(cutoff, dt: float):
+        tau = 1.0 / (2.0 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def reset(self):
+        self._dx.fill(0.0)
+        self._initialized = False
+
+    def __call__(self, x: np.ndarray, dt: float) -> np.ndarray:
+        """Filter a new sample taken dt seconds after the previous one."""
+        if not self._initialized or dt <= 0.0:
+            if not self._initialized:
+                self._x[:] = x
+                self._initialized = True
+            return self._x
+
+        np.subtract(x, self._x, out=self._delta)
+        self._dx += self._smoothing_factor(self.d_cutoff, dt) * (self._delta / dt - self._dx)
+
+        np.abs(self._dx, out=self._alpha)
+        self._alpha *= self.beta
+        self._alpha += self.min_cutoff
+        self._alpha[:] = self._smoothing_factor(self._alpha, dt)
+
+        self._delta *= self._alpha
+        self._x += self._delta
+        return self._x
+
+
+class PosePredictor:
+    """
+    Smooths a stream of timestamped 6-DoF poses and extrapolates it forward.
+
+    Incoming samples are One-Euro filtered and kept in a fixed-size ring
+    buffer. Linear velocity is the least-squares slope of the buffered
+    positions and angular velocity is the relative rotation between the oldest
+    and newest buffered orientation. Quaternions use the [x, y, z, w] layout
+    sent by the web-ui.
+
+    Attributes:
+        history: Number of samples used for the velocity estimate.
+    """
+
+    def __init__(
+        self,
+        history: int = 6,
+        min_cutoff: float = 3.0,
+        beta: float = 20.0,
+        d_cutoff: float = 1.0,
+    ):
+        self.history = history
+        self._times = np.zeros(history)
+        self._positions = np.zeros((history, 3))
+        self._quats = np.zeros((history, 4))
+        self._count = 0
+        self._head = 0
+        self._pos_filter = OneEuroFilter(3, min_cutoff, beta, d_cutoff)
+        self._rot_filter = OneEuroFilter(4, min_cutoff, beta, d_cutoff)
+        self._velocity = np.zeros(3)
+        self._angular_velocity = np.zeros(3)
+        self._pred_pos = np.zeros(3)
+        self._pred_quat = np.zeros(4)
+        self._delta_quat = np.zeros(4)
+
+    @property
+    def last_time(self) -> float | None:
+        if self._count == 0:
+            return None
+        return float(self._times[(self._head - 1) % self.history])
+
+    @property
+    def velocity(self) -> np.ndarray:
+        return self._velocity
+
+    @property
+    def angular_velocity(self) -> np.ndarray:
+        return self._angular_velocity
+
+    def reset(self):
+        self._count = 0
+        self._head = 0
+        self._pos_filter.reset()
+        self._rot_filter.reset()
+        self._velocity.fill(0.0)
+        self._angular_velocity.fill(0.0)
+
+    def update(self, t: float, pos, quat) -> bool:
+        """
+        Add a pose sampled at time t (seconds).
+
+        Returns:
+            False if the sample is not newer than the last one and was ignored.
+        """
+        last = self.last_time
+        if last is not None and t <= last:
+            return False
+        dt = 0.0 if last is None else t - last
+
+        quat = np.asarray(quat, dtype=float)
+        if self._count > 0:
+            # Keep the quaternion on the same hemisphere as the filter state
+            # so component-wise smoothing does not cross the q / -q seam
+            previous = self._quats[(self._head - 1) % self.history]
+            if np.dot(quat, previous) < 0.0:
+                quat = -quat
+
+        pos_f = self._pos_filter(np.asarray(pos, dtype=float), dt)
+        quat_f = self._rot_filter(quat, dt)
+
+        i = self._head
+        self._times[i] = t
+        self._positions[i] = pos_f
+        self._quats[i] = quat_f / np.linalg.norm(quat_f)
+        self._head = (i + 1) % self.history
+        self._count = min(self._count + 1, self.history)
+
+        self._estimate_velocities()
+        return True
+
+    def _estimate_velocities(self):
+        n = self._count
+        if n < 2:
+            self._velocity.fill(0.0)
+            self._angular_velocity.fill(0.0)
+            return
+
+        times = self._times[:n]
+        t_mean = times.mean()
+        dt = times - t_mean
+        denom = float(dt @ dt)
+        if denom <= 0.0:
+            return
+        positions = self._positions[:n]
+        self._velocity[:] = dt @ (positions - positions.mean(axis=0)) / denom
+
+        newest = (self._head - 1) % self.history
+        oldest = self._head % self.history if n == self.history else 0
+        span = self._times[newest] - self._times[oldest]
+        if span <= 0.0:
+            return
+        quat_multiply(self._quats[newest], quat_conjugate(self._quats[oldest]), out=self._delta_quat)
+        self._angular_velocity[:] = quat_to_rotvec(self._delta_quat) / span
+
+    def predict(self, horizon_s: float) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Extrapolate the newest filtered pose horizon_s seconds ahead.
+
+        The returned arrays are reused between calls; copy them to keep them.
+        """
+        newest = (self._head - 1) % self.history
+        np.multiply(self._velocity, horizon_s, out=self._pred_pos)
+        self._pred_pos += self._positions[newest]
+
+        rotvec_to_quat(self._angular_velocity * horizon_s, out=self._delta_quat)
+        quat_multiply(self._delta_quat, self._quats[newest], out=self._pred_quat)
+        return self._pred_pos, self._pred_quat
+
+
+class ClockOffsetEstimator:
+    """
+    Maps client sample times onto the server clock.
+
+    `t_recv - t_client` is the clock offset plus the one-way delay of the
+    packet; its minimum over a window is the offset plus the smallest delay,
+    i.e. what a packet that was not queued anywhere took. Subtracting the
+    smallest delay itself - half the WebSocket ping round trip - leaves the
+    clock offset, so every sample can be dated on the server clock and its
+    full age, network delay included, is known. The minimum is kept over two
+    alternating windows so it follows clock drift.
+
+    Attributes:
+        window_s: Length of one minimum window (s).
+        offset: Current estimate of min(t_recv - t_client), None before the first sample.
+    """
+
+    def __init__(self, window_s: float = 10.0):
+        self.window_s = window_s
+        self.offset: float | None = None
+        self._previous_min = math.inf
+        self._current_min = math.inf
+        self._window_start: float | None = None
+
+    def reset(self):
+        """Forget the offset, e.g. for a new client whose clock starts elsewhere."""
+        self.offset = None
+        self._previous_min = math.inf
+        self._current_min = math.inf
+        self._window_start = None
+
+    def update(self, t_client: float, t_recv: float) -> float:
+        """Add a packet sampled at t_client (client clock, s) and received at t_recv (server clock, s)."""
+        if self._window_start is None:
+            self._window_start = t_recv
+        elif t_recv - self._window_start >= self.window_s:
+            self._previous_min = self._current_min
+            self._current_min = math.inf
+            self._window_start = t_recv
+        self._current_min = min(self._current_min, t_recv - t_client)
+        self.offset = min(self._previous_min, self._current_min)
+        return self.offset
+
+    def to_server_time(self, t_client: float, one_way_delay_s: float = 0.0) -> float:
+        """Server-clock time at which the client took the sample at t_client."""
+        return t_client + self.offset - one_way_delay_s
+
+
+def prediction_horizon(
+    now: float,
+    t_sample: float,
+    t_recv: float,
+    latency_s: float,
+    max_horizon_s: float,
+    stale_after_s: float,
+) -> float:
+    """
+    How far ahead of its sample time a pose must be extrapolated to be current at actuation.
+
+    The pose was sampled at t_sample and received at t_recv (server clock) and
+    will be actuated latency_s after now. A hand whose last packet arrived
+    more than stale_after_s ago is at rest (the web-ui stops sending it) and
+    is held rather than extrapolated.
+    """
+    if now - t_recv > stale_after_s:
+        return 0.0
+    return min(max(now - t_sample, 0.0) + latency_s, max_horizon_s)
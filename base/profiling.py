@@ -0,0 +1,59 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """
+    Records named startup phases, including phases running concurrently on other threads.
+
+    Times are relative to the creation of the profiler, which should happen as
+    early as possible in the entry point. `mark` records instant events such as
+    the first command sent to the robot.
+    """
+
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self._phases: list[tuple[str, str, float, float]] = []
+        self._marks: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                self._phases.append((name, threading.current_thread().name, start - self.t0, end - self.t0))
+
+    def mark(self, name: str):
+        """Record an instant event, only the first occurrence is kept."""
+        with self._lock:
+            self._marks.setdefault(name, time.perf_counter() - self.t0)
+
+    def report(self) -> dict:
+        with self._lock:
+            phases = sorted(self._phases, key=lambda phase: phase[2])
+            return {
+                "phases": [
+                    {"name": name, "thread": thread, "start_s": start, "duration_s": end - start}
+                    for name, thread, start, end in phases
+                ],
+                "marks": dict(self._marks),
+            }
+
+    def print_report(self, width: int = 40):
+        """Print the phases as a timeline, one bar per phase."""
+        report = self.report()
+        phases = report["phases"]
+        total = max([p["start_s"] + p["duration_s"] for p in phases] + list(report["marks"].values()) + [1e-9])
+        print(f"⏱️ Startup profile ({total:.2f} s)")
+        for p in phases:
+            begin = int(width * p["start_s"] / total)
+            length = max(1, int(width * p["duration_s"] / total))
+            bar = " " * begin + "█" * length
+            print(f"   {p['name']:<28} {bar:<{width}} {p['start_s']:6.2f}s +{p['duration_s']:.2f}s [{p['thread']}]")
+        for name, t in report["marks"].items():
+            print(f"   {name:<28} at {t:.2f}s")
@@ -0,0 +1,205 @@
+import json
+import os
+import time
+from itertools import product
+
+import numpy as np
+
+from base.urdf_kinematics import UrdfChain
+
+SO101_REACHABILITY_PATH = "Simulation/SO101/reachability"
+
+_NEIGHBOUR_OFFSETS = np.array([offset for offset in product((-1, 0, 1), repeat=3) if offset != (0, 0, 0)])
+
+
+def _shift(array: np.ndarray, offset, fill) -> np.ndarray:
+    """array shifted by offset voxels (no wrap-around), out-of-grid entries set to fill."""
+    shifted = np.full_like(array, fill)
+    src = tuple(slice(max(-o, 0), array.shape[i] - max(o, 0)) for i, o in enumerate(offset))
+    dst = tuple(slice(max(o, 0), array.shape[i] - max(-o, 0)) for i, o in enumerate(offset))
+    shifted[dst] = array[src]
+    return shifted
+
+
+def nearest_seed_transform(seeds: np.ndarray) -> np.ndarray:
+    """
+    Flat index of the (approximately) nearest seed voxel for every voxel of a 3D grid.
+
+    Jump flooding: log2(size) passes over the 26-neighbourhood at halving strides,
+    plus one refinement pass at stride 1. Exact for all practical purposes and
+    fully vectorized, so the offline build does not need scipy.
+    """
+    shape = seeds.shape
+    coords = np.stack(np.indices(shape), axis=-1).reshape(-1, 3)
+    nearest = np.where(seeds.ravel(), np.arange(seeds.size), -1).reshape(shape)
+    if not seeds.any():
+        raise ValueError("No seed voxel in the grid")
+
+    def best_distance(candidate: np.ndarray) -> np.ndarray:
+        flat = candidate.ravel()
+        dist = np.sum((coords[np.maximum(flat, 0)] - coords) ** 2, axis=1)
+        dist[flat < 0] = np.iinfo(np.int64).max
+        return dist.reshape(shape)
+
+    levels = int(np.ceil(np.log2(max(shape))))
+    steps = [1 << level for level in range(levels - 1, -1, -1)] + [1]
+
+    distance = best_distance(nearest)
+    for step in steps:
+        for offset in _NEIGHBOUR_OFFSETS * step:
+            candidate = _shift(nearest, offset, -1)
+            candidate_distance = best_distance(candidate)
+            better = candidate_distance < distance
+            nearest[better] = candidate[better]
+            distance[better] = candidate_distance[better]
+    return nearest.ravel().astype(np.int32)
+
+
+def build_reachability_map(
+    urdf_path: str,
+    frame: str = "gripper_frame_link",
+    joint_names: list[str] | None = None,
+    resolution: float = 0.01,
+    samples: int = 2_000_000,
+    batch: int = 100_000,
+    min_manipulability_ratio: float = 0.02,
+    seed: int = 0,
+    log=print,
+) -> dict:
+    """
+    Sample the joint space of a URDF arm and voxelize the reachable positions of frame.
+
+    Every voxel keeps the best Yoshikawa manipulability sqrt(det(J Jᵀ)) of the
+    positional Jacobian seen in it. Voxels whose best manipulability is below
+    `min_manipulability_ratio` of the global maximum only reach near a
+    singularity (full extension) and are treated as unreachable.
+
+    Returns:
+        Dict with the grid `meta` and the flat arrays `nearest` (index of the
+        nearest reachable voxel, itself for reachable voxels) and `manipulability`.
+    """
+    chain = UrdfChain(urdf_path)
+    # The gripper jaw does not move the end-effector frame
+    joint_names = joint_names or [name for name in chain.joint_names if name != "gripper"]
+    lower, upper = chain.limits(joint_names)
+    rng = np.random.default_rng(seed)
+    eps = 1e-4
+
+    start = time.perf_counter()
+    positions, manipulability = [], []
+    for begin in range(0, samples, batch):
+        n = min(batch, samples - begin)
+        q = rng.uniform(lower, upper, size=(n, len(joint_names)))
+        p = chain.frame_position(q, frame, joint_names)
+        # Positional Jacobian by forward differences, one batched FK per joint
+        jacobian = np.empty((n, 3, len(joint_names)))
+        for j in range(len(joint_names)):
+            dq = q.copy()
+            dq[:, j] += eps
+            jacobian[:, :, j] = (chain.frame_position(dq, frame, joint_names) - p) / eps
+        jjt = jacobian @ jacobian.transpose(0, 2, 1)
+        positions.append(p)
+        manipulability.append(np.sqrt(np.clip(np.linalg.det(jjt), 0.0, None)))
+    positions = np.concatenate(positions)
+    manipulability = np.concatenate(manipulability)
+    log(f"Sampled {samples} configurations in {time.perf_counter() - start:.1f} s")
+
+    # Pad the grid by two voxels so out-of-workspace targets have somewhere to clamp from
+    origin = positions.min(axis=0) - 2 * resolution
+    shape = tuple(int(v) for v in np.ceil((positions.max(axis=0) + 2 * resolution - origin) / resolution))
+    voxel = np.floor((positions - origin) / resolution).astype(np.int64)
+    flat = np.ravel_multi_index(voxel.T, shape)
+
+    best = np.zeros(int(np.prod(shape)), dtype=np.float32)
+    np.maximum.at(best, flat, manipulability.astype(np.float32))
+    reachable = best >= min_manipulability_ratio * best.max()
+    log(f"Grid {shape} at {resolution * 1000:.0f} mm, {reachable.sum()} reachable voxels")
+
+    start = time.perf_counter()
+    nearest = nearest_seed_transform(reachable.reshape(shape))
+    log(f"Nearest reachable voxel transform in {time.perf_counter() - start:.1f} s")
+
+    meta = {
+        "urdf_path": urdf_path,
+        "frame": frame,
+        "joint_names": joint_names,
+        "origin": origin.tolist(),
+        "resolution": resolution,
+        "shape": list(shape),
+        "samples": samples,
+        "min_manipulability_ratio": min_manipulability_ratio,
+        "max_manipulability": float(best.max()),
+    }
+    return {"meta": meta, "nearest": nearest, "manipulability": best.astype(np.float16)}
+
+
+def save_reachability_map(path: str, reachability: dict):
+    """Write a map as a directory of `.npy` files, so it can be memory-mapped at runtime."""
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, "nearest.npy"), reachability["nearest"])
+    np.save(os.path.join(path, "manipulability.npy"), reachability["manipulability"])
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(reachability["meta"], f, indent=2)
+
+
+class ReachabilityMap:
+    """
+    Precomputed voxel reachability of an arm's end-effector, with O(1) lookups.
+
+    Built offline by `tools/build_reachability_map.py`. The arrays are
+    memory-mapped, so loading is instant and only the pages actually touched
+    by the teleop targets are read from disk.
+
+    Attributes:
+        origin: Position of the grid corner in the robot base frame (m).
+        resolution: Voxel edge length (m).
+        shape: Grid size in voxels.
+    """
+
+    def __init__(self, path: str = SO101_REACHABILITY_PATH, mmap: bool = True):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        mmap_mode = "r" if mmap else None
+        self.nearest = np.load(os.path.join(path, "nearest.npy"), mmap_mode=mmap_mode)
+        self.manipulability = np.load(os.path.join(path, "manipulability.npy"), mmap_mode=mmap_mode)
+        self.origin = np.array(self.meta["origin"])
+        self.resolution = float(self.meta["resolution"])
+        self.shape = tuple(self.meta["shape"])
+        self._strides = np.array([self.shape[1] * self.shape[2], self.shape[2], 1])
+        self._max_voxel = np.array(self.shape) - 1
+
+    def voxel_index(self, position) -> int:
+        """Flat index of the voxel containing position, clipped to the grid."""
+        voxel = np.floor((np.asarray(position, dtype=float) - self.origin) / self.resolution).astype(np.int64)
+        return int(np.clip(voxel, 0, self._max_voxel) @ self._strides)
+
+    def voxel_center(self, index: int) -> np.ndarray:
+        voxel = np.array(np.unravel_index(index, self.shape))
+        return self.origin + (voxel + 0.5) * self.resolution
+
+    def is_reachable(self, position) -> bool:
+        index = self.voxel_index(position)
+        return bool(self.nearest[index] == index)
+
+    def manipulability_at(self, position) -> float:
+        return float(self.manipulability[self.voxel_index(position)])
+
+    def clamp(self, position) -> tuple[np.ndarray, bool]:
+        """
+        Nearest reachable position to position.
+
+        Reachable targets are returned unchanged. Others are projected onto
+        the box of the nearest reachable voxel, which keeps the clamped target
+        continuous as the requested one slides along the workspace boundary.
+
+        Returns:
+            (position, clamped)
+        """
+        position = np.asarray(position, dtype=float)
+        index = self.voxel_index(position)
+        nearest = int(self.nearest[index])
+        if nearest == index:
+            return position, False
+        center = self.voxel_center(nearest)
+        half = 0.5 * self.resolution
+        return np.clip(position, center - half, center + half), True
@@ -0,0 +1,86 @@
+import threading
+import time
+from collections.abc import Callable
+
+
+class AsyncRerunLogger:
+    """
+    Logs to rerun from a background thread so the control tick never waits for it.
+
+    `log` only stores the newest (observation, action) pair; the thread logs
+    whatever is newest when it gets to it, at most max_hz, and pairs replaced
+    before being logged are dropped and counted. Logging a camera image can
+    take longer than a whole control tick, this keeps that cost off the tick.
+
+    Attributes:
+        log_fn: Called with (observation=..., action=...), by default lerobot's `log_rerun_data`.
+        max_hz: Upper bound on the logging rate.
+        logged: Pairs logged.
+        dropped: Pairs replaced by a newer one before they were logged.
+        total_log_s: Time spent in log_fn.
+    """
+
+    def __init__(self, log_fn: Callable[..., object] | None = None, max_hz: float = 30.0, name: str = "rerun_logger"):
+        self.log_fn = log_fn
+        self.max_hz = max_hz
+        self.name = name
+        self.logged = 0
+        self.dropped = 0
+        self.total_log_s = 0.0
+        self._pending: tuple | None = None
+        self._condition = threading.Condition()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        if self.log_fn is None:
+            # rerun is only imported once logging starts
+            from lerobot.utils.visualization_utils import log_rerun_data
+
+            self.log_fn = log_rerun_data
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        with self._condition:
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def log(self, observation: dict | None = None, action: dict | None = None):
+        """Queue a pair for logging, replacing the one not logged yet; never blocks on rerun."""
+        with self._condition:
+            if self._pending is not None:
+                self.dropped += 1
+            self._pending = (observation, action)
+            self._condition.notify()
+
+    def _run(self):
+        period = 1.0 / self.max_hz
+        while not self._stop_event.is_set():
+            with self._condition:
+                while self._pending is None and not self._stop_event.is_set():
+                    self._condition.wait()
+                pending, self._pending = self._pending, None
+            if pending is None:
+                continue
+            start = time.perf_counter()
+            try:
+                self.log_fn(observation=pending[0], action=pending[1])
+            except Exception as e:
+                print(f"⚠️ Rerun logging failed: {e}")
+            elapsed = time.perf_counter() - start
+            self.total_log_s += elapsed
+            self.logged += 1
+            if elapsed < period:
+                self._stop_event.wait(period - elapsed)
+
+    def stats(self) -> dict:
+        return {
+            "logged": self.logged,
+            "dropped": self.dropped,
+            "mean_log_ms": 1000.0 * self.total_log_s / self.logged if self.logged else 0.0,
+        }
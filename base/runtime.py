@@ -0,0 +1,350 @@
+import asyncio
+import functools
+import signal
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+
+@dataclass
+class PeriodicStats:
+    """Timing statistics of one periodic task."""
+
+    name: str
+    period_s: float
+    ticks: int = 0
+    overruns: int = 0
+    last_duration_s: float = 0.0
+    max_duration_s: float = 0.0
+    total_duration_s: float = 0.0
+    # Start of the tick after its deadline, i.e. the scheduling jitter
+    max_lateness_s: float = 0.0
+    total_lateness_s: float = 0.0
+
+    def record(self, duration_s: float, lateness_s: float = 0.0):
+        self.ticks += 1
+        self.last_duration_s = duration_s
+        self.max_duration_s = max(self.max_duration_s, duration_s)
+        self.total_duration_s += duration_s
+        self.max_lateness_s = max(self.max_lateness_s, lateness_s)
+        self.total_lateness_s += lateness_s
+        if duration_s > self.period_s:
+            self.overruns += 1
+
+    def snapshot(self) -> dict:
+        return {
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "mean_ms": 1000.0 * self.total_duration_s / self.ticks if self.ticks else 0.0,
+            "max_ms": 1000.0 * self.max_duration_s,
+            "mean_late_ms": 1000.0 * self.total_lateness_s / self.ticks if self.ticks else 0.0,
+            "max_late_ms": 1000.0 * self.max_lateness_s,
+        }
+
+
+@dataclass
+class _Service:
+    name: str
+    start: Callable[[], Awaitable]
+    stop: Callable[[], Awaitable] | None
+
+
+@dataclass
+class _Periodic:
+    fn: Callable[[float], object]
+    stats: PeriodicStats
+    role: str | None = None
+    executor: ThreadPoolExecutor | None = field(default=None, repr=False)
+    task: asyncio.Task | None = field(default=None, repr=False)
+    # Job of the running tick; cancelling the task does not stop it
+    job: Future | None = field(default=None, repr=False)
+
+
+class ThreadUsageMonitor:
+    """Per-thread and whole-process CPU utilization between two samples."""
+
+    def __init__(self):
+        self._last_wall = time.perf_counter()
+        self._last_process = time.process_time()
+        self._last_threads: dict[int, float] = {}
+
+    @staticmethod
+    def _thread_cpu_time(thread: threading.Thread) -> float | None:
+        try:
+            return time.clock_gettime(time.pthread_getcpuclockid(thread.ident))
+        except (AttributeError, OSError, TypeError):
+            # pthread_getcpuclockid is not available on every platform
+            return None
+
+    def sample(self) -> dict:
+        now = time.perf_counter()
+        process = time.process_time()
+        wall = max(now - self._last_wall, 1e-9)
+
+        threads = {}
+        current = {}
+        for thread in threading.enumerate():
+            cpu = self._thread_cpu_time(thread)
+            if cpu is None:
+                continue
+            current[thread.ident] = cpu
+            previous = self._last_threads.get(thread.ident)
+            if previous is not None:
+                threads[thread.name] = (cpu - previous) / wall
+
+        report = {
+            "threads": threading.active_count(),
+            "process_cpu": (process - self._last_process) / wall,
+            "thread_cpu": dict(sorted(threads.items(), key=lambda item: -item[1])),
+        }
+        self._last_wall = now
+        self._last_process = process
+        self._last_threads = current
+        return report
+
+
+class TeleopRuntime:
+    """
+    Single asyncio runtime hosting the teleop servers and the control tick.
+
+    Network servers (the VR WebSocket and the WebRTC camera server) run as
+    coroutines on one event loop instead of one loop per thread. Blocking
+    work - bus I/O, IK, camera reads - is dispatched to one sized thread pool,
+    and periodic work is driven by a loop timer with absolute deadlines so a
+    slow tick does not shift the following ones.
+
+    Services are started concurrently by default so slow steps (connecting
+    the robot, building solvers, importing the WebRTC stack) overlap.
+
+    With a `ThreadPolicy`, the event loop thread takes the network role,
+    each periodic task with a role runs on its own thread with that role, and
+    the loop's default executor - where aiortc runs its video encoders -
+    becomes a separate pool with the encode role. Library threads are matched
+    to their roles once a second.
+
+    Attributes:
+        workers: Size of the thread pool used for blocking work.
+        stats_interval_s: Period of the thread / CPU utilization report (0 disables it).
+        concurrent_startup: Start all services at once instead of in registration order.
+        profiler: Optional `StartupProfiler` recording one phase per service start.
+        thread_policy: Optional `ThreadPolicy` pinning and prioritizing the threads by role.
+        encode_workers: Size of the encode pool (only used with a thread policy).
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        stats_interval_s: float = 5.0,
+        concurrent_startup: bool = True,
+        profiler=None,
+        thread_policy=None,
+        encode_workers: int = 3,
+    ):
+        self.workers = workers
+        self.stats_interval_s = stats_interval_s
+        self.concurrent_startup = concurrent_startup
+        self.profiler = profiler
+        self.thread_policy = thread_policy
+        self.encode_workers = encode_workers
+        self.executor: ThreadPoolExecutor | None = None
+        self.encode_executor: ThreadPoolExecutor | None = None
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self._services: list[_Service] = []
+        self._periodics: list[_Periodic] = []
+        self._report_callbacks: list[Callable[[], None]] = []
+        self._stop_event: asyncio.Event | None = None
+        self.monitor = ThreadUsageMonitor()
+        self.last_usage: dict = {}
+
+    def add_service(self, name: str, start: Callable[[], Awaitable], stop: Callable[[], Awaitable] | None = None):
+        """Register a service started before the periodic tasks and stopped in reverse order."""
+        self._services.append(_Service(name, start, stop))
+
+    def add_periodic(self, name: str, fn: Callable[[float], object], hz: float, role: str | None = None):
+        """
+        Run the blocking fn(dt) at hz, on the thread pool or, with a thread
+        policy and a role, on its own thread with that role.
+        """
+        self._periodics.append(_Periodic(fn, PeriodicStats(name, 1.0 / hz), role))
+
+    def add_report_callback(self, fn: Callable[[], None]):
+        """Call fn on the event loop with every utilization report."""
+        self._report_callbacks.append(fn)
+
+    async def run_blocking(self, fn: Callable, *args, **kwargs):
+        """Run a blocking call on the runtime thread pool."""
+        return await self.loop.run_in_executor(self.executor, functools.partial(fn, *args, **kwargs))
+
+    def stop(self):
+        """Request shutdown; safe to call from any thread."""
+        if self.loop is not None and self._stop_event is not None:
+            self.loop.call_soon_threadsafe(self._stop_event.set)
+
+    def periodic_stats(self) -> dict[str, dict]:
+        return {periodic.stats.name: periodic.stats.snapshot() for periodic in self._periodics}
+
+    async def _run_periodic(self, periodic: _Periodic):
+        period = periodic.stats.period_s
+        deadline = self.loop.time()
+        last = deadline
+        while True:
+            start = self.loop.time()
+            periodic.job = (periodic.executor or self.executor).submit(periodic.fn, start - last)
+            await asyncio.wrap_future(periodic.job)
+            last = start
+            periodic.stats.record(self.loop.time() - start, max(0.0, start - deadline))
+
+            deadline += period
+            delay = deadline - self.loop.time()
+            if delay < 0:
+                # Missed the deadline: restart the schedule from now instead of bursting
+                deadline = self.loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
+
+    async def _start_service(self, service: _Service):
+        print(f"🚀 Starting {service.name}...")
+        if self.profiler is None:
+            await service.start()
+            return
+        with self.profiler.phase(service.name):
+            await service.start()
+
+    async def _start_services(self, started: list[_Service]):
+        if not self.concurrent_startup:
+            for service in self._services:
+                await self._start_service(service)
+                started.append(service)
+            return
+
+        results = await asyncio.gather(
+            *(self._start_service(service) for service in self._services), return_exceptions=True
+        )
+        errors = []
+        for service, result in zip(self._services, results):
+            if isinstance(result, BaseException):
+                errors.append(result)
+            else:
+                started.append(service)
+        if errors:
+            raise errors[0]
+
+    async def _report(self):
+        while True:
+            await asyncio.sleep(self.stats_interval_s)
+            usage = self.monitor.sample()
+            self.last_usage = usage
+            busiest = ", ".join(f"{name} {cpu:.0%}" for name, cpu in list(usage["thread_cpu"].items())[:5])
+            print(f"📊 Runtime: {usage['threads']} threads, process CPU {usage['process_cpu']:.0%} ({busiest})")
+            for name, stats in self.periodic_stats().items():
+                print(
+                    f"📊 {name}: {stats['mean_ms']:.1f} ms mean, {stats['max_ms']:.1f} ms max, "
+                    f"{stats['overruns']}/{stats['ticks']} overruns, started {stats['mean_late_ms']:.1f} ms late "
+                    f"({stats['max_late_ms']:.1f} ms max)"
+                )
+            if self.thread_policy is not None:
+                roles = []
+                for role, stats in self.thread_policy.stats().items():
+                    denied = f" (denied: {', '.join(stats['denied'])})" if stats["denied"] else ""
+                    roles.append(f"{role} {stats['threads']} threads{denied}")
+                print(f"📊 Thread policy: {', '.join(roles)}")
+            for callback in self._report_callbacks:
+                callback()
+
+    async def _match_threads(self):
+        """Give library threads (camera readers, streamers started later) their roles as they appear."""
+        while True:
+            self.thread_policy.apply_matching()
+            await asyncio.sleep(1.0)
+
+    def _create_executors(self):
+        policy = self.thread_policy
+        if policy is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="teleop_worker")
+            self.loop.set_default_executor(self.executor)
+            return
+
+        policy.apply_current("network")
+        # Pool threads are created by the loop thread and would inherit its role
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="teleop_worker", initializer=policy.reset_current
+        )
+        self.encode_executor = ThreadPoolExecutor(
+            max_workers=self.encode_workers,
+            thread_name_prefix="encode",
+            initializer=policy.apply_current,
+            initargs=("encode", "encode"),
+        )
+        self.loop.set_default_executor(self.encode_executor)
+        for periodic in self._periodics:
+            if periodic.role is not None:
+                name = periodic.stats.name
+                periodic.executor = ThreadPoolExecutor(
+                    max_workers=1,
+                    thread_name_prefix=name,
+                    initializer=policy.apply_current,
+                    initargs=(periodic.role, name),
+                )
+
+    async def _main(self):
+        self.loop = asyncio.get_running_loop()
+        self._create_executors()
+        self._stop_event = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                self.loop.add_signal_handler(sig, self._stop_event.set)
+            except (NotImplementedError, RuntimeError):
+                pass
+
+        started: list[_Service] = []
+        tasks: list[asyncio.Task] = []
+        try:
+            await self._start_services(started)
+            if self.profiler is not None:
+                self.profiler.mark("services_started")
+                self.profiler.print_report()
+
+            for periodic in self._periodics:
+                periodic.task = asyncio.create_task(self._run_periodic(periodic), name=periodic.stats.name)
+                tasks.append(periodic.task)
+            if self.stats_interval_s > 0:
+                tasks.append(asyncio.create_task(self._report(), name="runtime_report"))
+            if self.thread_policy is not None:
+                tasks.append(asyncio.create_task(self._match_threads(), name="thread_policy"))
+
+            # Stop on request or as soon as any periodic task fails
+            stop_waiter = asyncio.create_task(self._stop_event.wait())
+            done, _ = await asyncio.wait([stop_waiter, *tasks], return_when=asyncio.FIRST_COMPLETED)
+            stop_waiter.cancel()
+            for task in done:
+                if task is not stop_waiter and not task.cancelled() and task.exception() is not None:
+                    raise task.exception()
+        finally:
+            print("🛑 Shutting down runtime...")
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # A tick already on a thread (e.g. a control tick writing to the bus) must finish
+            # before the services below disconnect what it is using
+            running = [asyncio.wrap_future(p.job) for p in self._periodics if p.job is not None and not p.job.done()]
+            if running:
+                await asyncio.wait(running)
+            for periodic in self._periodics:
+                if periodic.executor is not None:
+                    periodic.executor.shutdown(wait=True)
+            for service in reversed(started):
+                if service.stop is None:
+                    continue
+                try:
+                    await service.stop()
+                except Exception as e:
+                    print(f"⚠️ Error stopping {service.name}: {e}")
+            if self.encode_executor is not None:
+                self.encode_executor.shutdown(wait=True)
+            self.executor.shutdown(wait=True)
+
+    def run(self):
+        """Start every service and periodic task and block until shutdown."""
+        asyncio.run(self._main())
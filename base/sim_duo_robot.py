@@ -0,0 +1,380 @@
+import copy
+import os
+import threading
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+
+import numpy as np
+
+SO101_SCENE_PATH = "Simulation/SO101/scene.xml"
+SO101_MJCF_PATH = "Simulation/SO101/so101_new_calib.xml"
+SIM_MOTOR_NAMES = ["shoulder_pan", "shoulder_lift", "elbow_flex", "wrist_flex", "wrist_roll", "gripper"]
+
+_NAMED_TAGS = ("body", "joint", "geom", "site", "camera")
+
+
+@dataclass
+class SimDuoRobotConfig:
+    """
+    Attributes:
+        scene_path: MJCF scene, its `<include>` of the arm is replaced by the two arms.
+        arm_path: MJCF of a single SO101 arm.
+        arm_spacing: Distance between the two arm bases (m), the left arm at +y.
+        cameras: Camera name -> (width, height). "main" looks at both arms, the
+            "<side>_wrist" cameras are mounted on the grippers.
+        camera_fps: Wall-clock rate at which camera frames are rendered.
+        realtime_factor: Simulated seconds per wall-clock second; None steps as fast as possible.
+        auto_step: Step the physics on a background thread. When False the caller
+            advances the simulation with `step`, e.g. for deterministic benchmarks.
+        initial_position: Initial joint positions in robot units, zero (mid-range) otherwise.
+    """
+
+    scene_path: str = SO101_SCENE_PATH
+    arm_path: str = SO101_MJCF_PATH
+    arm_spacing: float = 0.40
+    cameras: dict[str, tuple[int, int]] = field(
+        default_factory=lambda: {"left_wrist": (640, 480), "right_wrist": (640, 480), "main": (640, 480)}
+    )
+    camera_fps: float = 30.0
+    realtime_factor: float | None = 1.0
+    auto_step: bool = True
+    initial_position: dict[str, float] | None = None
+
+
+def _prefix_names(element: ET.Element, prefix: str):
+    for node in element.iter():
+        if node.tag in _NAMED_TAGS and node.get("name"):
+            node.set("name", prefix + node.get("name"))
+
+
+def build_duo_mjcf(config: SimDuoRobotConfig) -> str:
+    """MJCF of the scene with two prefixed SO101 arms, their actuators and the cameras."""
+    arm_root = ET.parse(config.arm_path).getroot()
+    scene_root = ET.parse(config.scene_path).getroot()
+    mesh_dir = os.path.join(os.path.dirname(os.path.abspath(config.arm_path)), "assets")
+
+    root = ET.Element("mujoco", model="so101_duo")
+    compiler = copy.deepcopy(arm_root.find("compiler"))
+    compiler.set("meshdir", mesh_dir)
+    root.append(compiler)
+    for default in arm_root.findall("default"):
+        root.append(copy.deepcopy(default))
+    root.append(copy.deepcopy(arm_root.find("asset")))
+
+    # Scene lights, floor and visual settings, the offscreen buffer sized for the cameras
+    for element in scene_root:
+        if element.tag != "include":
+            root.append(copy.deepcopy(element))
+    visual = root.find("visual")
+    if visual is None:
+        visual = ET.SubElement(root, "visual")
+    global_ = visual.find("global")
+    if global_ is None:
+        global_ = ET.SubElement(visual, "global")
+    if config.cameras:
+        global_.set("offwidth", str(max(width for width, _ in config.cameras.values())))
+        global_.set("offheight", str(max(height for _, height in config.cameras.values())))
+
+    worldbody = root.find("worldbody")
+    if worldbody is None:
+        worldbody = ET.SubElement(root, "worldbody")
+    actuator = ET.SubElement(root, "actuator")
+    for side, y in (("left", 0.5 * config.arm_spacing), ("right", -0.5 * config.arm_spacing)):
+        prefix = f"{side}_"
+        mount = ET.SubElement(worldbody, "body", name=f"{prefix}mount", pos=f"0 {y} 0")
+        for body in arm_root.find("worldbody"):
+            body = copy.deepcopy(body)
+            _prefix_names(body, prefix)
+            mount.append(body)
+        gripper = next(body for body in mount.iter("body") if body.get("name") == f"{prefix}gripper")
+        # Above the fixed jaw, looking down the gripper (-z of the gripper body)
+        ET.SubElement(gripper, "camera", name=f"{prefix}wrist", pos="0 0.045 -0.02", fovy="70")
+        for position in arm_root.find("actuator"):
+            position = copy.deepcopy(position)
+            position.set("name", prefix + position.get("name"))
+            position.set("joint", prefix + position.get("joint"))
+            actuator.append(position)
+    # In front of the arms, looking back and down at both
+    ET.SubElement(worldbody, "camera", name="main", pos="0.6 0 0.5", xyaxes="0 1 0 -0.64 0 0.77", fovy="60")
+    return ET.tostring(root, encoding="unicode")
+
+
+class SimMotorsBus:
+    """The subset of `FeetechMotorsBus` used by the teleop loop, backed by the simulation."""
+
+    def __init__(self, robot: "SimDuoRobot", side: str):
+        self._robot = robot
+        self._side = side
+        self.motors = {name: None for name in SIM_MOTOR_NAMES}
+
+    def sync_read(self, data_name: str, motors=None) -> dict[str, float]:
+        if data_name != "Present_Position":
+            raise ValueError(f"Only Present_Position is simulated, got {data_name}")
+        positions = self._robot._read_positions(self._side)
+        return {motor: positions[motor] for motor in (motors or self.motors)}
+
+    def sync_write(self, data_name: str, values: dict[str, float]):
+        if data_name != "Goal_Position":
+            raise ValueError(f"Only Goal_Position is simulated, got {data_name}")
+        self._robot._write_goals(self._side, values)
+
+
+class SimArm:
+    """One simulated arm, shaped like `SO100Follower` (`bus`, `send_action`, `get_observation`)."""
+
+    def __init__(self, robot: "SimDuoRobot", side: str):
+        self.bus = SimMotorsBus(robot, side)
+        self._robot = robot
+
+    @property
+    def is_connected(self) -> bool:
+        return self._robot.is_connected
+
+    def get_observation(self) -> dict[str, float]:
+        return {f"{motor}.pos": value for motor, value in self.bus.sync_read("Present_Position").items()}
+
+    def send_action(self, action: dict) -> dict:
+        goals = {key.removesuffix(".pos"): float(value) for key, value in action.items() if key.endswith(".pos")}
+        self.bus.sync_write("Goal_Position", goals)
+        return {f"{motor}.pos": value for motor, value in goals.items()}
+
+
+class SimCamera:
+    """Offscreen-rendered camera with the `read` / `async_read` interface of lerobot cameras."""
+
+    def __init__(self, name: str, width: int, height: int, fps: float):
+        self.name = name
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self._frame: np.ndarray | None = None
+        self._frame_lock = threading.Lock()
+        self._new_frame = threading.Event()
+        self.is_connected = False
+
+    def _publish(self, frame: np.ndarray):
+        with self._frame_lock:
+            self._frame = frame
+        self._new_frame.set()
+
+    def read(self) -> np.ndarray:
+        return self.async_read(timeout_ms=1000)
+
+    def async_read(self, timeout_ms: float = 200) -> np.ndarray:
+        """Latest rendered RGB frame, waiting up to timeout_ms for a new one."""
+        if not self._new_frame.wait(timeout_ms / 1000.0) and self._frame is None:
+            raise TimeoutError(f"Timed out waiting for a frame from {self.name} after {timeout_ms} ms")
+        self._new_frame.clear()
+        with self._frame_lock:
+            return self._frame
+
+
+class SimDuoRobot:
+    """
+    MuJoCo simulation of the duo SO101 setup with the `BiSO100Follower` interface.
+
+    Both arms live in one model built from the repo MJCF files. Joint values
+    use the robot units (degrees, gripper 0 = closed .. 100 = open) and the
+    `left_`/`right_` prefixes of `BiSO100Follower`, and `left_arm` /
+    `right_arm` expose a bus with `sync_read("Present_Position")`, so
+    `DuoBusIO`, the trajectory streamers and the pipelines run unchanged.
+
+    Cameras are rendered offscreen on the CPU (OSMesa unless `MUJOCO_GL` is
+    set) by a render thread, and physics runs on its own thread at
+    `realtime_factor` times real time, or as fast as possible.
+    """
+
+    name = "sim_duo"
+
+    def __init__(self, config: SimDuoRobotConfig | None = None):
+        self.config = config or SimDuoRobotConfig()
+        self.left_arm = SimArm(self, "left")
+        self.right_arm = SimArm(self, "right")
+        self.cameras = {
+            name: SimCamera(name, width, height, self.config.camera_fps)
+            for name, (width, height) in self.config.cameras.items()
+        }
+        self._model = None
+        self._data = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._connected = False
+        self.physics_steps = 0
+        self.frames_rendered = 0
+        self._wall_start = 0.0
+
+    @property
+    def is_connected(self) -> bool:
+        return self._connected
+
+    @property
+    def observation_features(self) -> dict:
+        motors = {f"{side}_{motor}.pos": float for side in ("left", "right") for motor in SIM_MOTOR_NAMES}
+        cameras = {name: (camera.height, camera.width, 3) for name, camera in self.cameras.items()}
+        return {**motors, **cameras}
+
+    @property
+    def action_features(self) -> dict:
+        return {f"{side}_{motor}.pos": float for side in ("left", "right") for motor in SIM_MOTOR_NAMES}
+
+    @property
+    def sim_time(self) -> float:
+        return float(self._data.time) if self._data is not None else 0.0
+
+    def connect(self, calibrate: bool = True):
+        # Software rendering, so no GPU or display is needed; must be set before importing mujoco
+        os.environ.setdefault("MUJOCO_GL", "osmesa")
+        import mujoco
+
+        self._mujoco = mujoco
+        self._model = mujoco.MjModel.from_xml_string(build_duo_mjcf(self.config))
+        self._data = mujoco.MjData(self._model)
+
+        self._qpos = {}
+        self._ctrl = {}
+        self._range = {}
+        for side in ("left", "right"):
+            joints = [self._model.joint(f"{side}_{motor}") for motor in SIM_MOTOR_NAMES]
+            self._qpos[side] = np.array([joint.qposadr[0] for joint in joints])
+            self._ctrl[side] = np.array([self._model.actuator(f"{side}_{motor}").id for motor in SIM_MOTOR_NAMES])
+            self._range[side] = np.array([joint.range for joint in joints])
+
+        initial = self.config.initial_position or {}
+        for side in ("left", "right"):
+            values = {motor: initial.get(f"{side}_{motor}.pos", initial.get(f"{motor}.pos")) for motor in SIM_MOTOR_NAMES}
+            values = {motor: value for motor, value in values.items() if value is not None}
+            radians = self._to_radians(side, {**dict.fromkeys(SIM_MOTOR_NAMES, None), **values})
+            self._data.qpos[self._qpos[side]] = radians
+            self._data.ctrl[self._ctrl[side]] = radians
+        mujoco.mj_forward(self._model, self._data)
+
+        self._stop_event.clear()
+        self._wall_start = time.perf_counter()
+        self._sim_start = self._data.time
+        self._connected = True
+        for camera in self.cameras.values():
+            camera.is_connected = True
+        if self.config.auto_step:
+            self._threads.append(threading.Thread(target=self._physics_loop, name="sim_physics", daemon=True))
+        if self.cameras:
+            self._threads.append(threading.Thread(target=self._render_loop, name="sim_render", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def disconnect(self):
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+        self._threads.clear()
+        for camera in self.cameras.values():
+            camera.is_connected = False
+        self._connected = False
+
+    def _to_radians(self, side: str, values: dict[str, float | None]) -> np.ndarray:
+        lower, upper = self._range[side][:, 0], self._range[side][:, 1]
+        radians = np.zeros(len(SIM_MOTOR_NAMES))
+        for i, motor in enumerate(SIM_MOTOR_NAMES):
+            value = values.get(motor)
+            if value is None:
+                continue
+            if motor == "gripper":
+                radians[i] = lower[i] + (upper[i] - lower[i]) * float(value) / 100.0
+            else:
+                radians[i] = np.deg2rad(float(value))
+        return np.clip(radians, lower, upper)
+
+    def _from_radians(self, side: str, radians: np.ndarray) -> dict[str, float]:
+        lower, upper = self._range[side][:, 0], self._range[side][:, 1]
+        values = np.rad2deg(radians)
+        gripper = SIM_MOTOR_NAMES.index("gripper")
+        values[gripper] = 100.0 * (radians[gripper] - lower[gripper]) / (upper[gripper] - lower[gripper])
+        return dict(zip(SIM_MOTOR_NAMES, values.tolist()))
+
+    def _read_positions(self, side: str) -> dict[str, float]:
+        with self._lock:
+            radians = self._data.qpos[self._qpos[side]].copy()
+        return self._from_radians(side, radians)
+
+    def _write_goals(self, side: str, goals: dict[str, float]):
+        with self._lock:
+            current = self._from_radians(side, self._data.ctrl[self._ctrl[side]].copy())
+            self._data.ctrl[self._ctrl[side]] = self._to_radians(side, {**current, **goals})
+
+    def get_observation(self) -> dict:
+        observation = {}
+        for side, arm in (("left", self.left_arm), ("right", self.right_arm)):
+            observation.update({f"{side}_{key}": value for key, value in arm.get_observation().items()})
+        for name, camera in self.cameras.items():
+            observation[name] = camera.async_read()
+        return observation
+
+    def send_action(self, action: dict) -> dict:
+        sent = {}
+        for side, arm in (("left", self.left_arm), ("right", self.right_arm)):
+            prefix = f"{side}_"
+            arm_action = {key.removeprefix(prefix): value for key, value in action.items() if key.startswith(prefix)}
+            if arm_action:
+                sent.update({prefix + key: value for key, value in arm.send_action(arm_action).items()})
+        return sent
+
+    def step(self, duration_s: float):
+        """Advance the simulation by duration_s (manual stepping, `auto_step=False`)."""
+        steps = max(1, int(round(duration_s / self._model.opt.timestep)))
+        with self._lock:
+            self._mujoco.mj_step(self._model, self._data, nstep=steps)
+        self.physics_steps += steps
+
+    def stats(self) -> dict:
+        wall = max(time.perf_counter() - self._wall_start, 1e-9)
+        return {
+            "sim_time": self.sim_time,
+            "realtime_factor": (self.sim_time - self._sim_start) / wall,
+            "physics_steps_per_s": self.physics_steps / wall,
+            "render_fps": self.frames_rendered / wall,
+        }
+
+    def _physics_loop(self):
+        timestep = self._model.opt.timestep
+        # Steps per lock acquisition, so readers and writers get in between
+        chunk = max(1, int(0.002 / timestep))
+        factor = self.config.realtime_factor
+        while not self._stop_event.is_set():
+            if factor is not None:
+                target = self._sim_start + factor * (time.perf_counter() - self._wall_start)
+                if self._data.time >= target:
+                    time.sleep(min(0.001, (self._data.time - target) / factor))
+                    continue
+            with self._lock:
+                self._mujoco.mj_step(self._model, self._data, nstep=chunk)
+            self.physics_steps += chunk
+            if factor is None:
+                # Let the control and render threads take the lock
+                time.sleep(0)
+
+    def _render_loop(self):
+        mujoco = self._mujoco
+        # Renderers own the GL context, so they are created on the thread that uses them
+        renderers = {
+            name: mujoco.Renderer(self._model, height=camera.height, width=camera.width)
+            for name, camera in self.cameras.items()
+        }
+        period = 1.0 / self.config.camera_fps
+        next_time = time.perf_counter()
+        try:
+            while not self._stop_event.is_set():
+                for name, renderer in renderers.items():
+                    with self._lock:
+                        renderer.update_scene(self._data, camera=name)
+                    self.cameras[name]._publish(renderer.render().copy())
+                    self.frames_rendered += 1
+                next_time += period
+                delay = next_time - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_time = time.perf_counter()
+        finally:
+            for renderer in renderers.values():
+                renderer.close()
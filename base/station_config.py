@@ -0,0 +1,121 @@
+import dataclasses
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+
+
+@dataclass
+class StationConfig:
+    """
+    One duo robot station: its robot, cameras, teleop input, ports and CPU cores.
+
+    The defaults are the settings at the top of vr_teleop.py; a station file
+    only lists what differs. Applied with `vr_teleop.configure` before the
+    station starts.
+
+    Attributes:
+        name: Unique station name, used for its process, logs and metrics.
+        mode: "vr" or "phone".
+        cpus: CPU cores the station process is pinned to, None for no pinning.
+        vr_port: Port of the VR WebSocket (the web-ui learns it from the camera server).
+        camera_port: Port of the WebRTC camera server, which also serves the web-ui.
+        cameras: Camera name -> OpenCV index or device path.
+        phone_arms: Phone mode only, arm -> "ios" or "android".
+        thread_policy: Thread role -> `RolePolicy` options (see base/thread_policy.py),
+            role cores must be among cpus.
+    """
+
+    name: str
+    mode: str = "vr"
+    cpus: list[int] | None = None
+    use_sim: bool = False
+    left_arm_port: str = "/dev/tty.usbmodem5A460842561"
+    right_arm_port: str = "/dev/tty.usbmodem58FA0963791"
+    cameras: dict[str, int | str] = field(default_factory=lambda: {"left_wrist": 1, "right_wrist": 0, "main": 2})
+    camera_width: int = 640
+    camera_height: int = 480
+    fps: int = 30
+    command_hz: int = 120
+    arm_spacing_m: float = 0.40
+    gripper_mode: str = "joystick"
+    roi_cameras: dict[str, dict | None] = field(
+        default_factory=lambda: {"left_wrist": {"mode": "foveate"}, "right_wrist": {"mode": "foveate"}}
+    )
+    vr_port: int = 8080
+    camera_port: int = 8765
+    use_https: bool = True
+    cert_file: str = "ssl_cert/server.crt"
+    key_file: str = "ssl_cert/server.key"
+    ice_servers: list = field(default_factory=list)
+    web_ui_dev_mode: bool = False
+    record_session_dir: str | None = None
+    phone_arms: dict[str, str] = field(default_factory=lambda: {"right_arm": "ios"})
+    thread_policy: dict[str, dict] | None = None
+
+    def __post_init__(self):
+        if self.mode not in ("vr", "phone"):
+            raise ValueError(f"Station {self.name}: unknown mode {self.mode!r}, expected 'vr' or 'phone'")
+        if self.gripper_mode not in ("joystick", "trigger"):
+            raise ValueError(f"Station {self.name}: unknown gripper_mode {self.gripper_mode!r}")
+        for role, options in (self.thread_policy or {}).items():
+            outside = set(options.get("cpus") or []) - set(self.cpus or options.get("cpus") or [])
+            if outside:
+                raise ValueError(f"Station {self.name}: {role} threads pinned to {sorted(outside)}, outside its cpus")
+
+
+def _read(path: Path) -> dict:
+    if path.suffix == ".toml":
+        import tomllib
+
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    if path.suffix in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError as e:
+            raise ImportError("YAML station files need PyYAML (pip install pyyaml), or use TOML") from e
+        with open(path, encoding="utf-8") as f:
+            return yaml.safe_load(f) or {}
+    raise ValueError(f"Unsupported station file {path}, expected .toml, .yaml or .yml")
+
+
+def load_stations(path: str | os.PathLike) -> list[StationConfig]:
+    """
+    Read the stations of a TOML or YAML file.
+
+    The file has an optional `defaults` table applied to every station and a
+    `station` list, one entry per station; a station's own keys win. Unknown
+    keys, duplicate names and ports or CPU cores claimed by two stations are
+    rejected.
+    """
+    data = _read(Path(path))
+    defaults = data.get("defaults") or {}
+    known = {f.name for f in dataclasses.fields(StationConfig)}
+    stations = []
+    for i, entry in enumerate(data.get("station") or []):
+        values = {**defaults, **entry}
+        unknown = set(values) - known
+        if unknown:
+            raise ValueError(f"Station {values.get('name', i)}: unknown keys {sorted(unknown)}")
+        if "name" not in values:
+            raise ValueError(f"Station {i} has no name")
+        stations.append(StationConfig(**values))
+    if not stations:
+        raise ValueError(f"No [[station]] in {path}")
+
+    names = [station.name for station in stations]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate station names {duplicates}")
+    claimed: dict[tuple, str] = {}
+    for station in stations:
+        claims = [("port", station.vr_port), ("port", station.camera_port)]
+        claims += [("cpu", cpu) for cpu in station.cpus or []]
+        if not station.use_sim:
+            claims += [("serial", station.left_arm_port), ("serial", station.right_arm_port)]
+            claims += [("camera", camera) for camera in station.cameras.values()]
+        for claim in claims:
+            owner = claimed.setdefault(claim, station.name)
+            if owner != station.name or claims.count(claim) > 1:
+                raise ValueError(f"{claim[0]} {claim[1]!r} is used by both {owner} and {station.name}")
+    return stations
@@ -0,0 +1,167 @@
+import fnmatch
+import os
+import threading
+from dataclasses import dataclass, field
+
+ROLES = ("control", "camera", "encode", "network")
+
+# Python thread names (fnmatch patterns) of each role, on top of the role's own `threads`:
+# the trajectory streamers and bus I/O threads drive the servos, lerobot's OpenCV cameras
+# read in "<camera>_read_loop" threads. The runtime names its own role threads.
+DEFAULT_THREAD_NAMES = {
+    "control": ["*_streamer", "bus_io*"],
+    "camera": ["*_read_loop", "sim_render", "synthetic_camera"],
+    "encode": [],
+    "network": [],
+}
+
+
+@dataclass
+class RolePolicy:
+    """
+    Scheduling of the threads of one role.
+
+    Attributes:
+        cpus: Cores the role's threads may run on, None leaves the affinity alone.
+        fifo_priority: SCHED_FIFO priority (1-99), 0 keeps the normal scheduler.
+            Needs root or CAP_SYS_NICE; without it `nice` is used instead.
+        nice: Nice level of the role's threads (negative values need CAP_SYS_NICE).
+        threads: Extra Python thread name patterns belonging to the role.
+    """
+
+    cpus: list[int] | None = None
+    fifo_priority: int = 0
+    nice: int | None = None
+    threads: list[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        if not 0 <= self.fifo_priority <= 99:
+            raise ValueError(f"fifo_priority must be within 0..99, got {self.fifo_priority}")
+
+
+def set_native_thread_name(name: str, native_id: int | None = None):
+    """Name a thread for the kernel (top -H, ps -L, perf); Linux keeps the first 15 bytes."""
+    native_id = threading.get_native_id() if native_id is None else native_id
+    try:
+        with open(f"/proc/self/task/{native_id}/comm", "w") as f:
+            f.write(name.encode()[:15].decode(errors="ignore"))
+    except OSError:
+        pass
+
+
+class ThreadPolicy:
+    """
+    Pins, prioritizes and names the teleop threads by role.
+
+    The roles are control (the control tick, trajectory streamers and bus
+    I/O), camera (capture threads and the camera tick), encode (the video
+    encoders) and network (the event loop serving the VR WebSocket and
+    WebRTC). Threads the runtime owns apply their role when they start
+    (`apply_current`); threads started by libraries are found by their Python
+    name (`apply_matching`). Linux applies affinity and scheduling per
+    thread, so a native thread id is used throughout; elsewhere the policy
+    only names threads.
+
+    Threads inherit the affinity and scheduler of the thread that creates
+    them, so threads without a role are reset to the process defaults
+    (`reset_current`) rather than inheriting e.g. the SCHED_FIFO of the control
+    thread.
+
+    Attributes:
+        roles: Role name -> `RolePolicy`; roles missing here are left alone.
+        applied: Role -> names of the threads the policy was applied to.
+        denied: Role -> settings the OS refused (e.g. "fifo", "nice", "cpus").
+    """
+
+    def __init__(self, roles: dict[str, RolePolicy] | None = None):
+        unknown = set(roles or {}) - set(ROLES)
+        if unknown:
+            raise ValueError(f"Unknown thread roles {sorted(unknown)}, expected some of {ROLES}")
+        self.roles = dict(roles or {})
+        self.applied: dict[str, list[str]] = {role: [] for role in self.roles}
+        self.denied: dict[str, set[str]] = {role: set() for role in self.roles}
+        self._seen: set[int] = set()
+        self._lock = threading.Lock()
+        self._linux = hasattr(os, "sched_setaffinity")
+        self._default_cpus = os.sched_getaffinity(0) if self._linux else None
+
+    @classmethod
+    def from_dict(cls, data: dict[str, dict]) -> "ThreadPolicy":
+        """Policy from plain config values, e.g. `{"control": {"cpus": [2], "fifo_priority": 50}}`."""
+        return cls({role: RolePolicy(**options) for role, options in data.items()})
+
+    def _deny(self, role: str, setting: str, error: OSError):
+        if setting not in self.denied[role]:
+            self.denied[role].add(setting)
+            print(f"⚠️ Thread policy: {role} {setting} not applied ({error})")
+
+    def apply_thread(self, role: str, native_id: int, name: str | None = None):
+        """Apply the policy of role to the thread native_id, and name it if name is given."""
+        if name is not None:
+            set_native_thread_name(name, native_id)
+        policy = self.roles.get(role)
+        if policy is None:
+            return
+        with self._lock:
+            self._seen.add(native_id)
+            self.applied[role].append(name or str(native_id))
+        if not self._linux:
+            return
+        if policy.cpus:
+            try:
+                os.sched_setaffinity(native_id, policy.cpus)
+            except OSError as e:
+                self._deny(role, "cpus", e)
+        if policy.fifo_priority:
+            try:
+                os.sched_setscheduler(native_id, os.SCHED_FIFO, os.sched_param(policy.fifo_priority))
+                return
+            except OSError as e:
+                self._deny(role, "fifo", e)
+        if policy.nice is not None:
+            try:
+                os.setpriority(os.PRIO_PROCESS, native_id, policy.nice)
+            except OSError as e:
+                self._deny(role, "nice", e)
+
+    def apply_current(self, role: str, name: str | None = None):
+        """Apply role to the calling thread; used as a thread pool initializer."""
+        self.apply_thread(role, threading.get_native_id(), name)
+
+    def reset_current(self, name: str | None = None):
+        """Give the calling thread the process default affinity and scheduler, whatever its creator had."""
+        native_id = threading.get_native_id()
+        if name is not None:
+            set_native_thread_name(name, native_id)
+        if not self._linux:
+            return
+        try:
+            os.sched_setaffinity(native_id, self._default_cpus)
+            os.sched_setscheduler(native_id, os.SCHED_OTHER, os.sched_param(0))
+            os.setpriority(os.PRIO_PROCESS, native_id, 0)
+        except OSError:
+            pass
+
+    def apply_matching(self) -> int:
+        """Apply the roles to the running threads matching their names; returns the newly handled count."""
+        patterns = [
+            (role, pattern)
+            for role, policy in self.roles.items()
+            for pattern in DEFAULT_THREAD_NAMES[role] + policy.threads
+        ]
+        handled = 0
+        for thread in threading.enumerate():
+            if thread.native_id is None or thread.native_id in self._seen:
+                continue
+            for role, pattern in patterns:
+                if fnmatch.fnmatchcase(thread.name, pattern):
+                    self.apply_thread(role, thread.native_id, thread.name)
+                    handled += 1
+                    break
+        return handled
+
+    def stats(self) -> dict:
+        return {
+            role: {"threads": len(self.applied[role]), "denied": sorted(self.denied[role])}
+            for role in self.roles
+        }
@@ -0,0 +1,188 @@
+import threading
+import time
+from collections.abc import Callable
+
+import numpy as np
+
+
+class JointTrajectoryStreamer:
+    """
+    Upsamples planner-rate joint targets into a smooth, higher-rate command stream.
+
+    The teleop loop publishes one IK result per tick with `set_target`. A
+    background thread linearly interpolates from the current command towards
+    the newest target over the measured planning interval and streams the
+    result to the bus at `command_hz`, enforcing per-joint velocity and
+    acceleration limits. Expensive IK therefore only runs at the planning
+    rate while the servos receive fine-grained goal positions.
+
+    A failing `send_fn` (e.g. a serial error on the bus) is counted and
+    retried on the next command; after max_send_errors failures in a row the
+    streamer stops and keeps the error, so the owner can see the arm is no
+    longer commanded (`is_running`, `error`).
+
+    Attributes:
+        joint_names: Motor names, in the order used for the internal arrays.
+        send_fn: Called with a `{"<motor>.pos": value}` action on every command.
+        command_hz: Rate at which commands are streamed to the bus.
+        max_velocity: Velocity limit in joint units per second (scalar or per motor).
+        max_acceleration: Acceleration limit in joint units per second² (scalar or per motor).
+        lock: Optional lock held around `send_fn`, shared with bus readers.
+        max_send_errors: Consecutive failed sends after which the streamer stops.
+        send_errors: Failed sends so far.
+        error: The exception that stopped the streamer, None while it runs.
+    """
+
+    def __init__(
+        self,
+        joint_names: list[str],
+        send_fn: Callable[[dict], object],
+        command_hz: float = 120.0,
+        max_velocity: float | dict[str, float] = 180.0,
+        max_acceleration: float | dict[str, float] = 1500.0,
+        lock: "threading.Lock | None" = None,
+        name: str = "trajectory_streamer",
+        max_send_errors: int = 60,
+    ):
+        self.joint_names = list(joint_names)
+        self.keys = [f"{joint}.pos" for joint in self.joint_names]
+        self.send_fn = send_fn
+        self.command_hz = command_hz
+        self.lock = lock or threading.Lock()
+        self.name = name
+        self.max_send_errors = max_send_errors
+
+        self._max_velocity = self._per_joint(max_velocity)
+        self._max_acceleration = self._per_joint(max_acceleration)
+
+        n = len(self.joint_names)
+        self._command = np.zeros(n)
+        self._velocity = np.zeros(n)
+        self._segment_start = np.zeros(n)
+        self._target = np.zeros(n)
+        self._last_sent = np.full(n, np.nan)
+        self._reference = np.zeros(n)
+        self._desired = np.zeros(n)
+        self._segment_t0 = 0.0
+        self._planning_interval = 1.0 / 30.0
+        self._last_target_time = None
+
+        self._target_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        self.commands_sent = 0
+        self.overruns = 0
+        self.send_errors = 0
+        self.error = None
+
+    def _per_joint(self, value: float | dict[str, float]) -> np.ndarray:
+        if isinstance(value, dict):
+            return np.array([float(value[joint]) for joint in self.joint_names])
+        return np.full(len(self.joint_names), float(value))
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, initial_position: dict):
+        """Start streaming, holding initial_position until the first target arrives."""
+        position = np.array([float(initial_position[key]) for key in self.keys])
+        with self._target_lock:
+            self._command[:] = position
+            self._segment_start[:] = position
+            self._target[:] = position
+            self._velocity.fill(0.0)
+            self._segment_t0 = time.perf_counter()
+            self._last_target_time = None
+        self.error = None
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def set_target(self, action: dict):
+        """Publish a new joint target (a `{"<motor>.pos": value}` action) from the planner."""
+        target = np.array([float(action[key]) for key in self.keys])
+        now = time.perf_counter()
+        with self._target_lock:
+            if self._last_target_time is not None:
+                # Smooth the measured planning interval so one late tick does not stretch the segment
+                interval = min(max(now - self._last_target_time, 1.0 / self.command_hz), 0.2)
+                self._planning_interval += 0.2 * (interval - self._planning_interval)
+            self._last_target_time = now
+            self._segment_start[:] = self._command
+            self._target[:] = target
+            self._segment_t0 = now
+
+    def command(self) -> dict:
+        """The joint command being streamed (a `{"<motor>.pos": value}` action), where a new target starts from."""
+        with self._target_lock:
+            return dict(zip(self.keys, self._command.tolist()))
+
+    def _step(self, now: float, dt: float):
+        with self._target_lock:
+            progress = min((now - self._segment_t0) / self._planning_interval, 1.0)
+            np.subtract(self._target, self._segment_start, out=self._reference)
+            self._reference *= progress
+            self._reference += self._segment_start
+
+        # Desired velocity to reach the interpolated reference this step, capped so
+        # the joint can still brake to a stop within the acceleration limit
+        error = self._reference - self._command
+        speed = np.minimum(np.abs(error) / dt, np.sqrt(2.0 * self._max_acceleration * np.abs(error)))
+        np.minimum(speed, self._max_velocity, out=speed)
+        np.multiply(np.sign(error), speed, out=self._desired)
+
+        max_dv = self._max_acceleration * dt
+        self._velocity += np.clip(self._desired - self._velocity, -max_dv, max_dv)
+        self._command += self._velocity * dt
+
+    def _run(self):
+        try:
+            self._stream()
+        except Exception as e:
+            self.error = e
+            print(f"❌ {self.name} stopped, the arm is no longer commanded: {e!r}")
+
+    def _stream(self):
+        period = 1.0 / self.command_hz
+        next_time = time.perf_counter()
+        last_time = next_time
+        failures = 0
+        while not self._stop_event.is_set():
+            now = time.perf_counter()
+            self._step(now, max(now - last_time, 1e-4))
+            last_time = now
+
+            # Skip the bus write while holding still
+            if not np.allclose(self._command, self._last_sent, atol=1e-3):
+                action = dict(zip(self.keys, self._command.tolist()))
+                try:
+                    with self.lock:
+                        self.send_fn(action)
+                except Exception as e:
+                    # Not marked as sent, so the next step retries with the newer command
+                    self.send_errors += 1
+                    failures += 1
+                    if failures == 1:
+                        print(f"⚠️ {self.name}: send failed, retrying: {e!r}")
+                    if failures >= self.max_send_errors:
+                        raise
+                else:
+                    failures = 0
+                    self._last_sent[:] = self._command
+                    self.commands_sent += 1
+
+            next_time += period
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                self.overruns += 1
+                next_time = time.perf_counter()
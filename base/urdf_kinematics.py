@@ -0,0 +1,184 @@
+import os
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+
+import numpy as np
+
+
+def rpy_to_matrix(rpy) -> np.ndarray:
+    """Rotation matrix of URDF roll/pitch/yaw angles (fixed axes X, Y, Z)."""
+    roll, pitch, yaw = rpy
+    cr, sr = np.cos(roll), np.sin(roll)
+    cp, sp = np.cos(pitch), np.sin(pitch)
+    cy, sy = np.cos(yaw), np.sin(yaw)
+    return np.array([
+        [cy * cp, cy * sp * sr - sy * cr, cy * sp * cr + sy * sr],
+        [sy * cp, sy * sp * sr + cy * cr, sy * sp * cr - cy * sr],
+        [-sp, cp * sr, cp * cr],
+    ])
+
+
+def origin_to_transform(element) -> np.ndarray:
+    """4x4 transform of a URDF `<origin>` element (identity when missing)."""
+    transform = np.eye(4)
+    if element is None:
+        return transform
+    xyz = [float(v) for v in element.get("xyz", "0 0 0").split()]
+    rpy = [float(v) for v in element.get("rpy", "0 0 0").split()]
+    transform[:3, :3] = rpy_to_matrix(rpy)
+    transform[:3, 3] = xyz
+    return transform
+
+
+@dataclass
+class UrdfJoint:
+    name: str
+    type: str
+    parent: str
+    child: str
+    origin: np.ndarray
+    axis: np.ndarray
+    lower: float = -np.pi
+    upper: float = np.pi
+
+
+@dataclass
+class UrdfVisual:
+    link: str
+    mesh: str
+    origin: np.ndarray
+    scale: np.ndarray = field(default_factory=lambda: np.ones(3))
+
+
+class UrdfChain:
+    """
+    Minimal vectorized forward kinematics of a serial URDF robot.
+
+    Only what the offline tools and the per-tick safety checks need: the joint
+    tree, joint limits, visual meshes and batched FK over many configurations
+    at once with plain NumPy (no placo), e.g. to sample the workspace or pose
+    the collision geometry of both arms every tick.
+
+    Joint values are in radians, in the order of `joint_names`.
+    """
+
+    def __init__(self, urdf_path: str):
+        self.urdf_path = urdf_path
+        root = ET.parse(urdf_path).getroot()
+
+        self.joints: dict[str, UrdfJoint] = {}
+        for element in root.findall("joint"):
+            limit = element.find("limit")
+            axis = element.find("axis")
+            axis = np.array([float(v) for v in axis.get("xyz").split()]) if axis is not None else np.array([1.0, 0, 0])
+            norm = np.linalg.norm(axis)
+            joint = UrdfJoint(
+                name=element.get("name"),
+                type=element.get("type"),
+                parent=element.find("parent").get("link"),
+                child=element.find("child").get("link"),
+                origin=origin_to_transform(element.find("origin")),
+                axis=axis / norm if norm > 0 else axis,
+            )
+            if limit is not None and joint.type in ("revolute", "prismatic"):
+                joint.lower = float(limit.get("lower", joint.lower))
+                joint.upper = float(limit.get("upper", joint.upper))
+            self.joints[joint.name] = joint
+
+        mesh_dir = os.path.dirname(os.path.abspath(urdf_path))
+        self.visuals: list[UrdfVisual] = []
+        for link in root.findall("link"):
+            for visual in link.findall("visual"):
+                mesh = visual.find("geometry/mesh")
+                if mesh is None:
+                    continue
+                scale = mesh.get("scale")
+                self.visuals.append(UrdfVisual(
+                    link=link.get("name"),
+                    mesh=os.path.join(mesh_dir, mesh.get("filename")),
+                    origin=origin_to_transform(visual.find("origin")),
+                    scale=np.array([float(v) for v in scale.split()]) if scale else np.ones(3),
+                ))
+
+        self._child_joint = {joint.child: joint for joint in self.joints.values()}
+        self._rotation_terms = {}
+        for joint in self.joints.values():
+            x, y, z = joint.axis
+            skew = np.array([[0.0, -z, y], [z, 0.0, -x], [-y, x, 0.0]])
+            rotation = joint.origin[:3, :3]
+            self._rotation_terms[joint.name] = (rotation, rotation @ skew, rotation @ skew @ skew)
+        children = set(self._child_joint)
+        links = {link.get("name") for link in root.findall("link")}
+        roots = links - children
+        if len(roots) != 1:
+            raise ValueError(f"Expected a single root link in {urdf_path}, found {sorted(roots)}")
+        self.root_link = roots.pop()
+        self.links = self._topological_links()
+        self.joint_names = [
+            joint.name for joint in (self._child_joint[link] for link in self.links if link in self._child_joint)
+            if joint.type in ("revolute", "continuous", "prismatic")
+        ]
+
+    def _topological_links(self) -> list[str]:
+        order = [self.root_link]
+        frontier = [self.root_link]
+        while frontier:
+            parent = frontier.pop(0)
+            for joint in self.joints.values():
+                if joint.parent == parent:
+                    order.append(joint.child)
+                    frontier.append(joint.child)
+        return order
+
+    def limits(self, joint_names: list[str] | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """(lower, upper) joint limits in radians."""
+        names = joint_names or self.joint_names
+        return (
+            np.array([self.joints[name].lower for name in names]),
+            np.array([self.joints[name].upper for name in names]),
+        )
+
+    def forward_kinematics(
+        self,
+        q: np.ndarray,
+        joint_names: list[str] | None = None,
+        links: list[str] | None = None,
+    ) -> dict[str, np.ndarray]:
+        """
+        Link poses in the root frame for a batch of configurations.
+
+        Args:
+            q: (N, J) or (J,) joint values in radians. Joints not listed stay at 0.
+            joint_names: Joint order of q, defaults to `joint_names`.
+            links: Links to return, defaults to every link.
+
+        Returns:
+            Mapping from link name to (N, 4, 4) transforms ((4, 4) for a single configuration).
+        """
+        q = np.asarray(q, dtype=float)
+        single = q.ndim == 1
+        q = np.atleast_2d(q)
+        names = joint_names or self.joint_names
+        column = {name: i for i, name in enumerate(names)}
+        n = q.shape[0]
+
+        poses = {self.root_link: np.broadcast_to(np.eye(4), (n, 4, 4))}
+        for link in self.links[1:]:
+            joint = self._child_joint[link]
+            local = np.empty((n, 4, 4))
+            local[:] = joint.origin
+            if joint.name in column and joint.type in ("revolute", "continuous"):
+                # Rodrigues with the joint origin rotation folded in: R0 (I + sin K + (1 - cos) K²)
+                angle = q[:, column[joint.name], None, None]
+                rotation, rotation_k, rotation_k2 = self._rotation_terms[joint.name]
+                local[:, :3, :3] = rotation + np.sin(angle) * rotation_k + (1.0 - np.cos(angle)) * rotation_k2
+            elif joint.name in column and joint.type == "prismatic":
+                local[:, :3, 3] += (joint.origin[:3, :3] @ joint.axis) * q[:, column[joint.name], None]
+            poses[link] = poses[joint.parent] @ local
+
+        wanted = links or self.links
+        return {link: poses[link][0] if single else poses[link] for link in wanted}
+
+    def frame_position(self, q: np.ndarray, frame: str, joint_names: list[str] | None = None) -> np.ndarray:
+        """(N, 3) positions of one frame."""
+        return self.forward_kinematics(q, joint_names, links=[frame])[frame][..., :3, 3]
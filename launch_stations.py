@@ -0,0 +1,133 @@
+"""
+Run several duo robot stations on one host from a station file.
+
+Every station runs the common teleop runner of vr_teleop.py in its own
+process, pinned to its CPU cores, with its own robot, cameras and ports (see
+`base.station_config.StationConfig` and stations.example.toml). The stations
+write their stats reports to `<metrics-dir>/<name>.json`; this launcher prints
+a table of all of them and keeps `<metrics-dir>/aggregate.json` up to date.
+Ctrl+C stops every station.
+
+Usage:
+    python launch_stations.py stations.toml
+    python launch_stations.py stations.yaml --only lab-a lab-b --metrics-dir /tmp/stations
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import signal
+import time
+from pathlib import Path
+
+from base.station_config import StationConfig, load_stations
+
+
+def run_station(station: StationConfig, metrics_path: str):
+    """Process entry point: pin the cores, apply the station settings and run the teleop."""
+    if station.cpus:
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, station.cpus)
+        else:
+            print(f"⚠️ {station.name}: CPU pinning is not supported on this platform, running unpinned")
+
+    # Imported in the child only, after pinning: the runner threads inherit the affinity
+    import vr_teleop
+
+    vr_teleop.configure(station)
+    vr_teleop.metrics_path = metrics_path
+    try:
+        vr_teleop.main(station.mode)
+    except KeyboardInterrupt:
+        pass
+
+
+def read_metrics(metrics_dir: Path, stations: list[StationConfig]) -> dict[str, dict | None]:
+    metrics = {}
+    for station in stations:
+        try:
+            metrics[station.name] = json.loads((metrics_dir / f"{station.name}.json").read_text())
+        except (OSError, ValueError):
+            metrics[station.name] = None
+    return metrics
+
+
+def print_metrics(metrics: dict[str, dict | None], processes: dict[str, multiprocessing.Process]):
+    print(f"{'station':>12} {'state':>8} {'CPU':>5} {'control':>14} {'late':>8} {'overruns':>9} {'camera':>14}")
+    for name, snapshot in metrics.items():
+        state = "running" if processes[name].is_alive() else f"exit {processes[name].exitcode}"
+        if snapshot is None:
+            print(f"{name:>12} {state:>8} {'-':>5}")
+            continue
+        control = snapshot["periodic"].get("control", {})
+        camera = snapshot["periodic"].get("camera", {})
+        print(
+            f"{name:>12} {state:>8} {snapshot['usage'].get('process_cpu', 0.0):>5.0%} "
+            f"{control.get('mean_ms', 0.0):>6.1f}/{control.get('max_ms', 0.0):>5.1f}ms "
+            f"{control.get('max_late_ms', 0.0):>6.1f}ms {control.get('overruns', 0):>9} "
+            f"{camera.get('mean_ms', 0.0):>6.1f}/{camera.get('max_ms', 0.0):>5.1f}ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run several duo robot stations from a station file")
+    parser.add_argument("config", help="Station file (.toml, .yaml or .yml)")
+    parser.add_argument("--only", nargs="+", help="Run only these stations")
+    parser.add_argument("--metrics-dir", default="station_metrics", help="Where the stations write their stats")
+    parser.add_argument("--report-interval", type=float, default=10.0, help="Seconds between aggregated reports")
+    args = parser.parse_args()
+
+    stations = load_stations(args.config)
+    if args.only:
+        missing = set(args.only) - {station.name for station in stations}
+        if missing:
+            parser.error(f"Unknown stations {sorted(missing)}")
+        stations = [station for station in stations if station.name in args.only]
+
+    metrics_dir = Path(args.metrics_dir)
+    metrics_dir.mkdir(parents=True, exist_ok=True)
+    for station in stations:
+        (metrics_dir / f"{station.name}.json").unlink(missing_ok=True)
+
+    # Spawn: every station starts from a fresh interpreter, no forked threads or device handles
+    context = multiprocessing.get_context("spawn")
+    processes = {}
+    for station in stations:
+        process = context.Process(
+            target=run_station,
+            args=(station, str(metrics_dir / f"{station.name}.json")),
+            name=f"station-{station.name}",
+        )
+        process.start()
+        processes[station.name] = process
+        cpus = ",".join(map(str, station.cpus)) if station.cpus else "any"
+        print(
+            f"🚀 {station.name}: {station.mode} mode, pid {process.pid}, CPUs {cpus}, "
+            f"web-ui port {station.camera_port}, VR port {station.vr_port}"
+        )
+
+    try:
+        while any(process.is_alive() for process in processes.values()):
+            time.sleep(args.report_interval)
+            metrics = read_metrics(metrics_dir, stations)
+            print_metrics(metrics, processes)
+            tmp_path = metrics_dir / "aggregate.json.tmp"
+            tmp_path.write_text(json.dumps({"time": time.time(), "stations": metrics}))
+            os.replace(tmp_path, metrics_dir / "aggregate.json")
+    except KeyboardInterrupt:
+        print("🛑 Stopping stations...")
+    finally:
+        for process in processes.values():
+            if process.is_alive():
+                # The runner shuts its services down on SIGINT, like Ctrl+C in a single station
+                os.kill(process.pid, signal.SIGINT)
+        for process in processes.values():
+            process.join(timeout=10.0)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+
+
+if __name__ == "__main__":
+    main()
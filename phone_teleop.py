@@ -13,108 +13,155 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specif
 
-import time
-
-from lerobot.model.kinematics import RobotKinematics
-from lerobot.processor import RobotAction, RobotObservation, RobotProcessorPipeline
-from lerobot.processor.converters import (
-    robot_action_observation_to_transition,
-    transition_to_robot_action,
-)
-from lerobot.robots.so100_follower.config_so100_follower import SO100FollowerConfig
-from lerobot.robots.so100_follower.robot_kinematic_processor import (
-    EEBoundsAndSafety,
-    EEReferenceAndDelta,
-    GripperVelocityToJoint,
-    InverseKinematicsEEToJoints,
-)
-from lerobot.robots.so100_follower.so100_follower import SO100Follower
-from lerobot.teleoperators.phone.config_phone import PhoneConfig, PhoneOS
-from lerobot.teleoperators.phone.phone_processor import MapPhoneActionToRobotAction
-from lerobot.teleoperators.phone.teleop_phone import Phone
-from lerobot.utils.robot_utils import busy_wait
-from lerobot.utils.visualization_utils import init_rerun, log_rerun_data
-
-FPS = 30
-
-# Initialize the robot and teleoperator
-robot_config = SO100FollowerConfig(
-    port="/dev/tty.usbmodem58FA0963791", id="right_follower_arm", use_degrees=True
-)
-teleop_config = PhoneConfig(phone_os=PhoneOS.IOS)  # or PhoneOS.ANDROID
-
-# Initialize the robot and teleoperator
-robot = SO100Follower(robot_config)
-teleop_device = Phone(teleop_config)
-
-# NOTE: It is highly recommended to use the urdf in the SO-ARM100 repo: https://github.com/TheRobotStudio/SO-ARM100/blob/main/Simulation/SO101/so101_new_calib.urdf
-kinematics_solver = RobotKinematics(
-    urdf_path="Simulation/SO101/so101_new_calib.urdf",
-    target_frame_name="gripper_frame_link",
-    joint_names=list(robot.bus.motors.keys()),
-)
-
-# Build pipeline to convert phone action to ee pose action to joint action
-phone_to_robot_joints_processor = RobotProcessorPipeline[tuple[RobotAction, RobotObservation], RobotAction](
-    steps=[
-        MapPhoneActionToRobotAction(platform=teleop_config.phone_os),
-        EEReferenceAndDelta(
-            kinematics=kinematics_solver,
-            end_effector_step_sizes={"x": 0.5, "y": 0.5, "z": 0.5},
-            motor_names=list(robot.bus.motors.keys()),
-            use_latched_reference=True,
-        ),
-        EEBoundsAndSafety(
-            end_effector_bounds={"min": [-1.0, -1.0, -1.0], "max": [1.0, 1.0, 1.0]},
-            max_ee_step_m=0.10,
-            max_ee_twist_step_rad=0.50,
-        ),
-        GripperVelocityToJoint(
-            speed_factor=20.0,
-        ),
-        InverseKinematicsEEToJoints(
-            kinematics=kinematics_solver,
-            motor_names=list(robot.bus.motors.keys()),
-            initial_guess_current_joints=True,
-        ),
-    ],
-    to_transition=robot_action_observation_to_transition,
-    to_output=transition_to_robot_action,
-)
-
-# Connect to the robot and teleoperator
-robot.connect()
-teleop_device.connect()
-
-# Init rerun viewer
-init_rerun(session_name="phone_so100_teleop")
-
-if not robot.is_connected or not teleop_device.is_connected:
-    raise ValueError("Robot or teleop is not connected!")
-
-print("Starting teleop loop. Move your phone to teleoperate the robot...")
-while True:
-    t0 = time.perf_counter()
-
-    # Get robot observation
-    robot_obs = robot.get_observation()
-
-    # Get teleop action
-    phone_obs = teleop_device.get_action()
-    
-    print(f"Phone Observation: {phone_obs}")
-    print(f"Phone Rotation (quat): {phone_obs['phone.rot'].as_quat()}")
-    print(f"Phone rotation (rotvec): {phone_obs['phone.rot'].as_rotvec()}")
-
-    # Phone -> EE pose -> Joints transition
-    joint_action = phone_to_robot_joints_processor((phone_obs, robot_obs))
-
-    print(f"Joint Action: {joint_action}")
-
-    # Send action to robot
-    _ = robot.send_action(joint_action)
-
-    # Visualize
-    log_rerun_data(observation=phone_obs, action=joint_action)
-
-    busy_wait(max(1.0 / FPS - (time.perf_counter() - t0), 0.0))
+# Phone teleop of the duo arms, run by the common teleop runner of vr_teleop.py
+# (`teleop_mode = "phone"`): same runtime, deadline scheduler, cached solvers,
+# streamers, collision check, gripper controller and asynchronous rerun logging
+# as the VR mode, with the phones as input instead of the headset.
+
+from base.gripper_control import GripperController
+from base.kinematics import get_kinematics_solver
+from base.observation_cache import TickObservationCache, make_cached_transition_converter
+from vr_teleop import REACHABILITY_MAP_PATH, VRDuoTeleop, main as run_teleop, reachability_map_available
+
+# One phone per arm to drive, an arm without a phone holds its position.
+# Values are "ios" or "android" (lerobot PhoneOS).
+PHONE_ARMS = {"right_arm": "ios"}
+
+
+def get_phone_to_arm_processor(
+    motor_names: list[str], arm: str, obs_cache: TickObservationCache, gripper: GripperController, phone_os: str
+):
+    from lerobot.processor import RobotAction, RobotObservation, RobotProcessorPipeline
+    from lerobot.processor.converters import transition_to_robot_action
+    from lerobot.robots.so100_follower.robot_kinematic_processor import (
+        EEBoundsAndSafety,
+        EEReferenceAndDelta,
+        InverseKinematicsEEToJoints,
+    )
+    from lerobot.teleoperators.phone.config_phone import PhoneOS
+    from lerobot.teleoperators.phone.phone_processor import MapPhoneActionToRobotAction
+
+    from vr_processor import EEReachabilityClamp, GripperCommandToJoint
+    from vr_teleop import GRIPPER_INDEX
+
+    # Shared with the VR mode: one cached solver per arm
+    kinematics_solver = get_kinematics_solver(motor_names, key=arm)
+    reachability_steps = []
+    if reachability_map_available(REACHABILITY_MAP_PATH):
+        reachability_steps.append(EEReachabilityClamp(map_path=REACHABILITY_MAP_PATH))
+    return RobotProcessorPipeline[tuple[RobotAction, RobotObservation], RobotAction](
+        steps=[
+            MapPhoneActionToRobotAction(platform=PhoneOS(phone_os)),
+            EEReferenceAndDelta(
+                kinematics=kinematics_solver,
+                end_effector_step_sizes={"x": 0.5, "y": 0.5, "z": 0.5},
+                motor_names=motor_names,
+                use_latched_reference=True,
+            ),
+            EEBoundsAndSafety(
+                end_effector_bounds={"min": [-1.0, -1.0, -1.0], "max": [1.0, 1.0, 1.0]},
+                max_ee_step_m=0.10,
+                max_ee_twist_step_rad=0.50,
+            ),
+            *reachability_steps,
+            GripperCommandToJoint(controller=gripper, index=GRIPPER_INDEX[arm]),
+            InverseKinematicsEEToJoints(
+                kinematics=kinematics_solver,
+                motor_names=motor_names,
+                initial_guess_current_joints=True,
+            ),
+        ],
+        to_transition=make_cached_transition_converter(obs_cache, arm),
+        to_output=transition_to_robot_action,
+    )
+
+
+def phone_gripper_velocity(phone_obs: dict, phone_os: str) -> float:
+    """Gripper velocity input of a phone, the buttons `MapPhoneActionToRobotAction` maps."""
+    inputs = phone_obs.get("phone.raw_inputs") or {}
+    if phone_os == "ios":
+        return float(inputs.get("a3", 0.0))
+    # Positive while A is pressed, negative while B is pressed
+    return float(inputs.get("reservedButtonA", 0.0)) - float(inputs.get("reservedButtonB", 0.0))
+
+
+class PhoneDuoTeleop(VRDuoTeleop):
+    """Phone -> duo arm teleoperation, one phone per driven arm."""
+
+    def __init__(self, phone_arms: dict[str, str] | None = None):
+        super().__init__(teleop_device=None)
+        self.phone_arms = dict(PHONE_ARMS if phone_arms is None else phone_arms)
+        # Only the arms with a phone get a pipeline and a kinematics solver
+        self.driven_arms = tuple(arm for arm in ("left_arm", "right_arm") if arm in self.phone_arms)
+        self.phones = {}
+        self.targets = {}
+
+    def make_arm_processor(self, arm: str):
+        return get_phone_to_arm_processor(
+            self.motor_names[arm], arm, self.obs_cache, self.gripper, self.phone_arms[arm]
+        )
+
+    def connect_phones(self):
+        """Connect every phone (blocking)."""
+        from lerobot.teleoperators.phone.config_phone import PhoneConfig, PhoneOS
+        from lerobot.teleoperators.phone.teleop_phone import Phone
+
+        for arm, phone_os in self.phone_arms.items():
+            phone = Phone(PhoneConfig(phone_os=PhoneOS(phone_os)))
+            phone.connect()
+            if not phone.is_connected:
+                raise ValueError(f"Phone of {arm} is not connected!")
+            self.phones[arm] = phone
+
+    def disconnect_phones(self):
+        for phone in self.phones.values():
+            phone.disconnect()
+        self.phones.clear()
+
+    def control_step(self, dt: float):
+        """Read the arms, run the phone -> joint pipelines and publish the new targets."""
+        self.obs_cache.begin_tick()
+        if not self.phones or self.bus_io is None:
+            self.log_robot()
+            return
+
+        phone_obs = {arm: phone.get_action() for arm, phone in self.phones.items()}
+        self.step_grippers(dt, {
+            arm: (phone_gripper_velocity(obs, self.phone_arms[arm]), None) for arm, obs in phone_obs.items()
+        })
+
+        # An arm without a phone keeps its last target (initially where it started)
+        for arm in ("left_arm", "right_arm"):
+            self.targets.setdefault(arm, self.initial_arm_obs[arm])
+        for arm, obs in phone_obs.items():
+            self.targets[arm] = self.processors[arm]((obs, None))
+
+        if self.send_targets(self.targets["left_arm"], self.targets["right_arm"]):
+            self.log_robot(action={
+                f"{arm.removesuffix('_arm')}_{key}": value
+                for arm, target in self.targets.items()
+                for key, value in target.items()
+            })
+
+    def publish_robot_state(self, tick_ms: float):
+        """No headset to push the state to, only the recording."""
+        if self.bus_io is None or self.recorder is None:
+            return
+        joints = {arm: self.obs_cache.get(arm) for arm in ("left_arm", "right_arm")}
+        self.recorder.record_state(joints, tick_ms, {arm: arm in self.phones for arm in ("left_arm", "right_arm")})
+
+    def print_device_stats(self):
+        phones = ", ".join(f"{arm} ({phone_os})" for arm, phone_os in self.phone_arms.items())
+        print(f"📊 Phones: {phones or 'none'}")
+
+
+def main():
+    import vr_teleop
+
+    # This module's teleop: run as a script it is __main__, and vr_teleop.main must not
+    # import it again as phone_teleop
+    run_teleop(mode="phone", teleop=PhoneDuoTeleop(vr_teleop.phone_arms))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,48 @@
 # Server module
-from server.webrtc_camera_server import (
-    CameraStreamTrack,
-    WebRTCCameraServer,
-    create_ssl_context,
-    create_camera_server,
-)
-from server.vr_headset import VRHeadset
+#
+# Exports are resolved lazily: the WebRTC server pulls in aiortc, av and cv2,
+# which scripts that only need VRHeadset should not pay for at import time.
+import importlib
+
+_EXPORTS = {
+    "CameraStreamTrack": "server.webrtc_camera_server",
+    "WebRTCCameraServer": "server.webrtc_camera_server",
+    "create_ssl_context": "server.webrtc_camera_server",
+    "create_camera_server": "server.webrtc_camera_server",
+    "RoiConfig": "server.foveation",
+    "VRHeadset": "server.vr_headset",
+    "SyntheticCameraSource": "server.synthetic_camera",
+    "FrameCodeStats": "server.synthetic_camera",
+    "decode_frame_code": "server.synthetic_camera",
+    "SessionRecorder": "server.recorded_session",
+    "SessionPlayback": "server.recorded_session",
+    "PoseValidator": "server.pose_validation",
+}
 
 __all__ = [
     "CameraStreamTrack",
     "WebRTCCameraServer",
     "create_ssl_context",
     "create_camera_server",
+    "RoiConfig",
     "VRHeadset",
+    "SyntheticCameraSource",
+    "FrameCodeStats",
+    "decode_frame_code",
+    "SessionRecorder",
+    "SessionPlayback",
+    "PoseValidator",
 ]
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,117 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import numpy as np
+
+# A region of interest is (x0, y0, x1, y1) in pixels, x1 / y1 exclusive
+Rect = Tuple[int, int, int, int]
+
+
+@dataclass
+class RoiConfig:
+    """
+    Region-of-interest encoding of a camera stream.
+
+    In "foveate" mode the frame keeps its size, the ROI stays at full
+    resolution and the periphery is resampled on a periphery_factor coarser
+    grid: flat blocks cost the encoder few bits and little motion search. In
+    "crop" mode only the ROI is sent, a smaller frame that is cheaper to
+    encode. Both run on the I420 planes the encoder consumes, through index
+    tables computed once per ROI position.
+
+    Attributes:
+        mode: "foveate" or "crop".
+        width, height: ROI size as a fraction of the frame.
+        center: Default ROI center, normalized (x right, y down), e.g. where the gripper is in a wrist camera.
+        periphery_factor: Downsampling of the periphery in "foveate" mode.
+        follow_gaze: Let the client move the ROI ("foveate" only, a crop moves with the view it is shown in).
+        gaze_timeout_s: Back to center once the client stops reporting gaze for this long.
+        grid: ROI positions snap to this many pixels, which bounds the number of tables cached.
+    """
+
+    mode: str = "foveate"
+    width: float = 0.5
+    height: float = 0.5
+    center: Tuple[float, float] = (0.5, 0.5)
+    periphery_factor: int = 4
+    follow_gaze: bool = True
+    gaze_timeout_s: float = 1.0
+    grid: int = 16
+
+    def __post_init__(self):
+        if self.mode not in ("foveate", "crop"):
+            raise ValueError(f"Unknown ROI mode {self.mode!r}, expected 'foveate' or 'crop'")
+        if not (0.0 < self.width <= 1.0 and 0.0 < self.height <= 1.0):
+            raise ValueError(f"ROI size must be a fraction of the frame, got {self.width} x {self.height}")
+        if self.periphery_factor < 1 or self.grid % 2:
+            raise ValueError("periphery_factor must be >= 1 and grid must be even")
+
+
+def roi_rect(frame_width: int, frame_height: int, config: RoiConfig, center: Optional[Tuple[float, float]] = None) -> Rect:
+    """Pixel ROI around center (normalized), kept inside the frame, snapped to the grid and to even pixels."""
+    cx, cy = config.center if center is None else center
+    # Even sizes and offsets keep the 2x2 subsampled chroma planes aligned
+    w = min(frame_width, max(2, int(round(frame_width * config.width / 2)) * 2))
+    h = min(frame_height, max(2, int(round(frame_height * config.height / 2)) * 2))
+    x0 = int(round((cx * frame_width - w / 2) / config.grid)) * config.grid
+    y0 = int(round((cy * frame_height - h / 2) / config.grid)) * config.grid
+    x0 = min(max(0, x0), frame_width - w) & ~1
+    y0 = min(max(0, y0), frame_height - h) & ~1
+    return x0, y0, x0 + w, y0 + h
+
+
+@lru_cache(maxsize=256)
+def foveation_indices(height: int, width: int, rect: Rect, factor: int) -> np.ndarray:
+    """
+    Flat source index of every output pixel of a (height, width) plane:
+    identity inside rect, the center of the enclosing factor x factor block
+    outside it.
+    """
+    x0, y0, x1, y1 = rect
+    rows = np.arange(height)
+    cols = np.arange(width)
+    coarse_rows = np.minimum(rows // factor * factor + factor // 2, height - 1)
+    coarse_cols = np.minimum(cols // factor * factor + factor // 2, width - 1)
+    inside = ((rows >= y0) & (rows < y1))[:, None] & ((cols >= x0) & (cols < x1))[None, :]
+    src_rows = np.where(inside, rows[:, None], coarse_rows[:, None])
+    src_cols = np.where(inside, cols[None, :], coarse_cols[None, :])
+    indices = (src_rows * width + src_cols).astype(np.int32)
+    indices.flags.writeable = False
+    return indices
+
+
+def _i420_planes(yuv: np.ndarray, width: int, height: int):
+    """Y, U and V views of an I420 frame laid out as (height * 3 / 2, width)."""
+    flat = yuv.reshape(-1)
+    luma = width * height
+    chroma = luma // 4
+    y = flat[:luma].reshape(height, width)
+    u = flat[luma:luma + chroma].reshape(height // 2, width // 2)
+    v = flat[luma + chroma:].reshape(height // 2, width // 2)
+    return y, u, v
+
+
+def _i420_pack(y: np.ndarray, u: np.ndarray, v: np.ndarray) -> np.ndarray:
+    height, width = y.shape
+    return np.concatenate([y.reshape(-1), u.reshape(-1), v.reshape(-1)]).reshape(height * 3 // 2, width)
+
+
+def foveate_i420(yuv: np.ndarray, width: int, height: int, rect: Rect, factor: int) -> np.ndarray:
+    """Same-size I420 frame with everything outside rect resampled on a factor coarser grid."""
+    y, u, v = _i420_planes(yuv, width, height)
+    x0, y0, x1, y1 = rect
+    luma_indices = foveation_indices(height, width, rect, factor)
+    chroma_indices = foveation_indices(height // 2, width // 2, (x0 // 2, y0 // 2, x1 // 2, y1 // 2), max(1, factor // 2))
+    return _i420_pack(
+        y.reshape(-1).take(luma_indices),
+        u.reshape(-1).take(chroma_indices),
+        v.reshape(-1).take(chroma_indices),
+    )
+
+
+def crop_i420(yuv: np.ndarray, width: int, height: int, rect: Rect) -> np.ndarray:
+    """I420 frame of only the pixels inside rect."""
+    y, u, v = _i420_planes(yuv, width, height)
+    x0, y0, x1, y1 = rect
+    return _i420_pack(y[y0:y1, x0:x1], u[y0 // 2:y1 // 2, x0 // 2:x1 // 2], v[y0 // 2:y1 // 2, x0 // 2:x1 // 2])
@@ -0,0 +1,311 @@
+import math
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+HANDS = ("left", "right")
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """
+    One field of a pose packet.
+
+    Attributes:
+        kind: "vector" (list of numbers), "number", "int" or "bool".
+        size: Length of a vector.
+        low: Smallest allowed value of a number or vector element.
+        high: Largest allowed value of a number or vector element.
+        clip: Clip out of range values instead of rejecting the pose.
+        required: Reject poses without the field (otherwise it may be missing).
+    """
+
+    kind: str
+    size: int = 1
+    low: float = -math.inf
+    high: float = math.inf
+    clip: bool = False
+    required: bool = True
+
+
+# PosePacket of the web-ui (websocket-manager.js), positions in meters in the XR reference space
+POSE_SCHEMA = {
+    "pos": FieldSpec("vector", 3, -5.0, 5.0),
+    "rot": FieldSpec("vector", 4, -1.5, 1.5),
+    "joystickY": FieldSpec("number", low=-1.0, high=1.0, clip=True),
+    "trigger": FieldSpec("number", low=0.0, high=1.0, clip=True, required=False),
+    "enabled": FieldSpec("bool"),
+}
+
+# FramePacket fields around the hands
+FRAME_SCHEMA = {
+    "seq": FieldSpec("int", required=False),
+    "t": FieldSpec("number", required=False),
+    "reset": FieldSpec("bool", required=False),
+}
+
+_NUMBER_TYPES = (int, float)
+
+
+class CompiledSchema:
+    """
+    A schema flattened for fast checking.
+
+    Every numeric field gets a slice of one float row, so a pose is checked by
+    a single pass over its values (types and lengths) followed by array
+    operations on the row: finiteness, bounds and clipping for all fields at
+    once. Boolean fields are checked separately and kept out of the row.
+
+    Attributes:
+        width: Length of the float row of one pose.
+        slices: Numeric field name -> its slice of the row.
+        low: Lower bound of every row element.
+        high: Upper bound of every row element.
+        clip: Row elements clipped rather than rejected when out of range.
+    """
+
+    def __init__(self, schema: dict[str, FieldSpec]):
+        self.schema = dict(schema)
+        self.numeric: list[tuple[str, FieldSpec, int]] = []
+        self.flags: list[tuple[str, FieldSpec]] = []
+        self.slices: dict[str, slice] = {}
+        offset = 0
+        for name, spec in schema.items():
+            if spec.kind == "bool":
+                self.flags.append((name, spec))
+                continue
+            if spec.kind not in ("vector", "number", "int"):
+                raise ValueError(f"Unknown field kind {spec.kind!r} of {name}")
+            size = spec.size if spec.kind == "vector" else 1
+            self.numeric.append((name, spec, offset))
+            self.slices[name] = slice(offset, offset + size)
+            offset += size
+        self.width = offset
+        self.low = np.full(self.width, -np.inf)
+        self.high = np.full(self.width, np.inf)
+        self.clip = np.zeros(self.width, dtype=bool)
+        for name, spec, _ in self.numeric:
+            self.low[self.slices[name]] = spec.low
+            self.high[self.slices[name]] = spec.high
+            self.clip[self.slices[name]] = spec.clip
+
+    def extract(self, data, row: np.ndarray, present: np.ndarray) -> bool:
+        """
+        Copy the numeric fields of data into row; False on a schema error.
+
+        Missing (or null) optional fields are NaN in row and False in present,
+        so only the values actually sent are checked for finiteness.
+        """
+        if not isinstance(data, dict):
+            return False
+        for name, spec in self.flags:
+            value = data.get(name)
+            if value is None and not spec.required:
+                continue
+            if type(value) is not bool:
+                return False
+        for name, spec, offset in self.numeric:
+            value = data.get(name)
+            if value is None:
+                if spec.required:
+                    return False
+                row[self.slices[name]] = np.nan
+                present[self.slices[name]] = False
+                continue
+            present[self.slices[name]] = True
+            if spec.kind == "vector":
+                if type(value) is not list or len(value) != spec.size:
+                    return False
+                for i, element in enumerate(value):
+                    # bool is an int subclass, a True in a position is a malformed packet
+                    if type(element) not in _NUMBER_TYPES:
+                        return False
+                    row[offset + i] = element
+            elif spec.kind == "int":
+                if type(value) is not int:
+                    return False
+                row[offset] = value
+            else:
+                if type(value) not in _NUMBER_TYPES:
+                    return False
+                row[offset] = value
+        return True
+
+
+class PoseValidator:
+    """
+    Validates and sanitizes the FramePackets of the web-ui before they reach the pipelines.
+
+    Runs in `VRHeadset` when a packet is received, so a bad packet is dropped
+    on the event loop and the control thread only ever sees clean poses. The
+    hands of a packet are checked together as one (hands x fields) array:
+
+    - schema: field types and vector lengths, compiled from `POSE_SCHEMA`;
+      unknown fields are dropped
+    - finiteness of every number (a NaN from the headset arrives as null,
+      which the schema rejects, or as NaN)
+    - bounds: out of range positions are rejected, axes (joystick, trigger) clipped
+    - quaternion norm: rotations far from unit length are rejected, the rest
+      normalized
+    - jumps: while a hand stays enabled, a position or rotation step larger
+      than max_position_jump_m / max_rotation_jump_rad from its last accepted
+      pose is rejected. Jumps are only checked within jump_window_s of that
+      pose, so after a real tracking relocation control resumes by itself.
+
+    A rejected hand is dropped from the packet and keeps its last state, as if
+    it had not moved (`VRHeadset` publishes no observation before both hands
+    have one); a packet with invalid frame fields is rejected whole. Optional
+    fields that are missing or null are left out of the sanitized pose.
+
+    Attributes:
+        accepted: Packets passed on (possibly without a rejected hand).
+        rejected_packets: Packets rejected whole.
+        rejected: Reason -> rejected hands (or packets for "json" / "frame").
+        clipped: Hands with at least one axis clipped into range.
+        normalized: Hands whose quaternion was renormalized.
+    """
+
+    def __init__(
+        self,
+        schema: dict[str, FieldSpec] = POSE_SCHEMA,
+        frame_schema: dict[str, FieldSpec] = FRAME_SCHEMA,
+        quaternion_tolerance: float = 0.1,
+        max_position_jump_m: float = 0.25,
+        max_rotation_jump_rad: float = 1.5,
+        jump_window_s: float = 0.25,
+    ):
+        self.pose = CompiledSchema(schema)
+        self.frame = CompiledSchema(frame_schema)
+        self.quaternion_tolerance = quaternion_tolerance
+        self.max_position_jump_m = max_position_jump_m
+        self.max_rotation_jump_rad = max_rotation_jump_rad
+        self.jump_window_s = jump_window_s
+        self._min_rotation_dot = math.cos(max_rotation_jump_rad / 2.0)
+        self._pos = self.pose.slices["pos"]
+        self._rot = self.pose.slices["rot"]
+        self._rows = np.empty((len(HANDS), self.pose.width))
+        self._present = np.ones((len(HANDS), self.pose.width), dtype=bool)
+        self._frame_row = np.empty(self.frame.width)
+        self._frame_present = np.ones(self.frame.width, dtype=bool)
+        # Last accepted pose per hand, for the jump check
+        self._last = np.full((len(HANDS), self.pose.width), np.nan)
+        self._last_enabled = np.zeros(len(HANDS), dtype=bool)
+        self._last_time = np.full(len(HANDS), -np.inf)
+
+        self.accepted = 0
+        self.rejected_packets = 0
+        self.rejected = {"json": 0, "frame": 0, "schema": 0, "non_finite": 0, "range": 0, "quaternion": 0, "jump": 0}
+        self.clipped = 0
+        self.normalized = 0
+
+    def reset(self):
+        """Forget the last poses, e.g. when another client takes control."""
+        self._last.fill(np.nan)
+        self._last_enabled[:] = False
+        self._last_time.fill(-np.inf)
+
+    def reject_packet(self, reason: str):
+        self.rejected[reason] += 1
+        self.rejected_packets += 1
+
+    def validate(self, packet) -> dict | None:
+        """Return the sanitized packet, or None if it is rejected whole."""
+        if not isinstance(packet, dict) or not self.frame.extract(packet, self._frame_row, self._frame_present):
+            self.reject_packet("frame")
+            return None
+        if not (np.isfinite(self._frame_row) | ~self._frame_present).all():
+            self.reject_packet("frame")
+            return None
+
+        # Stage every hand of the packet into the rows
+        present = []
+        for i, hand in enumerate(HANDS):
+            if hand not in packet:
+                continue
+            # A null hand is malformed, not absent: the previous valid pose is kept
+            if self.pose.extract(packet[hand], self._rows[i], self._present[i]):
+                present.append(i)
+            else:
+                self._drop(packet, hand, "schema")
+        if not present:
+            self.accepted += 1
+            return packet
+
+        index = np.array(present)
+        # Both hands (the usual keyframe) need no copy
+        rows = self._rows if len(present) == len(HANDS) else self._rows[index]
+        enabled = np.array([packet[HANDS[i]]["enabled"] for i in present])
+        bad = np.zeros(len(index), dtype=bool)
+        # Every value sent must be finite, optional fields included; only absent ones are NaN
+        finite = np.isfinite(rows) | ~self._present[index]
+        self._check(bad, finite.all(axis=1), packet, index, "non_finite")
+
+        # Bounds: clip the axes, reject anything else out of range (NaN compares False, so missing
+        # optional fields pass)
+        out_of_range = (rows < self.pose.low) | (rows > self.pose.high)
+        if out_of_range.any():
+            self._check(bad, ~(out_of_range & ~self.pose.clip).any(axis=1), packet, index, "range")
+            self.clipped += int(((out_of_range & self.pose.clip).any(axis=1) & ~bad).sum())
+            np.clip(rows, self.pose.low, self.pose.high, out=rows, where=self.pose.clip)
+
+        quaternions = rows[:, self._rot]
+        norms = np.sqrt(np.einsum("ij,ij->i", quaternions, quaternions))
+        error = np.abs(norms - 1.0)
+        self._check(bad, error <= self.quaternion_tolerance, packet, index, "quaternion")
+        unnormalized = (error > 1e-6) & ~bad
+        if unnormalized.any():
+            self.normalized += int(unnormalized.sum())
+            rows[:, self._rot] /= np.where(bad, 1.0, norms)[:, None]
+
+        # Jumps against the last accepted pose, only while the hand stays enabled
+        now = time.monotonic()
+        recent = enabled & self._last_enabled[index] & (now - self._last_time[index] <= self.jump_window_s)
+        if recent.any():
+            last = self._last[index]
+            step = rows[:, self._pos] - last[:, self._pos]
+            # The rotation angle between unit quaternions is 2 acos(|q1 . q2|)
+            dot = np.abs(np.einsum("ij,ij->i", rows[:, self._rot], last[:, self._rot]))
+            jump = recent & (
+                (np.einsum("ij,ij->i", step, step) > self.max_position_jump_m**2) | (dot < self._min_rotation_dot)
+            )
+            self._check(bad, ~jump, packet, index, "jump")
+
+        for k, i in enumerate(present):
+            if bad[k]:
+                continue
+            hand = HANDS[i]
+            values = rows[k].tolist()
+            # Missing and null optional fields are left out rather than passed on as NaN
+            pose = {name: packet[hand][name] for name, _ in self.pose.flags if packet[hand].get(name) is not None}
+            for name, spec, offset in self.pose.numeric:
+                if packet[hand].get(name) is not None:
+                    pose[name] = values[self.pose.slices[name]] if spec.kind == "vector" else values[offset]
+            packet[hand] = pose
+            self._last[i] = values
+            self._last_enabled[i] = enabled[k]
+            self._last_time[i] = now
+        self.accepted += 1
+        return packet
+
+    def _check(self, bad: np.ndarray, ok: np.ndarray, packet: dict, index: np.ndarray, reason: str):
+        """Drop the hands failing a check that passed the previous ones."""
+        failed = ~ok & ~bad
+        if not failed.any():
+            return
+        for k in np.flatnonzero(failed):
+            self._drop(packet, HANDS[index[k]], reason)
+        bad |= failed
+
+    def _drop(self, packet: dict, hand: str, reason: str):
+        del packet[hand]
+        self.rejected[reason] += 1
+
+    def stats(self) -> dict:
+        return {
+            "accepted": self.accepted,
+            "rejected_packets": self.rejected_packets,
+            "rejected": dict(self.rejected),
+            "clipped": self.clipped,
+            "normalized": self.normalized,
+        }
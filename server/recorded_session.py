@@ -0,0 +1,392 @@
+import bisect
+import json
+import mmap
+import os
+import threading
+import time
+from collections.abc import Callable
+from fractions import Fraction
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import av
+import numpy as np
+
+from base.frame_cache import CapturedFrame
+
+# A recorded session is a directory with one video per camera and the robot state:
+#   <camera>.mp4   H.264, keyframe every gop frames, pts in ms since the start
+#   joints.jsonl   {"t": s, "joints": {arm: {motor.pos: value}}, "tick_ms": ms, "enabled": {hand: bool}}
+JOINTS_FILE = "joints.jsonl"
+VIDEO_SUFFIX = ".mp4"
+KEYFRAME_INDEX_SUFFIX = ".keyframes.json"
+
+
+class SessionRecorder:
+    """
+    Records camera frames and robot state into a session directory for `SessionPlayback`.
+
+    Frames are encoded from the I420 product of the `CapturedFrame`, shared
+    with the WebRTC tracks, so recording adds no color conversion.
+
+    Attributes:
+        path: Session directory.
+        fps: Nominal frame rate, only used as a rate hint in the container.
+        gop: Keyframe interval in frames, which bounds the decoding needed to seek.
+    """
+
+    def __init__(self, path: str, fps: float = 30.0, gop: int = 30, codec: str = "libx264"):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.fps = fps
+        self.gop = gop
+        self.codec = codec
+        self._start = time.perf_counter()
+        self._videos: Dict[str, tuple] = {}
+        self._joints_file = open(self.path / JOINTS_FILE, "w", encoding="utf-8")
+        self._joints_lock = threading.Lock()
+        self.frames_recorded = 0
+
+    def _open_video(self, camera_name: str, width: int, height: int):
+        container = av.open(str(self.path / f"{camera_name}{VIDEO_SUFFIX}"), mode="w")
+        stream = container.add_stream(self.codec, rate=int(round(self.fps)))
+        stream.width, stream.height = width, height
+        stream.pix_fmt = "yuv420p"
+        stream.time_base = Fraction(1, 1000)
+        stream.codec_context.time_base = Fraction(1, 1000)
+        stream.options = {"preset": "veryfast", "g": str(self.gop), "keyint_min": str(self.gop)}
+        self._videos[camera_name] = (container, stream, -1)
+        return self._videos[camera_name]
+
+    def record_frame(self, camera_name: str, captured: CapturedFrame):
+        if not captured.has_yuv420:
+            return
+        entry = self._videos.get(camera_name) or self._open_video(camera_name, captured.width, captured.height)
+        container, stream, last_pts = entry
+        pts = int((captured.timestamp - self._start) * 1000.0)
+        if pts <= last_pts:
+            # Same frame again (the camera had nothing new) or clock tie, pts must increase
+            return
+        frame = av.VideoFrame.from_ndarray(captured.yuv420, format="yuv420p")
+        frame.pts = pts
+        frame.time_base = Fraction(1, 1000)
+        for packet in stream.encode(frame):
+            container.mux(packet)
+        self._videos[camera_name] = (container, stream, pts)
+        self.frames_recorded += 1
+
+    def record_state(self, joints: dict, tick_ms: float, enabled: dict):
+        line = json.dumps({
+            "t": round(time.perf_counter() - self._start, 4),
+            "joints": joints,
+            "tick_ms": round(tick_ms, 2),
+            "enabled": enabled,
+        }, separators=(",", ":"), default=float)
+        with self._joints_lock:
+            self._joints_file.write(line + "\n")
+
+    def close(self):
+        for container, stream, _ in self._videos.values():
+            for packet in stream.encode(None):
+                container.mux(packet)
+            container.close()
+        self._videos.clear()
+        with self._joints_lock:
+            self._joints_file.close()
+
+
+class KeyframeIndex:
+    """
+    Presentation times (s) of the keyframes and frames of a video.
+
+    Built once per file by demuxing without decoding, then stored next to the
+    video and reused as long as the file size and mtime match.
+    """
+
+    def __init__(self, keyframes: List[float], frames: int, duration: float, fps: float):
+        self.keyframes = keyframes
+        self.frames = frames
+        self.duration = duration
+        self.fps = fps
+
+    def keyframe_before(self, t: float) -> float:
+        i = bisect.bisect_right(self.keyframes, t) - 1
+        return self.keyframes[max(i, 0)]
+
+    def keyframe_after(self, t: float) -> float:
+        i = bisect.bisect_right(self.keyframes, t)
+        return self.keyframes[i] if i < len(self.keyframes) else float("inf")
+
+    @classmethod
+    def build(cls, path: str) -> "KeyframeIndex":
+        with av.open(path) as container:
+            stream = container.streams.video[0]
+            keyframes, times = [], []
+            for packet in container.demux(stream):
+                if packet.pts is None:
+                    continue
+                t = float(packet.pts * packet.time_base)
+                times.append(t)
+                if packet.is_keyframe:
+                    keyframes.append(t)
+        times.sort()
+        duration = times[-1] if times else 0.0
+        fps = (len(times) - 1) / (times[-1] - times[0]) if len(times) > 1 and times[-1] > times[0] else 30.0
+        return cls(sorted(keyframes) or [0.0], len(times), duration, fps)
+
+    @classmethod
+    def load(cls, path: str) -> "KeyframeIndex":
+        """The index of path, from its sidecar file when it is up to date, else built and saved."""
+        stat = os.stat(path)
+        sidecar = Path(str(path) + KEYFRAME_INDEX_SUFFIX)
+        if sidecar.exists():
+            data = json.loads(sidecar.read_text(encoding="utf-8"))
+            if data.get("size") == stat.st_size and data.get("mtime") == stat.st_mtime:
+                return cls(data["keyframes"], data["frames"], data["duration"], data["fps"])
+        index = cls.build(path)
+        try:
+            sidecar.write_text(json.dumps({
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+                "keyframes": index.keyframes,
+                "frames": index.frames,
+                "duration": index.duration,
+                "fps": index.fps,
+            }), encoding="utf-8")
+        except OSError:
+            pass  # Read-only location, the index is rebuilt next time
+        return index
+
+
+class VideoPlayback:
+    """
+    Random access to the frames of one video by presentation time.
+
+    The file is memory-mapped (or streamed from disk) and demuxed by av.
+    Playing forward decodes sequentially; going back or jumping past the next
+    keyframe seeks to the keyframe before the target first.
+    """
+
+    def __init__(self, path: str, use_mmap: bool = True):
+        self.path = path
+        self.index = KeyframeIndex.load(path)
+        self._file = None
+        self._mmap = None
+        if use_mmap:
+            self._file = open(path, "rb")
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.container = av.open(self._mmap, mode="r")
+        else:
+            self.container = av.open(path, mode="r")
+        self.stream = self.container.streams.video[0]
+        self.stream.thread_type = "AUTO"
+        self._frames = None
+        self._pending = None
+        self.position = float("-inf")
+        self.seeks = 0
+        self.decoded = 0
+
+    def seek(self, t: float):
+        keyframe = self.index.keyframe_before(t)
+        self.container.seek(int(keyframe / self.stream.time_base), stream=self.stream, backward=True, any_frame=False)
+        self._frames = self.container.decode(self.stream)
+        self._pending = None
+        self.position = float("-inf")
+        self.seeks += 1
+
+    def frame_at(self, t: float) -> Optional[av.VideoFrame]:
+        """The newest frame presented at or before t, None if it was already returned or t is before the first."""
+        # Decoding forward up to the next keyframe is cheaper than a seek, beyond it seeking wins
+        if self._frames is None or t < self.position or self.index.keyframe_before(t) > self.index.keyframe_after(self.position):
+            self.seek(t)
+        frame = None
+        while True:
+            if self._pending is None:
+                self._pending = next(self._frames, None)
+                if self._pending is None:
+                    break
+                self.decoded += 1
+            if self._pending.time is not None and self._pending.time > t:
+                break
+            frame, self._pending = self._pending, None
+        if frame is not None:
+            self.position = frame.time
+        return frame
+
+    def close(self):
+        self.container.close()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._file.close()
+
+
+def load_joint_states(path: str) -> tuple[np.ndarray, list]:
+    """(times, states) of a joints.jsonl file, sorted by time."""
+    states = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                states.append(json.loads(line))
+    states.sort(key=lambda state: state["t"])
+    return np.array([state["t"] for state in states]), states
+
+
+class SessionPlayback:
+    """
+    Plays a recorded session into the servers, as if a robot were running.
+
+    Frames go to camera_sink (e.g. `WebRTCCameraServer.update_camera_captured_frame`)
+    and joint states to state_sink (e.g. `VRHeadset.publish_state`), at the
+    recorded timing scaled by speed, or with speed None as fast as possible.
+    Frames are decoded to I420, which is seeded into the `CapturedFrame` so
+    the tracks encode it without any color conversion. This gives the web-ui
+    a deterministic workload through the regular /cameras and /offer
+    endpoints and state push.
+
+    Attributes:
+        path: Session directory.
+        cameras: Camera name -> `VideoPlayback`.
+        duration: Length of the session (s).
+        position: Current playback time (s).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        camera_sink: Optional[Callable[[str, CapturedFrame], None]] = None,
+        state_sink: Optional[Callable[..., None]] = None,
+        speed: Optional[float] = 1.0,
+        loop: bool = True,
+        use_mmap: bool = True,
+    ):
+        self.path = Path(path)
+        self.camera_sink = camera_sink
+        self.state_sink = state_sink
+        self.speed = speed
+        self.loop = loop
+        self.cameras: Dict[str, VideoPlayback] = {
+            video.name[:-len(VIDEO_SUFFIX)]: VideoPlayback(str(video), use_mmap)
+            for video in sorted(self.path.glob(f"*{VIDEO_SUFFIX}"))
+        }
+        joints_path = self.path / JOINTS_FILE
+        self.state_times, self.states = load_joint_states(str(joints_path)) if joints_path.exists() else (np.zeros(0), [])
+        if not self.cameras and not self.states:
+            raise FileNotFoundError(f"No videos or {JOINTS_FILE} in session {self.path}")
+        self.duration = max(
+            [video.index.duration for video in self.cameras.values()]
+            + [float(self.state_times[-1]) if len(self.state_times) else 0.0]
+        )
+        self.frame_period = 1.0 / max([video.index.fps for video in self.cameras.values()] or [30.0])
+        self.position = 0.0
+        self.frames_pushed = 0
+        self.states_pushed = 0
+        self.loops = 0
+        self.decode_time_s = 0.0
+        self.max_lateness_s = 0.0
+        self._state_cursor = 0
+        self._seek_to: Optional[float] = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, position: float = 0.0):
+        self.seek(position)
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="session_playback", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        for video in self.cameras.values():
+            video.close()
+
+    def seek(self, position: float):
+        """Jump to position (s); applied by the playback thread before its next step."""
+        with self._lock:
+            self._seek_to = min(max(0.0, position), self.duration)
+
+    def set_speed(self, speed: Optional[float]):
+        with self._lock:
+            self.speed = speed
+            # Re-anchor the clock at the current position
+            self._seek_to = self.position if self._seek_to is None else self._seek_to
+
+    def _push(self, position: float):
+        # Every state up to position, in order, so as-fast-as-possible runs push all of them
+        while self._state_cursor < len(self.states) and self.state_times[self._state_cursor] <= position:
+            state = self.states[self._state_cursor]
+            self._state_cursor += 1
+            if self.state_sink is not None:
+                self.state_sink(state["joints"], state.get("tick_ms", 0.0), state.get("enabled", {}))
+            self.states_pushed += 1
+
+        for name, video in self.cameras.items():
+            start = time.perf_counter()
+            frame = video.frame_at(position)
+            if frame is None:
+                continue
+            yuv = frame.to_ndarray(format="yuv420p") if frame.width % 2 == 0 and frame.height % 2 == 0 else None
+            captured = CapturedFrame(frame.to_ndarray(format="rgb24"), "rgb", name, video.decoded)
+            if yuv is not None:
+                captured.seed("yuv420", yuv)
+            self.decode_time_s += time.perf_counter() - start
+            if self.camera_sink is not None:
+                self.camera_sink(name, captured)
+            self.frames_pushed += 1
+
+    def _run(self):
+        wall_start = time.perf_counter()
+        anchor = 0.0
+        while not self._stop_event.is_set():
+            with self._lock:
+                seek_to, self._seek_to = self._seek_to, None
+                speed = self.speed
+            if seek_to is not None:
+                anchor = seek_to
+                wall_start = time.perf_counter()
+                self._state_cursor = bisect.bisect_left(self.state_times.tolist(), seek_to)
+                self.position = seek_to
+
+            if speed is None:
+                position = self.position
+            else:
+                position = anchor + (time.perf_counter() - wall_start) * speed
+            self._push(position)
+            self.position = position
+
+            if position >= self.duration:
+                if not self.loop:
+                    break
+                self.loops += 1
+                self.seek(0.0)
+                continue
+
+            # Next event: the next joint state or the next video frame
+            next_event = position + self.frame_period
+            if self._state_cursor < len(self.states):
+                next_event = min(next_event, float(self.state_times[self._state_cursor]))
+            if speed is None:
+                self.position = next_event
+                continue
+            delay = (next_event - position) / speed
+            lateness = (time.perf_counter() - wall_start) * speed + anchor - position
+            self.max_lateness_s = max(self.max_lateness_s, lateness)
+            if delay > 0:
+                self._stop_event.wait(delay)
+
+    def status(self) -> dict:
+        return {
+            "position": self.position,
+            "duration": self.duration,
+            "speed": self.speed,
+            "cameras": list(self.cameras),
+            "frames_pushed": self.frames_pushed,
+            "states_pushed": self.states_pushed,
+            "loops": self.loops,
+            "seeks": {name: video.seeks for name, video in self.cameras.items()},
+            "decode_ms_per_frame": 1000.0 * self.decode_time_s / self.frames_pushed if self.frames_pushed else 0.0,
+            "max_lateness_ms": 1000.0 * self.max_lateness_s,
+        }
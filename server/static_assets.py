@@ -0,0 +1,174 @@
+import gzip
+import hashlib
+from html import escape as html_escape
+import mimetypes
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+from aiohttp import web
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip only without it
+    brotli = None
+
+# Local scripts referenced by index.html, rewritten to content-hashed URLs
+_SCRIPT_SRC = re.compile(r'(<script[^>]*\ssrc=")(js/[^"?]+)(")')
+_HEAD = re.compile(r"<head[^>]*>", re.IGNORECASE)
+
+_COMPRESSIBLE = ("text/", "application/javascript", "application/json", "image/svg+xml")
+_IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+@dataclass
+class StaticAsset:
+    """One file of the web-ui bundle, held in memory with its pre-compressed variants."""
+
+    url: str
+    content_type: str
+    body: bytes
+    etag: str
+    gzip_body: Optional[bytes] = None
+    brotli_body: Optional[bytes] = None
+
+
+def _make_asset(url: str, body: bytes, content_type: str) -> StaticAsset:
+    asset = StaticAsset(url, content_type, body, f'"{hashlib.sha1(body).hexdigest()[:16]}"')
+    if content_type.startswith(_COMPRESSIBLE) and len(body) > 256:
+        asset.gzip_body = gzip.compress(body, compresslevel=9, mtime=0)
+        if brotli is not None:
+            asset.brotli_body = brotli.compress(body, quality=11)
+    return asset
+
+
+class StaticAssetBundle:
+    """
+    The web-ui served from memory.
+
+    Every file is read and compressed (gzip, and brotli when installed) once
+    at load time. Responses carry an ETag; scripts are linked from index.html
+    with a content hash in their URL (`js/app.js?v=<etag>`), so a request for
+    the current version is cached as immutable while index.html itself is
+    always revalidated and picks up new script versions.
+
+    In dev mode the files are re-checked (at most every reload_interval_s) and
+    the bundle is rebuilt when one of them changed, so edits show up on the
+    next headset reload without restarting the server.
+
+    Attributes:
+        root: The web-ui directory.
+        dev_mode: Reload changed files.
+        page_meta: `<meta name content>` pairs added to index.html, server
+            settings for the scripts (e.g. the VR WebSocket port).
+        assets: URL path -> asset.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        dev_mode: bool = False,
+        reload_interval_s: float = 0.5,
+        page_meta: Optional[Dict[str, str]] = None,
+    ):
+        self.root = Path(root)
+        self.dev_mode = dev_mode
+        self.page_meta = dict(page_meta or {})
+        self.reload_interval_s = reload_interval_s
+        self.assets: Dict[str, StaticAsset] = {}
+        self._mtimes: Dict[Path, float] = {}
+        self._checked_at = 0.0
+
+    def _files(self):
+        if not self.root.exists():
+            return []
+        files = [self.root / "index.html"] if (self.root / "index.html").exists() else []
+        js_dir = self.root / "js"
+        if js_dir.exists():
+            files.extend(sorted(path for path in js_dir.rglob("*") if path.is_file()))
+        return files
+
+    def load(self):
+        """(Re)build the bundle from disk."""
+        assets = {}
+        mtimes = {}
+        index = None
+        for path in self._files():
+            mtimes[path] = path.stat().st_mtime
+            if path.name == "index.html" and path.parent == self.root:
+                index = path
+                continue
+            url = "/" + path.relative_to(self.root).as_posix()
+            content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+            assets[url] = _make_asset(url, path.read_bytes(), content_type)
+
+        if index is not None:
+            def versioned(match):
+                asset = assets.get("/" + match.group(2))
+                if asset is None:
+                    return match.group(0)
+                return f"{match.group(1)}{match.group(2)}?v={asset.etag.strip(chr(34))}{match.group(3)}"
+
+            html = _SCRIPT_SRC.sub(versioned, index.read_text(encoding="utf-8"))
+            if self.page_meta:
+                # First in <head>, so the scripts can read them when they load
+                meta = "".join(
+                    f'\n    <meta name="{html_escape(name)}" content="{html_escape(str(value))}">'
+                    for name, value in self.page_meta.items()
+                )
+                html = _HEAD.sub(lambda match: match.group(0) + meta, html, count=1)
+            assets["/"] = _make_asset("/", html.encode("utf-8"), "text/html")
+
+        self.assets = assets
+        self._mtimes = mtimes
+        self._checked_at = time.monotonic()
+
+    def _reload_if_changed(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval_s:
+            return
+        self._checked_at = now
+        files = self._files()
+        changed = set(files) != set(self._mtimes) or any(
+            path.stat().st_mtime != self._mtimes[path] for path in files
+        )
+        if changed:
+            self.load()
+
+    def response(self, request: web.Request) -> web.StreamResponse:
+        if self.dev_mode:
+            self._reload_if_changed()
+        asset = self.assets.get(request.path)
+        if asset is None:
+            raise web.HTTPNotFound()
+
+        # Scripts requested with their current hash never change, everything else is revalidated
+        version = request.query.get("v")
+        immutable = version is not None and f'"{version}"' == asset.etag and not self.dev_mode
+        headers = {
+            "ETag": asset.etag,
+            "Cache-Control": _IMMUTABLE if immutable else "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        if request.headers.get("If-None-Match") == asset.etag:
+            return web.Response(status=304, headers=headers)
+
+        body = asset.body
+        accept = request.headers.get("Accept-Encoding", "")
+        if asset.brotli_body is not None and "br" in accept:
+            body = asset.brotli_body
+            headers["Content-Encoding"] = "br"
+        elif asset.gzip_body is not None and "gzip" in accept:
+            body = asset.gzip_body
+            headers["Content-Encoding"] = "gzip"
+        return web.Response(body=body, content_type=asset.content_type, headers=headers)
+
+    def stats(self) -> dict:
+        return {
+            "assets": len(self.assets),
+            "bytes": sum(len(asset.body) for asset in self.assets.values()),
+            "gzip_bytes": sum(len(asset.gzip_body or asset.body) for asset in self.assets.values()),
+            "brotli": brotli is not None,
+        }
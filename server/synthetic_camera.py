@@ -0,0 +1,248 @@
+import threading
+import time
+from collections.abc import Callable
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+# Frame code: sync pattern, 32-bit frame counter, 32-bit capture time (ms, wrapping) and an 8-bit checksum
+_SYNC_BITS = [1, 0, 1, 1, 0, 0, 1, 0]
+_CODE_BITS = len(_SYNC_BITS) + 32 + 32 + 8
+
+
+def _to_bits(value: int, count: int) -> List[int]:
+    return [(value >> (count - 1 - i)) & 1 for i in range(count)]
+
+
+def _from_bits(bits) -> int:
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bit)
+    return value
+
+
+def _checksum(counter: int, timestamp_ms: int) -> int:
+    data = counter.to_bytes(4, "big") + timestamp_ms.to_bytes(4, "big")
+    checksum = 0
+    for byte in data:
+        checksum = ((checksum << 1) | (checksum >> 7)) & 0xFF
+        checksum ^= byte
+    return checksum
+
+
+def _block_centers(width: int, block: int) -> np.ndarray:
+    """(row, col) pixel centers of the code blocks, wrapped over as many rows as needed."""
+    per_row = max(1, width // block)
+    index = np.arange(_CODE_BITS)
+    rows, cols = index // per_row, index % per_row
+    return np.stack([rows * block + block // 2, cols * block + block // 2], axis=1)
+
+
+def encode_frame_code(frame: np.ndarray, counter: int, timestamp_ms: int, block: int = 16) -> np.ndarray:
+    """
+    Stamp a machine-readable frame code into the top rows of frame (in place).
+
+    Bits are drawn as block x block black/white squares, large enough to
+    survive lossy video encoding and scaling by the browser or aiortc.
+    """
+    counter &= 0xFFFFFFFF
+    timestamp_ms &= 0xFFFFFFFF
+    bits = _SYNC_BITS + _to_bits(counter, 32) + _to_bits(timestamp_ms, 32) + _to_bits(_checksum(counter, timestamp_ms), 8)
+    per_row = max(1, frame.shape[1] // block)
+    for i, bit in enumerate(bits):
+        row, col = divmod(i, per_row)
+        frame[row * block:(row + 1) * block, col * block:(col + 1) * block] = 255 if bit else 0
+    return frame
+
+
+def decode_frame_code(frame: np.ndarray, block: int = 16) -> Optional[tuple[int, int]]:
+    """(counter, timestamp_ms) of a frame stamped by `encode_frame_code`, None if unreadable."""
+    centers = _block_centers(frame.shape[1], block)
+    if centers[-1, 0] >= frame.shape[0]:
+        return None
+    samples = frame[centers[:, 0], centers[:, 1]]
+    luma = samples.mean(axis=1) if samples.ndim == 2 else samples
+    bits = (luma > 127).astype(int).tolist()
+    if bits[:len(_SYNC_BITS)] != _SYNC_BITS:
+        return None
+    offset = len(_SYNC_BITS)
+    counter = _from_bits(bits[offset:offset + 32])
+    timestamp_ms = _from_bits(bits[offset + 32:offset + 64])
+    if _from_bits(bits[offset + 64:offset + 72]) != _checksum(counter, timestamp_ms):
+        return None
+    return counter, timestamp_ms
+
+
+def wall_clock_ms() -> int:
+    """Capture clock of the frame codes, wrapping at 2^32 ms like the code itself."""
+    return int(time.time() * 1000.0) & 0xFFFFFFFF
+
+
+class FrameCodeStats:
+    """
+    Receiver-side accounting of decoded frame codes.
+
+    Dropped frames are gaps in the counter, duplicates are repeated counters
+    (the track re-sending the same buffer), and latency is the receive time
+    minus the embedded capture time; sender and receiver must share a clock,
+    i.e. run on the same host.
+    """
+
+    def __init__(self):
+        self.received = 0
+        self.undecodable = 0
+        self.duplicates = 0
+        self.dropped = 0
+        self.out_of_order = 0
+        self.latencies_ms: List[float] = []
+        self.arrival_times: List[float] = []
+        self._last_counter: Optional[int] = None
+
+    def record(self, code: Optional[tuple[int, int]], receive_ms: Optional[int] = None):
+        self.arrival_times.append(time.perf_counter())
+        if code is None:
+            self.undecodable += 1
+            return
+        counter, timestamp_ms = code
+        receive_ms = wall_clock_ms() if receive_ms is None else receive_ms
+        self.received += 1
+        self.latencies_ms.append(float((receive_ms - timestamp_ms) & 0xFFFFFFFF))
+        if self._last_counter is not None:
+            if counter == self._last_counter:
+                self.duplicates += 1
+            elif counter < self._last_counter:
+                # Late, not lost: it was counted as dropped when the gap was seen
+                self.out_of_order += 1
+                self.dropped = max(0, self.dropped - 1)
+            else:
+                self.dropped += counter - self._last_counter - 1
+        if self._last_counter is None or counter > self._last_counter:
+            self._last_counter = counter
+
+    def summary(self) -> dict:
+        latencies = np.array(self.latencies_ms) if self.latencies_ms else np.zeros(1)
+        intervals = np.diff(self.arrival_times) * 1000.0 if len(self.arrival_times) > 1 else np.zeros(1)
+        duration = self.arrival_times[-1] - self.arrival_times[0] if len(self.arrival_times) > 1 else 0.0
+        unique = self.received - self.duplicates
+        return {
+            "frames": self.received + self.undecodable,
+            "fps": (len(self.arrival_times) - 1) / duration if duration > 0 else 0.0,
+            "undecodable": self.undecodable,
+            "duplicates": self.duplicates,
+            "dropped": self.dropped,
+            "drop_ratio": self.dropped / (unique + self.dropped) if unique + self.dropped else 0.0,
+            "out_of_order": self.out_of_order,
+            "latency_ms_p50": float(np.percentile(latencies, 50)),
+            "latency_ms_p95": float(np.percentile(latencies, 95)),
+            "jitter_ms": float(np.std(intervals)),
+        }
+
+
+def render_test_pattern(width: int, height: int, counter: int, fps: float) -> np.ndarray:
+    """Color bars with a moving sweep, so the encoder has motion to work on."""
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    bars = np.array([
+        [255, 255, 255], [0, 255, 255], [255, 255, 0], [0, 255, 0],
+        [255, 0, 255], [0, 0, 255], [255, 0, 0], [0, 0, 0],
+    ], dtype=np.uint8)
+    frame[:] = bars[np.arange(width) * len(bars) // width][None, :, :]
+    sweep = int((counter / fps * 0.25 % 1.0) * width)
+    frame[:, max(0, sweep - 8):sweep + 8] = 128
+    cv2.putText(frame, f"#{counter}", (16, height - 24), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 0), 5)
+    cv2.putText(frame, f"#{counter}", (16, height - 24), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 2)
+    return frame
+
+
+class SyntheticCameraSource:
+    """
+    Feeds generated frames to `WebRTCCameraServer` tracks at a fixed rate, without cameras.
+
+    Every frame carries a frame code (counter + capture time) that the
+    receiving side decodes with `decode_frame_code` / `FrameCodeStats` to
+    measure dropped and duplicated frames and end-to-end latency.
+
+    The picture is a test pattern, or with `pattern="sim"` the cameras of a
+    `SimDuoRobot` rendering the SO101 meshes.
+
+    Attributes:
+        sink: Called with (camera_name, frame), e.g. `WebRTCCameraServer.update_camera_frame`.
+        camera_names: Cameras to feed.
+        width, height: Frame size.
+        fps: Frame rate.
+        pattern: "bars" or "sim".
+        frames_generated: Frames produced per camera.
+    """
+
+    def __init__(
+        self,
+        sink: Callable[[str, np.ndarray], None],
+        camera_names,
+        width: int = 640,
+        height: int = 480,
+        fps: float = 30.0,
+        pattern: str = "bars",
+        block: int = 16,
+    ):
+        if pattern not in ("bars", "sim"):
+            raise ValueError(f"Unknown pattern {pattern!r}, expected 'bars' or 'sim'")
+        self.sink = sink
+        self.camera_names = list(camera_names)
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.pattern = pattern
+        self.block = block
+        self.frames_generated = 0
+        self.overruns = 0
+        self._sim = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self.pattern == "sim":
+            from base.sim_duo_robot import SimDuoRobot, SimDuoRobotConfig
+
+            self._sim = SimDuoRobot(SimDuoRobotConfig(
+                cameras={name: (self.width, self.height) for name in self.camera_names},
+                camera_fps=self.fps,
+            ))
+            self._sim.connect()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="synthetic_camera", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if self._sim is not None:
+            self._sim.disconnect()
+            self._sim = None
+
+    def _frame(self, camera_name: str, counter: int) -> np.ndarray:
+        if self._sim is not None:
+            # The tracks expect BGR like OpenCV captures
+            frame = cv2.cvtColor(self._sim.cameras[camera_name].async_read(timeout_ms=1000), cv2.COLOR_RGB2BGR)
+        else:
+            frame = render_test_pattern(self.width, self.height, counter, self.fps)
+        return encode_frame_code(frame, counter, wall_clock_ms(), self.block)
+
+    def _run(self):
+        period = 1.0 / self.fps
+        next_time = time.perf_counter()
+        counter = 0
+        while not self._stop_event.is_set():
+            for camera_name in self.camera_names:
+                self.sink(camera_name, self._frame(camera_name, counter))
+            counter += 1
+            self.frames_generated = counter
+
+            next_time += period
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                self.overruns += 1
+                next_time = time.perf_counter()
@@ -0,0 +1,33 @@
+import ssl
+import threading
+from pathlib import Path
+from typing import Dict, Tuple
+
+_contexts: Dict[Tuple[str, str], ssl.SSLContext] = {}
+_contexts_lock = threading.Lock()
+
+# Tickets issued per full handshake; a reconnecting client spends one per resumption
+SESSION_TICKETS = 4
+
+
+def create_ssl_context(cert_file: str, key_file: str) -> ssl.SSLContext:
+    """
+    Server SSL context for a certificate, shared by every server using it.
+
+    The VR WebSocket and the WebRTC camera server get the same context, so
+    the certificate is loaded once and both issue session tickets from the
+    same ticket keys. A headset reconnecting after a WiFi drop resumes its
+    TLS sessions (TLS 1.3 PSK) instead of running full handshakes.
+    """
+    key = (str(Path(cert_file).resolve()), str(Path(key_file).resolve()))
+    with _contexts_lock:
+        context = _contexts.get(key)
+        if context is None:
+            context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            context.load_cert_chain(cert_file, key_file)
+            context.minimum_version = ssl.TLSVersion.TLSv1_2
+            # Stateless resumption: tickets on (TLS 1.2 and 1.3), several per handshake
+            context.options &= ~ssl.OP_NO_TICKET
+            context.num_tickets = SESSION_TICKETS
+            _contexts[key] = context
+        return context
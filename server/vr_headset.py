@@ -1,24 +1,149 @@
 import asyncio
 import json
-import ssl
+import secrets
 import threading
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Optional
 import websockets
 
+from base.pose_filter import ClockOffsetEstimator
+from server.pose_validation import PoseValidator
+from server.tls import create_ssl_context
 
-def create_ssl_context(cert_file: str, key_file: str):
-    """Create SSL context for WSS (secure WebSocket)."""
-    ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
-    ssl_context.load_cert_chain(cert_file, key_file)
-    return ssl_context
+
+class ReceiveStats:
+    """Rolling receive rate and duplicate ratio of incoming pose packets."""
+
+    def __init__(self, window_s: float = 1.0):
+        self.window_s = window_s
+        self.packets = 0
+        self.duplicates = 0
+        self.rate_hz = 0.0
+        self.duplicate_ratio = 0.0
+        self._window_start = time.perf_counter()
+        self._window_packets = 0
+        self._window_duplicates = 0
+
+    def record(self, duplicate: bool):
+        """Count one received packet."""
+        self.packets += 1
+        self._window_packets += 1
+        if duplicate:
+            self.duplicates += 1
+            self._window_duplicates += 1
+
+        now = time.perf_counter()
+        elapsed = now - self._window_start
+        if elapsed >= self.window_s:
+            self.rate_hz = self._window_packets / elapsed
+            self.duplicate_ratio = self._window_duplicates / self._window_packets
+            self._window_start = now
+            self._window_packets = 0
+            self._window_duplicates = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "rate_hz": self.rate_hz,
+            "duplicate_ratio": self.duplicate_ratio,
+            "packets": self.packets,
+            "duplicates": self.duplicates,
+        }
+
+
+@dataclass
+class VRClient:
+    """One WebSocket client of `VRHeadset`, either the controller or an observer."""
+
+    id: int
+    websocket: object = field(repr=False)
+    remote: str = ""
+    connected_at: float = field(default_factory=time.time)
+    ignored_packets: int = 0
+    # Presented by a reconnecting client to resume its session
+    token: str = field(default_factory=lambda: secrets.token_urlsafe(16))
 
 
 class VRHeadset:
+    """
+    WebSocket server receiving the controller poses of the web-ui.
+
+    Any number of clients can connect, but only one - the controller - drives
+    the robot; the others are read-only observers whose pose packets are
+    ignored. A client claims control by sending poses while nobody has it, or
+    takes it over from the current controller with {"type": "takeover"}.
+    Every client is told its role ({"type": "session"}) and receives the
+    robot state published with `publish_state` ({"type": "state"}) at
+    state_hz, serialized once and skipped for clients that do not keep up, so
+    idle observers cost the control path nothing.
+
+    Sessions survive WiFi drops: every client gets a token, and a client
+    reconnecting with {"type": "resume", "token"} gets its role back at once,
+    even before the dead connection has timed out. Control stays reserved for
+    the dropped controller during resume_window_s, while the arms hold, and
+    the processor pipelines keep their state (latched references, filters),
+    so teleoperation continues where it stopped. Any other change of the
+    pose source - a new controller, or a resume from a reloaded page, whose
+    clock and XR reference space start over - bumps controller_changes, on
+    which the teleop rebuilds its pipelines.
+
+    Pose packets are validated as they arrive (`PoseValidator`): malformed
+    or implausible hands are dropped before they reach last_observation, so
+    the control thread never hands a NaN quaternion or a wild position to IK.
+    """
+
     name = "vr_headset"
 
-    def __init__(self, use_ssl: bool = True, cert_file: str = None, key_file: str = None):
+    def __init__(
+        self,
+        use_ssl: bool = True,
+        cert_file: str = None,
+        key_file: str = None,
+        record_path: str = None,
+        state_hz: float = 10.0,
+        max_client_buffer: int = 64 * 1024,
+        resume_window_s: float = 10.0,
+        ping_interval_s: float = 2.0,
+        host: str = "0.0.0.0",
+        port: int = 8080,
+    ):
+        self.host = host
+        self.port = port
         self.connected = False
         self.last_observation = None
+        # Merged packets while a hand has no valid state yet, see _merge_packet
+        self._partial_observation = None
+        self.receive_stats = ReceiveStats()
+        self.validator = PoseValidator()
+        # Client sample times -> server clock, for the pose prediction horizon
+        self.clock = ClockOffsetEstimator()
+        self._last_poses = {}
+        # Session arbitration
+        self.clients: dict[int, VRClient] = {}
+        self.controller_id: Optional[int] = None
+        self.takeovers = 0
+        self.controller_changes = 0
+        self._last_client_t = None
+        self._next_client_id = 1
+        # Session resumption
+        self.resume_window_s = resume_window_s
+        self.ping_interval_s = ping_interval_s
+        self.resumes = 0
+        self.resume_gaps_ms: list[float] = []
+        self.client_reconnect_timing: Optional[dict] = None
+        self._reserved_token: Optional[str] = None
+        self._reserved_at = 0.0
+        self._last_packet_at = 0.0
+        # Robot state push, published by the control loop and sent by the broadcast task
+        self.state_hz = state_hz
+        self.max_client_buffer = max_client_buffer
+        self.state_messages = 0
+        self.state_skipped = 0
+        self._state = None
+        self._state_task = None
+        # Optional JSONL recording of every received packet, used for replay evaluation
+        self._record_file = open(record_path, "a", encoding="utf-8") if record_path else None
         self._server = None
         self._loop = None
         self._thread = None
@@ -47,9 +172,37 @@ class VRHeadset:
         return self.connected
 
     async def on_observation_received(self, websocket):
+        client = VRClient(self._next_client_id, websocket, remote=str(getattr(websocket, "remote_address", "")))
+        self._next_client_id += 1
+        self.clients[client.id] = client
+        print(f"🔌 Client {client.id} connected from {client.remote} ({len(self.clients)} connected)")
+        self._send(client, self._session_message(client))
         try:
             async for message in websocket:
-                self.last_observation = json.loads(message)
+                try:
+                    packet = json.loads(message)
+                except ValueError:
+                    self.validator.reject_packet("json")
+                    continue
+                kind = packet.get("type") if isinstance(packet, dict) else None
+                if kind is None:
+                    # FramePacket, only the controller's drive the robot
+                    if self.controller_id is None and self._reservation() is None:
+                        self._set_controller(client)
+                    if client.id == self.controller_id:
+                        packet = self.validator.validate(packet)
+                        if packet is not None:
+                            self._merge_packet(packet)
+                    else:
+                        client.ignored_packets += 1
+                elif kind == "takeover":
+                    self._set_controller(client)
+                elif kind == "release" and client.id == self.controller_id:
+                    self._set_controller(None)
+                elif kind == "resume":
+                    self._resume(client, str(packet.get("token", "")))
+                elif kind == "reconnect_timing":
+                    self.client_reconnect_timing = {k: v for k, v in packet.items() if k != "type"}
                 # print("📥 Observation received:", self.last_observation)
         except websockets.ConnectionClosedOK:
             print("🔌 Connection closed normally.")
@@ -57,17 +210,238 @@ class VRHeadset:
             print(f"⚠️ Connection closed with error: {e}")
         except Exception as e:
             print(f"❌ Unexpected error in handler: {e}")
+        finally:
+            del self.clients[client.id]
+            if client.id == self.controller_id:
+                self._suspend(client)
+            print(f"🔌 Client {client.id} disconnected ({len(self.clients)} connected)")
 
-    async def start_websocket_server(self):
+    def _set_controller(self, client: Optional[VRClient], keep_pipeline: bool = False):
+        """Hand control to client (None: nobody) and tell every client its role."""
+        new_id = client.id if client is not None else None
+        if new_id == self.controller_id:
+            return
+        if self.controller_id is not None and new_id is not None and not keep_pipeline:
+            self.takeovers += 1
+        self.controller_id = new_id
+        self._reserved_token = None
+        # Another client, or the same one after a page reload, has its own clock
+        self.clock.reset()
+        if not keep_pipeline:
+            # Nothing from the previous controller may drive the robot: the arms hold until
+            # the new controller's first packet, and the teleop rebuilds its pipelines
+            # (latched EE reference, predictors) on the controller_changes bump
+            self.last_observation = None
+            self._partial_observation = None
+            self._last_poses = {}
+            self._last_client_t = None
+            self.validator.reset()
+            self.controller_changes += 1
+        print(f"🎮 Controller: {f'client {new_id}' if new_id is not None else 'none'}")
+        self._send_sessions()
+
+    def _send_sessions(self):
+        for other in list(self.clients.values()):
+            self._send(other, self._session_message(other))
+
+    def _suspend(self, client: VRClient):
+        """The controller dropped: hold the arms and keep control reserved for its token."""
+        self.controller_id = None
+        self._reserved_token = client.token
+        self._reserved_at = time.monotonic()
+        # No stale pose may drive the arms, but the pipelines keep their state for the resume
+        self.last_observation = None
+        self._partial_observation = None
+        print(f"⏸️ Controller client {client.id} dropped, reserved for {self.resume_window_s:.0f} s")
+        self._send_sessions()
+
+    def _reservation(self) -> Optional[str]:
+        if self._reserved_token is not None and time.monotonic() - self._reserved_at > self.resume_window_s:
+            print("⏸️ Controller did not come back, control is free")
+            self._reserved_token = None
+            self._last_poses = {}
+            self._send_sessions()
+        return self._reserved_token
+
+    def _resume(self, client: VRClient, token: str):
+        """Give a reconnecting client back the session of token."""
+        controller = self.clients.get(self.controller_id) if self.controller_id is not None else None
+        reserved = self._reservation()
+        if controller is not None and secrets.compare_digest(token, controller.token):
+            # The old connection is not known to be dead yet, drop it now
+            asyncio.get_running_loop().create_task(controller.websocket.close())
+        elif reserved is None or not secrets.compare_digest(token, reserved):
+            # Unknown or expired: the client continues as a new (observer) session
+            self._send(client, self._session_message(client))
+            return
+        client.token = token
+        gap_ms = (time.monotonic() - self._last_packet_at) * 1000.0 if self._last_packet_at else 0.0
+        self.resumes += 1
+        self.resume_gaps_ms = (self.resume_gaps_ms + [gap_ms])[-100:]
+        print(f"▶️ Client {client.id} resumed control, {gap_ms:.0f} ms since the last pose")
+        self._set_controller(client, keep_pipeline=True)
+
+    def _session_message(self, client: VRClient) -> str:
+        return json.dumps({
+            "type": "session",
+            "client_id": client.id,
+            "token": client.token,
+            "role": "controller" if client.id == self.controller_id else "observer",
+            "controller_id": self.controller_id,
+            "reserved": self._reserved_token is not None,
+            "clients": len(self.clients),
+        })
+
+    def _send(self, client: VRClient, message: str) -> bool:
+        """Queue message without waiting; clients whose send buffer is full are skipped."""
+        transport = getattr(client.websocket, "transport", None)
+        if transport is not None and transport.get_write_buffer_size() > self.max_client_buffer:
+            return False
+        websockets.broadcast([client.websocket], message)
+        return True
+
+    def publish_state(self, joints: dict, tick_ms: float, enabled: dict):
+        """
+        Publish the robot state pushed to the clients.
+
+        Called from the control loop: it only stores the references, the
+        serialization and sending happen on the WebSocket event loop.
+        """
+        self._state = (time.time(), joints, tick_ms, enabled)
+
+    async def _broadcast_state(self):
+        sent = None
+        while True:
+            await asyncio.sleep(1.0 / self.state_hz)
+            state = self._state
+            if state is None or state is sent or not self.clients:
+                continue
+            sent = state
+            t, joints, tick_ms, enabled = state
+            message = json.dumps({
+                "type": "state",
+                "t": round(t, 3),
+                # 0.1 degree is below what the servos resolve
+                "joints": {arm: {k: round(v, 1) for k, v in values.items()} for arm, values in joints.items()},
+                "tick_ms": round(tick_ms, 2),
+                "enabled": enabled,
+                "controller_id": self.controller_id,
+            }, separators=(",", ":"))
+            for client in list(self.clients.values()):
+                if self._send(client, message):
+                    self.state_messages += 1
+                else:
+                    self.state_skipped += 1
+
+    def get_session_stats(self) -> dict:
+        return {
+            "clients": len(self.clients),
+            "controller_id": self.controller_id,
+            "takeovers": self.takeovers,
+            "controller_changes": self.controller_changes,
+            "ignored_packets": sum(client.ignored_packets for client in self.clients.values()),
+            "resumes": self.resumes,
+            "last_resume_gap_ms": self.resume_gaps_ms[-1] if self.resume_gaps_ms else None,
+            "client_reconnect_timing": self.client_reconnect_timing,
+            "state_messages": self.state_messages,
+            "state_skipped": self.state_skipped,
+        }
+
+    def _merge_packet(self, packet: dict):
+        """Merge a (possibly delta) FramePacket into last_observation.
+
+        The web-ui only sends the hands whose pose changed since the previous
+        packet, so hands missing from the packet keep their last known state.
+        Until both hands have a valid state (e.g. the first packet of a new
+        controller had a rejected hand) nothing is published and the arms hold.
+        """
+        t_recv = time.perf_counter()
+        self._last_packet_at = time.monotonic()
+        t_client = packet.get("t")
+        if t_client is not None:
+            if self._last_client_t is not None and t_client < self._last_client_t:
+                # The client clock went back: a resume from a reloaded page, a new pose source
+                print("🎮 Controller page reloaded, re-latching")
+                self.clock.reset()
+                self.validator.reset()
+                self.last_observation = None
+                self._partial_observation = None
+                self._last_poses = {}
+                self.controller_changes += 1
+            self._last_client_t = t_client
+        previous = self.last_observation or self._partial_observation or {}
+        duplicate = packet.get("reset") == previous.get("reset") and all(
+            packet[hand] == self._last_poses.get(hand) for hand in ("left", "right") if hand in packet
+        )
+        self.receive_stats.record(duplicate)
+
+        if self._record_file is not None:
+            self._record_file.write(json.dumps({"t_recv": t_recv, **packet}) + "\n")
+
+        # Stamp each hand with its sample times for VRPosePredictor: client clock, receive
+        # time and the sample time on the server clock (network delay included)
+        t_sample = None
+        if t_client is not None:
+            self.clock.update(t_client / 1000.0, t_recv)
+            t_sample = self.clock.to_server_time(t_client / 1000.0, self._one_way_delay())
+        for hand in ("left", "right"):
+            pose = packet.get(hand)
+            if pose is not None:
+                self._last_poses[hand] = pose
+                packet[hand] = {**pose, "t": t_client, "t_recv": t_recv, "t_sample": t_sample}
+        # Swap in a new dict so readers on other threads never see a partial update
+        observation = {**previous, **packet}
+        if "left" in observation and "right" in observation:
+            self.last_observation = observation
+            self._partial_observation = None
+        else:
+            self._partial_observation = observation
+
+    def _one_way_delay(self) -> float:
+        """Half the keepalive ping round trip of the controller, the smallest network delay."""
+        controller = self.clients.get(self.controller_id) if self.controller_id is not None else None
+        if controller is None:
+            return 0.0
+        return float(getattr(controller.websocket, "latency", 0.0) or 0.0) / 2.0
+
+    def get_receive_stats(self) -> dict:
+        """Return the received packet rate, duplicate ratio and validation counters."""
+        return {**self.receive_stats.snapshot(), "validation": self.validator.stats()}
+
+    async def start(self):
+        """Start the websocket server on the running event loop."""
         protocol = "wss" if self.ssl_context else "ws"
-        print(f"🌐 WebSocket server listening on {protocol}://0.0.0.0:8080")
+        print(f"🌐 WebSocket server listening on {protocol}://{self.host}:{self.port}")
         self._server = await websockets.serve(
             self.on_observation_received, 
-            "0.0.0.0", 
-            8080,
-            ssl=self.ssl_context
+            self.host, 
+            self.port,
+            ssl=self.ssl_context,
+            # Notice a dead headset link within seconds instead of the 20 s default
+            ping_interval=self.ping_interval_s,
+            ping_timeout=self.ping_interval_s,
         )
+        self._loop = asyncio.get_running_loop()
+        self._state_task = asyncio.create_task(self._broadcast_state())
+        self.connected = True
         self._ready_event.set()  # mark as ready once server is up
+
+    async def stop(self):
+        """Close the websocket server started with start()."""
+        if self._state_task is not None:
+            self._state_task.cancel()
+            self._state_task = None
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._record_file is not None:
+            self._record_file.close()
+            self._record_file = None
+        self.connected = False
+
+    async def start_websocket_server(self):
+        await self.start()
         await self._server.wait_closed()
 
     def _run_server_thread(self):
@@ -95,6 +469,11 @@ class VRHeadset:
             print("🛑 Shutting down WebSocket server...")
             # Schedule shutdown on the server loop
             def _shutdown():
+                if self._state_task is not None:
+                    self._state_task.cancel()
                 self._server.close()
             self._loop.call_soon_threadsafe(_shutdown)
+        if self._record_file is not None:
+            self._record_file.close()
+            self._record_file = None
         self.connected = False
@@ -1,20 +1,23 @@
 import asyncio
 import json
 import logging
-import ssl
 import threading
 import time
 from pathlib import Path
 from typing import Dict, Optional
 
-import cv2
 import numpy as np
-from aiortc import RTCPeerConnection, RTCSessionDescription, VideoStreamTrack
-from aiortc.contrib.media import MediaPlayer
+from aiortc import RTCConfiguration, RTCIceServer, RTCPeerConnection, RTCSessionDescription, VideoStreamTrack
+from aiortc.contrib.media import MediaPlayer, MediaRelay
 from aiohttp import web, web_request
 from aiohttp_cors import setup as cors_setup, ResourceOptions
 import av
 
+from base.frame_cache import CapturedFrame
+from server.foveation import RoiConfig, crop_i420, foveate_i420, roi_rect
+from server.static_assets import StaticAssetBundle
+from server.tls import create_ssl_context
+
 
 class CameraStreamTrack(VideoStreamTrack):
     """Custom video track that streams camera frames."""
@@ -22,28 +25,64 @@ class CameraStreamTrack(VideoStreamTrack):
     def __init__(self, camera_name: str):
         super().__init__()
         self.camera_name = camera_name
-        self.current_frame: Optional[np.ndarray] = None
+        self.current_frame: Optional[CapturedFrame] = None
         self.frame_lock = threading.Lock()
+        self._blank_frame = CapturedFrame(np.zeros((480, 640, 3), dtype=np.uint8), camera_name=camera_name)
+        # Region-of-interest encoding, None streams the full frame
+        self.roi: Optional[RoiConfig] = None
+        self.gaze: Optional[tuple] = None
+        self.gaze_time = 0.0
         
     def update_frame(self, frame: np.ndarray):
-        """Update the current frame to be streamed."""
+        """Update the current frame to be streamed (BGR, as OpenCV captures it)."""
+        captured = CapturedFrame(frame.copy(), "bgr", self.camera_name) if frame is not None else None
+        self.update_captured_frame(captured)
+
+    def update_captured_frame(self, captured: Optional[CapturedFrame]):
+        """Stream a frame whose derived products are shared with other consumers."""
         with self.frame_lock:
-            self.current_frame = frame.copy() if frame is not None else None
+            self.current_frame = captured
     
+    def set_gaze(self, x: Optional[float], y: Optional[float]):
+        """Where the viewer looks in the frame (normalized, x right, y down), None to recenter."""
+        if x is None or y is None:
+            self.gaze = None
+            return
+        self.gaze = (min(max(float(x), 0.0), 1.0), min(max(float(y), 0.0), 1.0))
+        self.gaze_time = time.monotonic()
+
+    def roi_yuv420(self, captured: CapturedFrame) -> np.ndarray:
+        """I420 frame with the ROI encoding applied, computed once per frame and ROI position."""
+        config = self.roi
+        center = None
+        if config.follow_gaze and self.gaze is not None and time.monotonic() - self.gaze_time < config.gaze_timeout_s:
+            center = self.gaze
+        rect = roi_rect(captured.width, captured.height, config, center)
+        if config.mode == "crop":
+            return captured.product(
+                f"roi_crop_{rect}",
+                lambda: crop_i420(captured.yuv420, captured.width, captured.height, rect),
+            )
+        return captured.product(
+            f"roi_foveate_{rect}_{config.periphery_factor}",
+            lambda: foveate_i420(captured.yuv420, captured.width, captured.height, rect, config.periphery_factor),
+        )
+
     async def recv(self):
         """Generate video frames for WebRTC."""
         pts, time_base = await self.next_timestamp()
         
         with self.frame_lock:
-            if self.current_frame is not None:
-                # Convert BGR to RGB (OpenCV uses BGR by default)
-                rgb_frame = cv2.cvtColor(self.current_frame, cv2.COLOR_BGR2RGB)
-            else:
-                # Create a black frame if no frame is available
-                rgb_frame = np.zeros((480, 640, 3), dtype=np.uint8)
-                
-        # Convert numpy array to av.VideoFrame
-        frame = av.VideoFrame.from_ndarray(rgb_frame, format="rgb24")
+            # Black frame if no frame is available yet
+            captured = self.current_frame if self.current_frame is not None else self._blank_frame
+
+        # The encoder works on YUV420, handing it over directly skips its own conversion.
+        # Products are cached on the frame, so a frame sent twice is only converted once.
+        if captured.has_yuv420:
+            yuv = captured.yuv420 if self.roi is None else self.roi_yuv420(captured)
+            frame = av.VideoFrame.from_ndarray(yuv, format="yuv420p")
+        else:
+            frame = av.VideoFrame.from_ndarray(captured.rgb, format="rgb24")
         frame.pts = pts
         frame.time_base = time_base
         
@@ -57,13 +96,37 @@ class WebRTCCameraServer:
         """Simple health check endpoint."""
         return web.json_response({"status": "ok", "cameras": list(self.camera_tracks.keys())})
 
-    def __init__(self, host: str = "0.0.0.0", port: int = 8765, ssl_context=None):
+    def __init__(
+        self,
+        host: str = "0.0.0.0",
+        port: int = 8765,
+        ssl_context=None,
+        dev_mode: bool = False,
+        log_sample_every: int = 100,
+        slow_request_ms: float = 250.0,
+        ice_servers: Optional[list] = None,
+        vr_port: int = 8080,
+    ):
         self.host = host
         self.port = port
         self.ssl_context = ssl_context
+        # Request logging: errors and slow requests always, otherwise one request in log_sample_every
+        self.log_sample_every = log_sample_every
+        self.slow_request_ms = slow_request_ms
+        self.requests = 0
+        # STUN / TURN URLs for ICE; None keeps aiortc's default, [] gathers host candidates only
+        # (enough on a LAN, and no STUN round trip on every (re)connect)
+        self.ice_servers = ice_servers
+        # Peer connection per (client session, camera): a reconnecting client replaces its stale one
+        self.session_pcs: Dict[tuple, RTCPeerConnection] = {}
+        self.reconnects = 0
+        self.connect_times_ms: list = []
         self.app = web.Application()
         self.pcs: set = set()
         self.camera_tracks: Dict[str, CameraStreamTrack] = {}
+        # Fans each camera track out to every peer; without it the peers would split its frames
+        self.relay = MediaRelay()
+        self._runner: Optional[web.AppRunner] = None
         
         # Setup CORS
         cors = cors_setup(self.app, defaults={
@@ -76,15 +139,17 @@ class WebRTCCameraServer:
         
         # Setup routes
         self.app.router.add_get("/", self.index)
+        self.app.router.add_get("/js/{path:.*}", self.static_asset)
         self.app.router.add_post("/offer", self.offer)
         self.app.router.add_get("/cameras", self.get_cameras)
         self.app.router.add_get("/health", self.health_check)
+        self.app.router.add_post("/roi", self.update_roi)
         
-        # Serve static files from web-ui folder
+        # The web-ui is loaded and compressed once and served from memory
         script_dir = Path(__file__).parent.parent  # Go up to project root
-        web_ui_path = script_dir / "web-ui"
-        if web_ui_path.exists():
-            self.app.router.add_static("/js/", web_ui_path / "js", name="js")
+        # The web-ui connects to the VR WebSocket on the port it finds in the page
+        self.assets = StaticAssetBundle(script_dir / "web-ui", dev_mode=dev_mode, page_meta={"vr-ws-port": vr_port})
+        self.assets.load()
         
         # Add CORS to all routes
         for route in list(self.app.router.routes()):
@@ -103,51 +168,90 @@ class WebRTCCameraServer:
         """Update frame for a specific camera."""
         if camera_name in self.camera_tracks:
             self.camera_tracks[camera_name].update_frame(frame)
+
+    def set_camera_roi(self, camera_name: str, config: Optional[RoiConfig]):
+        """Enable (or with None disable) region-of-interest encoding of a camera."""
+        if camera_name in self.camera_tracks:
+            self.camera_tracks[camera_name].roi = config
+
+    def update_camera_captured_frame(self, camera_name: str, captured: CapturedFrame):
+        """Update a camera with a frame from a `FrameProductCache`, sharing its products."""
+        if camera_name in self.camera_tracks:
+            self.camera_tracks[camera_name].update_captured_frame(captured)
     
     async def index(self, request):
         """Serve the main HTML page from web-ui folder."""
-        import os
-        
-        # Get the project root directory (parent of server folder)
-        script_dir = Path(__file__).parent.parent
-        html_path = script_dir / 'web-ui' / 'index.html'
-        
         try:
-            with open(html_path, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-            return web.Response(text=html_content, content_type='text/html')
-        except FileNotFoundError:
+            return self.assets.response(request)
+        except web.HTTPNotFound:
             return web.Response(
                 text="<h1>Error: web-ui/index.html not found</h1>", 
                 content_type='text/html',
                 status=404
             )
+
+    async def static_asset(self, request):
+        """Serve the web-ui scripts from memory."""
+        return self.assets.response(request)
     
     async def get_cameras(self, request):
         """Return list of available cameras."""
         return web.json_response(list(self.camera_tracks.keys()))
     
+    async def update_roi(self, request):
+        """Gaze reported by the web-ui: {"camera", "x", "y"} normalized, x / y null to recenter."""
+        params = await request.json()
+        track = self.camera_tracks.get(params.get("camera"))
+        if track is None:
+            return web.json_response({"error": "unknown camera"}, status=404)
+        track.set_gaze(params.get("x"), params.get("y"))
+        # The client stops reporting gaze for cameras that do not use it
+        follows_gaze = track.roi is not None and track.roi.mode == "foveate" and track.roi.follow_gaze
+        return web.json_response({"roi": track.roi.mode if track.roi else None, "follow_gaze": follows_gaze})
+
     async def offer(self, request):
         """Handle WebRTC offer."""
         params = await request.json()
         camera_name = params.get('camera', 'default')
         
         offer = RTCSessionDescription(sdp=params["sdp"], type=params["type"])
-        
-        pc = RTCPeerConnection()
+        offer_time = time.perf_counter()
+
+        # aiortc has no ICE restart, a reconnecting client sends a fresh offer with its session
+        # id instead: its previous connection to this camera is closed right away rather than
+        # after the ICE timeout, the tracks, relay and frame products are kept as they are
+        session_key = (params["session"], camera_name) if params.get("session") else None
+        stale = self.session_pcs.pop(session_key, None) if session_key else None
+        if stale is not None:
+            self.reconnects += 1
+            self.pcs.discard(stale)
+            asyncio.ensure_future(stale.close())
+
+        if self.ice_servers is None:
+            pc = RTCPeerConnection()
+        else:
+            pc = RTCPeerConnection(RTCConfiguration(iceServers=[RTCIceServer(urls=url) for url in self.ice_servers]))
         self.pcs.add(pc)
+        if session_key:
+            self.session_pcs[session_key] = pc
         
         @pc.on("connectionstatechange")
         async def on_connectionstatechange():
             self.logger.info(f"Connection state for {camera_name}: {pc.connectionState}")
-            if pc.connectionState == "failed":
+            if pc.connectionState == "connected":
+                elapsed_ms = (time.perf_counter() - offer_time) * 1000.0
+                self.connect_times_ms = (self.connect_times_ms + [elapsed_ms])[-100:]
+                self.logger.info(f"{camera_name} connected {elapsed_ms:.0f} ms after the offer")
+            if pc.connectionState in ("failed", "closed"):
                 await pc.close()
-                if pc in self.pcs:
-                    self.pcs.discard(pc)
+                self.pcs.discard(pc)
+                if session_key and self.session_pcs.get(session_key) is pc:
+                    del self.session_pcs[session_key]
         
         # Add video track
         if camera_name in self.camera_tracks:
-            pc.addTrack(self.camera_tracks[camera_name])
+            # Unbuffered: a slow peer skips to the newest frame instead of queueing old ones
+            pc.addTrack(self.relay.subscribe(self.camera_tracks[camera_name], buffered=False))
         
         await pc.setRemoteDescription(offer)
         answer = await pc.createAnswer()
@@ -161,28 +265,39 @@ class WebRTCCameraServer:
     async def start_server(self):
         """Start the WebRTC server with optional HTTPS support."""
         
-        # Add middleware for better request logging
+        # Sampled request logging, a single line and no formatting for requests that are not logged
         @web.middleware
         async def logging_middleware(request, handler):
-            start_time = time.time()
+            start_time = time.perf_counter()
             try:
-                self.logger.info(f"Incoming request: {request.method} {request.path} from {request.remote}")
-                
                 response = await handler(request)
-                
-                process_time = time.time() - start_time
-                self.logger.info(f"Response: {response.status} in {process_time:.3f}s")
-                return response
-                
+            except web.HTTPException as e:
+                response = e
             except Exception as e:
-                self.logger.error(f"Error processing request: {e}")
+                self.logger.error("Error processing %s %s: %s", request.method, request.path, e)
                 return web.Response(status=500, text=f"Server error: {str(e)}")
+
+            self.requests += 1
+            elapsed_ms = (time.perf_counter() - start_time) * 1000.0
+            if (
+                response.status >= 400
+                or elapsed_ms > self.slow_request_ms
+                or self.requests % self.log_sample_every == 0
+            ):
+                self.logger.info(
+                    "%s %s from %s: %d in %.1f ms (%d requests)",
+                    request.method, request.path, request.remote, response.status, elapsed_ms, self.requests,
+                )
+            if isinstance(response, web.HTTPException):
+                raise response
+            return response
         
         # Add the middleware to the app
         self.app.middlewares.append(logging_middleware)
         
         runner = web.AppRunner(self.app)
         await runner.setup()
+        self._runner = runner
         
         # Create site with or without SSL
         if self.ssl_context:
@@ -204,6 +319,15 @@ class WebRTCCameraServer:
         except:
             self.logger.info(f"Could not determine local IP")
     
+    async def stop_server(self):
+        """Close every peer connection and stop the HTTP server."""
+        await asyncio.gather(*(pc.close() for pc in list(self.pcs)), return_exceptions=True)
+        self.pcs.clear()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+        self.logger.info("WebRTC Camera Server stopped")
+
     def run_in_thread(self):
         """Run the server in a background thread."""
         loop = asyncio.new_event_loop()
@@ -219,14 +343,17 @@ class WebRTCCameraServer:
         loop.run_until_complete(run())
 
 
-def create_ssl_context(cert_file: str, key_file: str):
-    """Create SSL context for HTTPS."""
-    ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
-    ssl_context.load_cert_chain(cert_file, key_file)
-    return ssl_context
-
-
-def create_camera_server(camera_names, use_https=False, cert_file=None, key_file=None) -> WebRTCCameraServer:
+def create_camera_server(
+    camera_names,
+    use_https=False,
+    cert_file=None,
+    key_file=None,
+    roi: Optional[Dict[str, RoiConfig]] = None,
+    dev_mode: bool = False,
+    ice_servers: Optional[list] = None,
+    port: int = 8765,
+    vr_port: int = 8080,
+) -> WebRTCCameraServer:
     """Create and configure the camera server."""
     ssl_context = None
     
@@ -238,11 +365,15 @@ def create_camera_server(camera_names, use_https=False, cert_file=None, key_file
             print(f"❌ SSL certificate files not found: {cert_file}, {key_file}")
             print("Falling back to HTTP")
     
-    server = WebRTCCameraServer(ssl_context=ssl_context)
+    server = WebRTCCameraServer(
+        port=port, ssl_context=ssl_context, dev_mode=dev_mode, ice_servers=ice_servers, vr_port=vr_port
+    )
     
     # Add your camera streams
     for camera_name in camera_names:
         server.add_camera(camera_name)
+    for camera_name, config in (roi or {}).items():
+        server.set_camera_roi(camera_name, config)
     
     return server
 
@@ -252,10 +383,11 @@ if __name__ == "__main__":
     
     # Check for HTTPS flag
     use_https = "--https" in sys.argv or "-s" in sys.argv
+    dev_mode = "--dev" in sys.argv
     cert_file = "ssl_cert/server.crt"
     key_file = "ssl_cert/server.key"
     
-    server = create_camera_server(["test"], use_https=use_https, cert_file=cert_file, key_file=key_file)
+    server = create_camera_server(["test"], use_https=use_https, cert_file=cert_file, key_file=key_file, dev_mode=dev_mode)
     asyncio.run(server.start_server())
     print("Server running. Press Ctrl+C to stop.")
     try:
@@ -0,0 +1,85 @@
+"""
+Benchmark of the dual-arm collision check as the teleop calls it.
+
+Every control tick `VRDuoTeleop.send_targets` checks the path from the
+streamers' current commands to the new targets:
+`check(left, right, left_start, right_start)`. The benchmark replays that
+call on random walks of both SO101 arms (each tick moves every joint by up
+to --step-deg) and reports the cost per check in microseconds and how
+often a step is rejected, next to the
+target-only `check(left, right)` for comparison. The check runs once per
+control tick, so it has to stay well inside the tick budget.
+
+Usage:
+    python -m tools.bench_collision
+    python -m tools.bench_collision --spacing 0.3 --checks 20000 --step-deg 20
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from base.collision import DualArmCollisionChecker, side_by_side_base_poses
+from base.kinematics import SO101_URDF_PATH
+
+
+def random_walk(checker: DualArmCollisionChecker, n: int, step_deg: float, rng: np.random.Generator) -> list[dict]:
+    """n joint configurations in robot units (degrees, gripper 0..100), each step_deg at most from the previous."""
+    lower, upper = (np.degrees(limit) for limit in checker.chain.limits(checker.joint_names))
+    if "gripper" in checker.joint_names:
+        g = checker.joint_names.index("gripper")
+        lower[g], upper[g] = 0.0, 100.0
+    q = np.empty((n, len(lower)))
+    q[0] = rng.uniform(lower, upper)
+    for k in range(1, n):
+        q[k] = np.clip(q[k - 1] + rng.uniform(-step_deg, step_deg, len(lower)), lower, upper)
+    return [dict(zip(checker.keys, row.tolist())) for row in q]
+
+
+def percentiles_us(samples: list[float]) -> str:
+    samples = np.array(samples) * 1e6
+    return f"mean {samples.mean():.1f} µs, p50 {np.percentile(samples, 50):.1f} µs, p99 {np.percentile(samples, 99):.1f} µs"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dual-arm capsule collision check")
+    parser.add_argument("--urdf", default=SO101_URDF_PATH)
+    parser.add_argument("--spacing", type=float, default=0.40, help="Distance between the arm bases (m)")
+    parser.add_argument("--checks", type=int, default=10_000)
+    parser.add_argument("--step-deg", type=float, default=10.0, help="Largest joint move per tick")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    checker = DualArmCollisionChecker(args.urdf, side_by_side_base_poses(args.spacing))
+    print(f"Checker ready in {(time.perf_counter() - start) * 1000:.0f} ms "
+          f"({len(checker.links)} capsules per arm, {len(checker.pairs)} pairs)")
+
+    rng = np.random.default_rng(args.seed)
+    left = random_walk(checker, args.checks + 1, args.step_deg, rng)
+    right = random_walk(checker, args.checks + 1, args.step_deg, rng)
+    for i in range(100):
+        checker.check(left[i + 1], right[i + 1], left[i], right[i])
+
+    path_times, target_times = [], []
+    path_collisions = target_collisions = 0
+    for i in range(args.checks):
+        start = time.perf_counter()
+        path_collisions += checker.check(left[i + 1], right[i + 1], left[i], right[i])
+        path_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        target_collisions += checker.check(left[i + 1], right[i + 1])
+        target_times.append(time.perf_counter() - start)
+
+    print(f"path check (teleop): {percentiles_us(path_times)}, a sample every {checker.max_step_deg:g}°")
+    print(f"target-only check:   {percentiles_us(target_times)}")
+    print(
+        f"{path_collisions / args.checks:.1%} of random walk steps rejected "
+        f"({target_collisions / args.checks:.1%} of the targets within the margin)"
+    )
+
+
+if __name__ == "__main__":
+    main()
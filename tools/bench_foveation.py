@@ -0,0 +1,103 @@
+"""
+Benchmark of region-of-interest encoding of the wrist cameras.
+
+Encodes the same synthetic frames in full, foveated and cropped with H.264
+(libx264 at a constant quality, zero-latency settings like a live stream)
+and reports per mode the ROI remap time, the encode time per frame and the
+bitrate. A constant quality makes the bitrate comparable; aiortc runs at a
+target bitrate, where the savings show up as quality in the ROI instead.
+
+Usage:
+    python -m tools.bench_foveation
+    python -m tools.bench_foveation --frames 300 --roi-size 0.4 --factor 8
+"""
+
+import argparse
+import time
+
+import av
+import cv2
+import numpy as np
+
+from server.foveation import RoiConfig, crop_i420, foveate_i420, roi_rect
+from server.synthetic_camera import render_test_pattern
+
+
+def synthetic_frames(width: int, height: int, count: int, fps: float, seed: int = 0) -> list[np.ndarray]:
+    """I420 frames of a moving test pattern over static texture, like a wrist camera over a cluttered table."""
+    rng = np.random.default_rng(seed)
+    texture = cv2.GaussianBlur(rng.integers(0, 255, (height, width, 3), dtype=np.uint8), (5, 5), 0)
+    frames = []
+    for i in range(count):
+        frame = cv2.addWeighted(render_test_pattern(width, height, i, fps), 0.6, np.roll(texture, i, axis=1), 0.4, 0)
+        frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2YUV_I420))
+    return frames
+
+
+def encode(frames: list[np.ndarray], width: int, height: int, fps: float, crf: int) -> tuple[list[float], int]:
+    codec = av.CodecContext.create("libx264", "w")
+    codec.width, codec.height = width, height
+    codec.pix_fmt = "yuv420p"
+    codec.framerate = int(fps)
+    codec.options = {"preset": "ultrafast", "tune": "zerolatency", "crf": str(crf)}
+    times, total_bytes = [], 0
+    for yuv in frames:
+        frame = av.VideoFrame.from_ndarray(yuv, format="yuv420p")
+        start = time.perf_counter()
+        packets = codec.encode(frame)
+        times.append(time.perf_counter() - start)
+        total_bytes += sum(packet.size for packet in packets)
+    total_bytes += sum(packet.size for packet in codec.encode(None))
+    return times, total_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare full, foveated and cropped encoding of a camera stream")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--frames", type=int, default=150)
+    parser.add_argument("--roi-size", type=float, default=0.5, help="ROI size as a fraction of the frame")
+    parser.add_argument("--factor", type=int, default=4, help="Periphery downsampling in foveate mode")
+    parser.add_argument("--crf", type=int, default=23)
+    args = parser.parse_args()
+
+    frames = synthetic_frames(args.width, args.height, args.frames, args.fps)
+    duration = args.frames / args.fps
+    modes = {
+        "full": None,
+        "foveate": RoiConfig(mode="foveate", width=args.roi_size, height=args.roi_size, periphery_factor=args.factor),
+        "crop": RoiConfig(mode="crop", width=args.roi_size, height=args.roi_size),
+    }
+
+    baseline = None
+    for name, config in modes.items():
+        remap_times, encoded = [], []
+        width, height = args.width, args.height
+        if config is not None:
+            rect = roi_rect(args.width, args.height, config)
+            if config.mode == "crop":
+                width, height = rect[2] - rect[0], rect[3] - rect[1]
+        for yuv in frames:
+            start = time.perf_counter()
+            if config is None:
+                out = yuv
+            elif config.mode == "crop":
+                out = crop_i420(yuv, args.width, args.height, rect)
+            else:
+                out = foveate_i420(yuv, args.width, args.height, rect, config.periphery_factor)
+            remap_times.append(time.perf_counter() - start)
+            encoded.append(out)
+
+        encode_times, total_bytes = encode(encoded, width, height, args.fps, args.crf)
+        kbps = total_bytes * 8 / duration / 1000
+        baseline = baseline or (kbps, np.mean(encode_times))
+        print(
+            f"{name:8s} {width}x{height}: remap {np.mean(remap_times) * 1000:.2f} ms, "
+            f"encode {np.mean(encode_times) * 1000:.2f} ms ({np.mean(encode_times) / baseline[1]:.0%}), "
+            f"{kbps:.0f} kbit/s ({kbps / baseline[0]:.0%})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Throughput benchmark of the MuJoCo duo simulation.
+
+Measures how much faster than real time `SimDuoRobot` steps with manual
+stepping and with the background physics thread running as fast as
+possible, and the CPU offscreen rendering rate of its cameras, while a
+control loop reads both arms and streams joint goals as the teleop does.
+
+Usage:
+    python -m tools.bench_sim
+    python -m tools.bench_sim --duration 10 --width 320 --height 240
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from base.sim_duo_robot import SIM_MOTOR_NAMES, SimDuoRobot, SimDuoRobotConfig
+
+
+def sine_action(t: float) -> dict:
+    return {
+        f"{side}_{motor}.pos": (30.0 * np.sin(2.0 * np.pi * 0.5 * t + i) if motor != "gripper" else 50.0)
+        for side in ("left", "right")
+        for i, motor in enumerate(SIM_MOTOR_NAMES)
+    }
+
+
+def bench_manual(config: SimDuoRobotConfig, sim_seconds: float, control_hz: float):
+    config.auto_step = False
+    config.cameras = {}
+    robot = SimDuoRobot(config)
+    robot.connect()
+    start = time.perf_counter()
+    t = 0.0
+    while t < sim_seconds:
+        robot.left_arm.bus.sync_read("Present_Position")
+        robot.right_arm.bus.sync_read("Present_Position")
+        robot.send_action(sine_action(t))
+        robot.step(1.0 / control_hz)
+        t += 1.0 / control_hz
+    elapsed = time.perf_counter() - start
+    robot.disconnect()
+    print(f"manual stepping: {sim_seconds:.0f} s simulated in {elapsed:.2f} s ({sim_seconds / elapsed:.1f}x real time)")
+
+
+def bench_threaded(config: SimDuoRobotConfig, duration: float, control_hz: float):
+    config.auto_step = True
+    config.realtime_factor = None
+    robot = SimDuoRobot(config)
+    robot.connect()
+    start = time.perf_counter()
+    reads = 0
+    while time.perf_counter() - start < duration:
+        robot.get_observation()
+        robot.send_action(sine_action(robot.sim_time))
+        reads += 1
+        time.sleep(1.0 / control_hz)
+    stats = robot.stats()
+    robot.disconnect()
+    print(
+        f"threaded, as fast as possible: {stats['realtime_factor']:.1f}x real time, "
+        f"{stats['physics_steps_per_s']:.0f} steps/s, {stats['render_fps']:.1f} frames/s rendered "
+        f"over {len(config.cameras)} cameras, {reads / duration:.1f} observations/s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the MuJoCo duo simulation")
+    parser.add_argument("--duration", type=float, default=5.0, help="Wall-clock seconds of the threaded run")
+    parser.add_argument("--sim-seconds", type=float, default=20.0, help="Simulated seconds of the manual run")
+    parser.add_argument("--control-hz", type=float, default=30.0)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    args = parser.parse_args()
+
+    cameras = {name: (args.width, args.height) for name in ("left_wrist", "right_wrist", "main")}
+    bench_manual(SimDuoRobotConfig(cameras=dict(cameras)), args.sim_seconds, args.control_hz)
+    bench_threaded(SimDuoRobotConfig(cameras=dict(cameras)), args.duration, args.control_hz)
+
+
+if __name__ == "__main__":
+    main()
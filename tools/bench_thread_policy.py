@@ -0,0 +1,170 @@
+"""
+Control tick jitter under video encode load, with and without a thread policy.
+
+Runs the teleop runtime with a control tick and a camera tick like
+vr_teleop.py. Every camera tick hands one synthetic "encode" job per camera
+to the loop's default executor, the way aiortc runs its encoders, and
+optional hog processes stand in for other stations or services on the host.
+The same load runs once with the OS scheduler alone and once with a
+`ThreadPolicy` (control pinned to its own cores with SCHED_FIFO, encode and
+camera on the remaining ones with a positive nice), and the start-to-start
+intervals of the control tick are compared with its period.
+
+The encode job is numpy work on a 640x480 YUV420-sized buffer, which
+releases the GIL like a real encoder. Pinning needs more than one core to
+make a difference; SCHED_FIFO and negative nice levels need root or
+CAP_SYS_NICE, refused settings are listed in the output.
+
+Usage:
+    python -m tools.bench_thread_policy
+    python -m tools.bench_thread_policy --hz 120 --cameras 3 --encode-ms 12 --hogs 4 --duration 20
+    python -m tools.bench_thread_policy --control-cpus 3 --other-cpus 0 1 2 --fifo 60
+"""
+
+import argparse
+import multiprocessing
+import os
+import threading
+import time
+
+import numpy as np
+
+from base.runtime import TeleopRuntime
+from base.thread_policy import ThreadPolicy
+from tools.bench_tick_jitter import busy, interval_stats
+
+
+class SyntheticEncoder:
+    """GIL-releasing numpy work of a calibrated duration, one frame sized buffer per camera."""
+
+    def __init__(self, encode_ms: float, width: int = 640, height: int = 480):
+        size = width * height * 3 // 2
+        self._a = np.random.default_rng(0).random(size, dtype=np.float32)
+        self._b = np.empty_like(self._a)
+        start = time.perf_counter()
+        for _ in range(20):
+            self._pass()
+        pass_ms = (time.perf_counter() - start) * 1000.0 / 20
+        self.passes = max(1, round(encode_ms / pass_ms))
+        self.encoded = 0
+        self.skipped = 0
+
+    def _pass(self):
+        np.multiply(self._a, 1.0001, out=self._b)
+        np.add(self._b, self._a, out=self._b)
+
+    def encode(self):
+        for _ in range(self.passes):
+            self._pass()
+        self.encoded += 1
+
+
+def hog(stop_event):
+    """A competing process keeping one core busy."""
+    x = 0
+    while not stop_event.is_set():
+        for _ in range(100_000):
+            x += 1
+
+
+def run(args, policy: ThreadPolicy | None) -> tuple[list[float], SyntheticEncoder]:
+    encoder = SyntheticEncoder(args.encode_ms)
+    starts = []
+    pending = 0
+    pending_lock = threading.Lock()
+    runtime = TeleopRuntime(workers=4, stats_interval_s=0, thread_policy=policy, encode_workers=args.cameras)
+
+    def control(dt: float):
+        starts.append(time.perf_counter())
+        busy(args.control_ms)
+
+    def encode_done(future):
+        nonlocal pending
+        with pending_lock:
+            pending -= 1
+
+    def submit_encodes():
+        for _ in range(args.cameras):
+            runtime.loop.run_in_executor(None, encoder.encode).add_done_callback(encode_done)
+
+    def camera(dt: float):
+        nonlocal pending
+        busy(args.capture_ms)
+        with pending_lock:
+            # Like a real sender, do not queue frames without bound when encoding falls behind
+            if pending >= 2 * args.cameras:
+                encoder.skipped += args.cameras
+                return
+            pending += args.cameras
+        runtime.loop.call_soon_threadsafe(submit_encodes)
+
+    runtime.add_periodic("camera", camera, hz=args.fps, role="camera")
+    runtime.add_periodic("control", control, hz=args.hz, role="control")
+    threading.Timer(args.duration, runtime.stop).start()
+    runtime.run()
+    return starts, encoder
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Control tick jitter under encode load, with and without a policy")
+    parser.add_argument("--hz", type=float, default=100.0, help="Control tick rate")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per run")
+    parser.add_argument("--control-ms", type=float, default=1.5, help="Control tick work (holds the GIL)")
+    parser.add_argument("--capture-ms", type=float, default=1.0, help="Camera tick work (holds the GIL)")
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--cameras", type=int, default=3)
+    parser.add_argument("--encode-ms", type=float, default=8.0, help="Encode time per frame (releases the GIL)")
+    parser.add_argument("--hogs", type=int, default=os.cpu_count(), help="Competing busy processes")
+    parser.add_argument("--control-cpus", type=int, nargs="+", help="Cores of the control thread (default: the last)")
+    parser.add_argument("--other-cpus", type=int, nargs="+", help="Cores of the other roles (default: the rest)")
+    parser.add_argument("--fifo", type=int, default=50, help="SCHED_FIFO priority of the control thread")
+    parser.add_argument("--nice", type=int, default=5, help="Nice level of the camera and encode threads")
+    args = parser.parse_args()
+
+    cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else []
+    control_cpus = args.control_cpus or cpus[-1:] or None
+    other_cpus = args.other_cpus or [cpu for cpu in cpus if cpu not in (control_cpus or [])] or None
+    policies = {
+        "os": None,
+        "policy": ThreadPolicy.from_dict({
+            "control": {"cpus": control_cpus, "fifo_priority": args.fifo},
+            "camera": {"cpus": other_cpus, "nice": args.nice},
+            "encode": {"cpus": other_cpus, "nice": args.nice},
+            "network": {"cpus": other_cpus},
+        }),
+    }
+
+    stop_hogs = multiprocessing.Event()
+    hogs = [multiprocessing.Process(target=hog, args=(stop_hogs,), daemon=True) for _ in range(args.hogs)]
+    for process in hogs:
+        process.start()
+
+    period = 1.0 / args.hz
+    results = {}
+    try:
+        for name, policy in policies.items():
+            starts, encoder = run(args, policy)
+            results[name] = {**interval_stats(starts, period), "encoded": encoder.encoded, "skipped": encoder.skipped}
+    finally:
+        stop_hogs.set()
+        for process in hogs:
+            process.join(timeout=2.0)
+
+    print(
+        f"Control tick at {args.hz:.0f} Hz ({period * 1000:.1f} ms), {args.cameras} cameras x {args.fps:.0f} fps "
+        f"encoding {args.encode_ms:.0f} ms/frame, {args.hogs} hog processes, {len(cpus) or '?'} cores"
+    )
+    print(f"control cores {control_cpus}, other roles {other_cpus}")
+    print(f"{'run':>7} {'ticks':>6} {'std':>8} {'p99 dev':>9} {'max dev':>9} {'late':>5} {'encoded':>8} {'skipped':>8}")
+    for name, r in results.items():
+        print(
+            f"{name:>7} {r['ticks']:>6} {r['std_ms']:>6.2f}ms {r['p99_deviation_ms']:>7.2f}ms "
+            f"{r['max_deviation_ms']:>7.2f}ms {r['late_ticks']:>5} {r['encoded']:>8} {r['skipped']:>8}"
+        )
+    denied = {role: stats["denied"] for role, stats in policies["policy"].stats().items() if stats["denied"]}
+    if denied:
+        print(f"Refused by the OS: {denied}")
+
+
+if __name__ == "__main__":
+    main()
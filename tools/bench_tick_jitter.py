@@ -0,0 +1,158 @@
+"""
+Tick jitter of the former phone teleop loop vs. the common teleop runner.
+
+The former phone_teleop.py ran everything inline: pipeline, per-tick prints of
+the phone observation and joint action, synchronous `log_rerun_data`, then
+`busy_wait` for the rest of the period. The common runner schedules the
+control tick on `TeleopRuntime` deadlines and hands logging to
+`AsyncRerunLogger`. Both loops run the same synthetic workload here - a
+pipeline cost and a rerun logging cost with occasional image-sized spikes -
+and the start-to-start tick intervals are compared with the nominal period.
+
+The logging cost is simulated half sleeping (I/O) and half in Python holding
+the GIL, so the asynchronous logger still competes for the interpreter.
+
+Usage:
+    python -m tools.bench_tick_jitter
+    python -m tools.bench_tick_jitter --hz 60 --duration 20 --log-ms 12 --spike-ms 60
+"""
+
+import argparse
+import io
+import threading
+import time
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from base.rerun_logger import AsyncRerunLogger
+from base.runtime import TeleopRuntime
+
+
+def busy(ms: float):
+    """Hold the GIL for ms, like Python-heavy work (pipeline steps, rerun serialization)."""
+    end = time.perf_counter() + ms / 1000.0
+    while time.perf_counter() < end:
+        pass
+
+
+class Workload:
+    """The per-tick work of a phone teleop tick with a seeded logging cost."""
+
+    def __init__(self, pipeline_ms: float, log_ms: float, spike_ms: float, spike_every: int, seed: int = 0):
+        self.pipeline_ms = pipeline_ms
+        self.log_ms = log_ms
+        self.spike_ms = spike_ms
+        self.spike_every = spike_every
+        self._rng = np.random.default_rng(seed)
+        self._logs = 0
+
+    def pipeline(self) -> dict:
+        busy(self.pipeline_ms)
+        return {f"{motor}.pos": float(value) for motor, value in zip("abcdef", self._rng.normal(size=6))}
+
+    def log(self, observation=None, action=None):
+        self._logs += 1
+        cost = self.log_ms * self._rng.lognormal(0.0, 0.3)
+        if self.spike_every and self._logs % self.spike_every == 0:
+            cost += self.spike_ms
+        time.sleep(cost / 2000.0)
+        busy(cost / 2.0)
+
+
+def interval_stats(starts: list[float], period: float) -> dict:
+    intervals = np.diff(starts)
+    deviation = np.abs(intervals - period) * 1000.0
+    return {
+        "ticks": len(starts),
+        "mean_period_ms": float(intervals.mean() * 1000.0),
+        "std_ms": float(intervals.std() * 1000.0),
+        "p99_deviation_ms": float(np.percentile(deviation, 99)),
+        "max_deviation_ms": float(deviation.max()),
+        "late_ticks": int((intervals > 1.5 * period).sum()),
+    }
+
+
+def run_inline(workload: Workload, hz: float, duration: float) -> list[float]:
+    """The former loop: work, prints, synchronous logging, busy wait."""
+    period = 1.0 / hz
+    starts = []
+    sink = io.StringIO()
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        t0 = time.perf_counter()
+        starts.append(t0)
+        obs = {"phone.pos": np.zeros(3), "phone.enabled": True}
+        with redirect_stdout(sink):
+            print(f"Phone Observation: {obs}")
+            action = workload.pipeline()
+            print(f"Joint Action: {action}")
+        sink.seek(0)
+        sink.truncate()
+        workload.log(observation=obs, action=action)
+        # busy_wait of lerobot.utils.robot_utils
+        while time.perf_counter() - t0 < period:
+            pass
+    return starts
+
+
+def run_runtime(workload: Workload, hz: float, duration: float) -> tuple[list[float], dict]:
+    """The common runner: deadline-scheduled tick on the runtime, asynchronous logging."""
+    starts = []
+    logger = AsyncRerunLogger(log_fn=workload.log, max_hz=hz)
+    runtime = TeleopRuntime(workers=4, stats_interval_s=0)
+
+    def tick(dt: float):
+        starts.append(time.perf_counter())
+        action = workload.pipeline()
+        logger.log(observation={"phone.enabled": True}, action=action)
+
+    async def start_logger():
+        logger.start()
+
+    async def stop_logger():
+        logger.stop()
+
+    runtime.add_service("rerun", start_logger, stop_logger)
+    runtime.add_periodic("control", tick, hz=hz)
+    threading.Timer(duration, runtime.stop).start()
+    runtime.run()
+    return starts, logger.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare tick jitter of the inline and the runtime teleop loops")
+    parser.add_argument("--hz", type=float, default=30.0)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--pipeline-ms", type=float, default=4.0, help="Pipeline (IK) cost per tick")
+    parser.add_argument("--log-ms", type=float, default=8.0, help="Typical rerun logging cost")
+    parser.add_argument("--spike-ms", type=float, default=40.0, help="Extra cost of a spike (camera image)")
+    parser.add_argument("--spike-every", type=int, default=10, help="Logs between spikes, 0 disables them")
+    args = parser.parse_args()
+
+    period = 1.0 / args.hz
+    results = {}
+    results["inline"] = interval_stats(
+        run_inline(Workload(args.pipeline_ms, args.log_ms, args.spike_ms, args.spike_every), args.hz, args.duration),
+        period,
+    )
+    starts, logger_stats = run_runtime(
+        Workload(args.pipeline_ms, args.log_ms, args.spike_ms, args.spike_every), args.hz, args.duration
+    )
+    results["runtime"] = interval_stats(starts, period)
+
+    print(f"Tick jitter at {args.hz:.0f} Hz ({period * 1000:.1f} ms period), {args.duration:.0f} s per loop")
+    print(f"{'loop':>8} {'ticks':>6} {'period':>9} {'std':>8} {'p99 dev':>9} {'max dev':>9} {'late':>5}")
+    for name, r in results.items():
+        print(
+            f"{name:>8} {r['ticks']:>6} {r['mean_period_ms']:>7.2f}ms {r['std_ms']:>6.2f}ms "
+            f"{r['p99_deviation_ms']:>7.2f}ms {r['max_deviation_ms']:>7.2f}ms {r['late_ticks']:>5}"
+        )
+    print(
+        f"Async logger: {logger_stats['logged']} logged, {logger_stats['dropped']} dropped, "
+        f"{logger_stats['mean_log_ms']:.1f} ms per log"
+    )
+
+
+if __name__ == "__main__":
+    main()
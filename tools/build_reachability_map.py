@@ -0,0 +1,61 @@
+"""
+Offline build of the SO101 end-effector reachability map.
+
+Samples the joint space of the URDF, voxelizes the reachable end-effector
+positions with their manipulability and stores the grid as memory-mappable
+`.npy` files, loaded at runtime by `ReachabilityMap` / `EEReachabilityClamp`.
+Rebuild whenever the URDF or the joint limits change.
+
+Usage:
+    python -m tools.build_reachability_map
+    python -m tools.build_reachability_map --resolution 0.005 --samples 5000000 --output Simulation/SO101/reachability
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from base.kinematics import SO101_URDF_PATH
+from base.reachability import SO101_REACHABILITY_PATH, ReachabilityMap, build_reachability_map, save_reachability_map
+
+
+def benchmark_lookups(path: str, n: int = 10_000):
+    reachability = ReachabilityMap(path)
+    rng = np.random.default_rng(1)
+    lo = reachability.origin
+    hi = reachability.origin + np.array(reachability.shape) * reachability.resolution
+    targets = rng.uniform(lo, hi, size=(n, 3))
+    start = time.perf_counter()
+    clamped = sum(reachability.clamp(target)[1] for target in targets)
+    elapsed = time.perf_counter() - start
+    print(f"clamp: {elapsed / n * 1e6:.1f} µs per lookup, {clamped / n:.0%} of uniform targets clamped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the SO101 end-effector reachability map")
+    parser.add_argument("--urdf", default=SO101_URDF_PATH)
+    parser.add_argument("--frame", default="gripper_frame_link")
+    parser.add_argument("--resolution", type=float, default=0.01, help="Voxel size in m")
+    parser.add_argument("--samples", type=int, default=2_000_000)
+    parser.add_argument("--min-manipulability-ratio", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=SO101_REACHABILITY_PATH)
+    args = parser.parse_args()
+
+    reachability = build_reachability_map(
+        args.urdf,
+        frame=args.frame,
+        resolution=args.resolution,
+        samples=args.samples,
+        min_manipulability_ratio=args.min_manipulability_ratio,
+        seed=args.seed,
+    )
+    save_reachability_map(args.output, reachability)
+    size = reachability["nearest"].nbytes + reachability["manipulability"].nbytes
+    print(f"Saved {args.output} ({size / 1e6:.1f} MB)")
+    benchmark_lookups(args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Replay-based evaluation of the gripper controller at varying tick rates.
+
+Replays gripper inputs - the joystick and trigger values of a recorded VR
+session (the JSONL written by `VRHeadset(record_path=...)`) or a synthetic
+sequence of joystick pushes and trigger pulls - through `GripperController`
+and through the former per-tick integrator (`GripperVelocityToJoint`: a fixed
+step per tick from the measured position) at several tick rates with jittered
+and overrunning ticks. The gripper servo is modeled as a first-order lag.
+
+Both grippers are stepped together: with the synthetic input the left one is
+in joystick mode and the right one in trigger mode. For each rate the
+command is compared with a 1 kHz reference run fed with the inputs the loop
+saw at its ticks (a loop cannot react to a joystick push that starts and
+ends between two of its ticks): RMS deviation, final error and the largest
+speed of the command between two ticks. A tick-rate independent controller
+has a small deviation at every rate, overrunning ticks of 0.2-0.4 s at
+10 Hz included. The former integrator has no trigger mode, its trigger-mode
+gripper holds and is reported as n/a; it is compared with itself at 30 Hz.
+
+The run fails (exit status 1) if the controller exceeds --max-deviation in
+RMS or final error at any rate.
+
+Usage:
+    python -m tools.eval_gripper_control
+    python -m tools.eval_gripper_control --recording vr_session.jsonl --rates 15 30 60 --jitter 0.3
+    python -m tools.eval_gripper_control --max-deviation 1
+"""
+
+import argparse
+import json
+
+import numpy as np
+
+from base.gripper_control import GripperController
+
+HANDS = ("left", "right")
+
+
+def load_recording(path: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(times, joystick, trigger) of both hands from a VRHeadset recording, held between packets."""
+    times, joystick, trigger = [], [], []
+    last_joystick, last_trigger = [0.0, 0.0], [np.nan, np.nan]
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            packet = json.loads(line)
+            t = packet["t"] / 1000.0 if packet.get("t") is not None else packet["t_recv"]
+            if times and t <= times[-1]:
+                continue
+            for i, hand in enumerate(HANDS):
+                pose = packet.get(hand)
+                if pose is not None:
+                    last_joystick[i] = float(pose.get("joystickY", 0.0))
+                    last_trigger[i] = float(pose["trigger"]) if pose.get("trigger") is not None else np.nan
+            times.append(t)
+            joystick.append(list(last_joystick))
+            trigger.append(list(last_trigger))
+    times = np.array(times)
+    return times - times[0], np.array(joystick), np.array(trigger)
+
+
+def synthetic_inputs(duration_s: float = 12.0, rate_hz: float = 60.0) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Left: joystick pushes of varying deflection; right: trigger pulls and partial releases."""
+    times = np.arange(0.0, duration_s, 1.0 / rate_hz)
+    joystick = np.zeros((len(times), 2))
+    trigger = np.full((len(times), 2), np.nan)
+    for start, end, value in ((0.5, 1.5, -1.0), (2.5, 3.0, 0.6), (4.0, 6.0, -0.3), (7.0, 8.5, 1.0), (9.5, 10.0, -0.8)):
+        joystick[(times >= start) & (times < end), 0] = value
+    trigger[:, 1] = 0.0
+    for start, end, value in ((1.0, 3.0, 1.0), (3.0, 5.0, 0.4), (6.0, 6.3, 0.9), (8.0, 11.0, 0.7)):
+        trigger[(times >= start) & (times < end), 1] = value
+    return times, joystick, trigger
+
+
+def tick_times(duration_s: float, rate_hz: float, jitter: float, overrun_prob: float, seed: int = 0) -> np.ndarray:
+    """Tick start times: period * (1 +- jitter), and some ticks overrunning by 1-3 periods."""
+    rng = np.random.default_rng(seed)
+    period = 1.0 / rate_hz
+    count = int(duration_s * rate_hz * 2) + 1
+    periods = period * (1.0 + rng.uniform(-jitter, jitter, count))
+    overruns = rng.random(count) < overrun_prob
+    periods[overruns] += period * rng.integers(1, 4, overruns.sum())
+    times = np.cumsum(periods)
+    return times[times < duration_s]
+
+
+def _sample(times: np.ndarray, values: np.ndarray, t: float) -> np.ndarray:
+    """Value held at t (zero-order hold, like the latest received packet)."""
+    return values[max(np.searchsorted(times, t, side="right") - 1, 0)]
+
+
+def simulate(
+    times, joystick, trigger, ticks: np.ndarray, legacy: bool, servo_tau_s: float, speed_factor: float, **kwargs
+) -> np.ndarray:
+    """Command of both grippers at every tick; legacy replays GripperVelocityToJoint."""
+    controller = GripperController(count=2, **kwargs)
+    measured = np.full(2, 50.0)
+    commands = np.empty((len(ticks), 2))
+    previous = 0.0
+    command = measured.copy()
+    for k, t in enumerate(ticks):
+        dt = t - previous
+        previous = t
+        # Servo: first-order lag towards the last command over the elapsed time
+        measured += (command - measured) * (1.0 - np.exp(-dt / servo_tau_s))
+        velocity, position = _sample(times, joystick, t), _sample(times, trigger, t)
+        if legacy:
+            # Fixed step per tick; the trigger is not supported, those grippers hold
+            command = np.clip(measured + np.where(np.isnan(position), velocity, 0.0) * speed_factor, 0.0, 100.0)
+        else:
+            command = controller.step(dt, velocity, position, measured).copy()
+        commands[k] = command
+    return commands
+
+
+def compare(
+    ticks: np.ndarray, commands: np.ndarray, ref_ticks: np.ndarray, ref_commands: np.ndarray, applicable: np.ndarray
+) -> dict:
+    """Deviation of commands from the reference per gripper, None for grippers the mode does not drive."""
+    reference = np.stack([np.interp(ticks, ref_ticks, ref_commands[:, i]) for i in range(2)], axis=1)
+    deviation = commands - reference
+    # Speed of the command between ticks: jumps after overrunning ticks show up here
+    speed = np.abs(np.diff(commands, axis=0)) / np.diff(ticks)[:, None]
+    metrics = {
+        "rms_deviation": np.sqrt(np.mean(deviation ** 2, axis=0)).round(2),
+        "final_error": np.abs(deviation[-1]).round(2),
+        "max_speed": speed.max(axis=0).round(0),
+    }
+    return {
+        "ticks": len(ticks),
+        **{
+            name: [float(v) if ok else None for v, ok in zip(values, applicable)]
+            for name, values in metrics.items()
+        },
+    }
+
+
+def check(results: list[dict], max_deviation: float) -> list[str]:
+    """Controller results whose RMS deviation or final error exceeds max_deviation."""
+    failures = []
+    for result in results:
+        if result["mode"] != "controller":
+            continue
+        for name in ("rms_deviation", "final_error"):
+            for hand, value in zip(HANDS, result[name]):
+                if value is not None and value > max_deviation:
+                    failures.append(f"{result['rate_hz']:.0f} Hz {hand} {name} {value} > {max_deviation}")
+    return failures
+
+
+def _format(values: list) -> str:
+    return ", ".join("n/a" if v is None else f"{v:g}" for v in values)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the gripper controller at varying tick rates")
+    parser.add_argument("--recording", help="JSONL recording written by VRHeadset(record_path=...)")
+    parser.add_argument("--rates", type=float, nargs="+", default=[10, 15, 30, 60, 120], help="Tick rates (Hz)")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Tick period jitter as a fraction of the period")
+    parser.add_argument("--overruns", type=float, default=0.05, help="Probability of a tick overrunning")
+    parser.add_argument("--servo-tau", type=float, default=0.05, help="Servo time constant (s)")
+    parser.add_argument("--speed-factor", type=float, default=20.0, help="Step per tick of the former integrator")
+    parser.add_argument(
+        "--max-deviation", type=float, default=2.0, help="Largest allowed controller RMS deviation and final error"
+    )
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    if args.recording:
+        times, joystick, trigger = load_recording(args.recording)
+        source = args.recording
+    else:
+        times, joystick, trigger = synthetic_inputs()
+        source = "synthetic"
+    if len(times) < 2:
+        raise SystemExit(f"Not enough samples in {source}")
+    duration = float(times[-1]) + 0.5
+
+    ref_ticks = np.arange(0.001, duration, 0.001)
+    common = dict(servo_tau_s=args.servo_tau, speed_factor=args.speed_factor)
+    # The former integrator has no rate-independent reference, compare it to itself at the nominal 30 Hz
+    legacy_ref_ticks = np.arange(1.0 / 30.0, duration, 1.0 / 30.0)
+    legacy_reference = simulate(times, joystick, trigger, legacy_ref_ticks, legacy=True, **common)
+
+    # The former integrator only drives grippers in joystick mode (no trigger position)
+    joystick_mode = np.isnan(trigger).any(axis=0)
+    results = []
+    print(f"Gripper control on {source}, {duration:.1f} s, jitter {args.jitter:.0%}, overruns {args.overruns:.0%}")
+    print(f"{'rate':>6} {'':>10} {'rms dev (L, R)':>18} {'final err (L, R)':>18} {'max speed (L, R)':>18}")
+    for rate in args.rates:
+        ticks = tick_times(duration, rate, args.jitter, args.overruns)
+        # The inputs as seen at the ticks: a tick integrates its input over the time since
+        # the previous tick, so the reference holds it over that interval too
+        seen_joystick = np.array([_sample(times, joystick, t) for t in ticks])
+        seen_trigger = np.array([_sample(times, trigger, t) for t in ticks])
+        seen_since = np.concatenate([[0.0], ticks[:-1]])
+        reference = simulate(seen_since, seen_joystick, seen_trigger, ref_ticks, legacy=False, **common)
+        for name, legacy, ref_ticks_, ref, applicable in (
+            ("controller", False, ref_ticks, reference, np.ones(2, dtype=bool)),
+            ("per-tick", True, legacy_ref_ticks, legacy_reference, joystick_mode),
+        ):
+            commands = simulate(times, joystick, trigger, ticks, legacy, **common)
+            result = {"rate_hz": rate, "mode": name, **compare(ticks, commands, ref_ticks_, ref, applicable)}
+            results.append(result)
+            print(
+                f"{rate:>4.0f}Hz {name:>10} {_format(result['rms_deviation']):>18} "
+                f"{_format(result['final_error']):>18} {_format(result['max_speed']):>18}"
+            )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"source": source, "jitter": args.jitter, "overruns": args.overruns, "results": results}, f, indent=2)
+        print(f"Saved report to {args.output}")
+
+    failures = check(results, args.max_deviation)
+    if failures:
+        raise SystemExit("Gripper controller out of bounds:\n  " + "\n  ".join(failures))
+    print(f"Controller within {args.max_deviation} of the reference at every rate")
+
+
+if __name__ == "__main__":
+    main()
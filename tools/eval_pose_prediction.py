@@ -0,0 +1,222 @@
+"""
+Replay-based evaluation of VR pose prediction.
+
+Replays a recorded VR session (the JSONL written by `VRHeadset(record_path=...)`)
+or a synthetic hand trajectory through `PosePredictor` the way the teleop runs
+it: samples are taken on a client clock with an arbitrary offset to the server
+clock, delivered after a base network latency plus random queueing jitter,
+dated with `ClockOffsetEstimator` (the ping round trip being twice the base
+latency) and extrapolated with `prediction_horizon`, the horizon function of
+`VRPosePredictor`. For each latency the error against the true hand pose at
+actuation time - one control tick after the tick - is reported for the raw
+(hold the newest sample) and the predicted pose.
+
+The truth of the synthetic trajectory is the noise-free motion. A recording
+only has the noisy samples, its truth is their centered (non-causal) moving
+average, which no causal predictor can see.
+
+Usage:
+    python -m tools.eval_pose_prediction --recording vr_session.jsonl --hand right
+    python -m tools.eval_pose_prediction --latencies 20 50 100 --jitter 10 --output prediction_report.json
+"""
+
+import argparse
+import json
+import math
+
+import numpy as np
+
+from base.pose_filter import ClockOffsetEstimator, PosePredictor, prediction_horizon
+
+# Arbitrary offset of the client clock (performance.now()) to the server clock
+CLIENT_CLOCK_OFFSET_S = -1234.5
+
+
+def load_recording(path: str, hand: str, smooth: int = 5) -> tuple[np.ndarray, ...]:
+    """
+    Load (times, positions, quaternions, enabled, true positions, true quaternions)
+    of one hand from a VRHeadset recording.
+    """
+    times, positions, quats, enabled = [], [], [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            packet = json.loads(line)
+            pose = packet.get(hand)
+            if pose is None:
+                continue
+            t = packet["t"] / 1000.0 if packet.get("t") is not None else packet["t_recv"]
+            if times and t <= times[-1]:
+                continue
+            times.append(t)
+            positions.append(pose["pos"])
+            quats.append(pose["rot"])
+            enabled.append(bool(pose["enabled"]))
+    positions = np.array(positions, dtype=float)
+    quats = _make_continuous(np.array(quats, dtype=float))
+    kernel = np.ones(smooth) / smooth
+    true_positions = np.stack([np.convolve(positions[:, k], kernel, mode="same") for k in range(3)], axis=1)
+    true_quats = np.stack([np.convolve(quats[:, k], kernel, mode="same") for k in range(4)], axis=1)
+    true_quats /= np.linalg.norm(true_quats, axis=1, keepdims=True)
+    return np.array(times), positions, quats, np.array(enabled), true_positions, true_quats
+
+
+def synthetic_trajectory(
+    duration_s: float = 20.0, rate_hz: float = 30.0, noise_m: float = 0.001, seed: int = 0
+) -> tuple[np.ndarray, ...]:
+    """Smooth reaching motion with sensor noise, sampled like the web-ui send rate, and its noise-free truth."""
+    rng = np.random.default_rng(seed)
+    times = np.arange(0.0, duration_s, 1.0 / rate_hz)
+    true_positions = np.stack(
+        [
+            0.15 * np.sin(2 * math.pi * 0.4 * times),
+            0.08 * np.sin(2 * math.pi * 0.7 * times + 1.0),
+            0.10 * np.sin(2 * math.pi * 0.25 * times + 2.0),
+        ],
+        axis=1,
+    )
+    positions = true_positions + rng.normal(0.0, noise_m, true_positions.shape)
+    angles = 0.6 * np.sin(2 * math.pi * 0.3 * times)
+    quats = np.stack([np.zeros_like(angles), np.sin(angles / 2), np.zeros_like(angles), np.cos(angles / 2)], axis=1)
+    return times, positions, quats, np.ones(len(times), dtype=bool), true_positions, quats.copy()
+
+
+def _make_continuous(quats: np.ndarray) -> np.ndarray:
+    """Flip quaternion signs so consecutive samples lie on the same hemisphere."""
+    quats = quats.copy()
+    for i in range(1, len(quats)):
+        if np.dot(quats[i], quats[i - 1]) < 0.0:
+            quats[i] = -quats[i]
+    return quats
+
+
+def _rotation_error_deg(a: np.ndarray, b: np.ndarray) -> float:
+    dot = abs(float(np.dot(a, b)) / (np.linalg.norm(a) * np.linalg.norm(b)))
+    return math.degrees(2.0 * math.acos(min(dot, 1.0)))
+
+
+def evaluate(
+    times: np.ndarray,
+    positions: np.ndarray,
+    quats: np.ndarray,
+    enabled: np.ndarray,
+    true_positions: np.ndarray,
+    true_quats: np.ndarray,
+    latency_s: float,
+    jitter_s: float = 0.005,
+    tick_hz: float = 30.0,
+    max_horizon_s: float = 0.1,
+    stale_after_s: float = 0.1,
+    seed: int = 0,
+    **predictor_kwargs,
+) -> dict:
+    """Replay the trajectory over a simulated network and compare both poses to the truth at actuation."""
+    quats = _make_continuous(quats)
+    true_quats = _make_continuous(true_quats)
+    rng = np.random.default_rng(seed)
+    # Server clock: sent at the sample time, received after the latency plus queueing jitter
+    client_times = times + CLIENT_CLOCK_OFFSET_S
+    receive_times = times + latency_s + rng.exponential(jitter_s, len(times)) if jitter_s > 0 else times + latency_s
+    receive_times = np.maximum.accumulate(receive_times)  # one TCP stream: in order
+    actuation_s = 1.0 / tick_hz
+
+    predictor = PosePredictor(**predictor_kwargs)
+    clock = ClockOffsetEstimator()
+    raw_pos_err, raw_rot_err, pred_pos_err, pred_rot_err = [], [], [], []
+
+    delivered = 0
+    last_enabled = False
+    t_sample = t_recv = None
+    for tick in np.arange(receive_times[0], times[-1] - actuation_s, 1.0 / tick_hz):
+        while delivered < len(times) and receive_times[delivered] <= tick:
+            clock.update(client_times[delivered], receive_times[delivered])
+            t_sample = clock.to_server_time(client_times[delivered], latency_s)
+            t_recv = receive_times[delivered]
+            if enabled[delivered] != last_enabled:
+                predictor.reset()
+                last_enabled = bool(enabled[delivered])
+            if enabled[delivered]:
+                predictor.update(client_times[delivered], positions[delivered], quats[delivered])
+            delivered += 1
+
+        newest = delivered - 1
+        actuation = tick + actuation_s
+        # Only score ticks where the operator is grabbing, both at actuation and in the delivered data
+        if newest < 0 or not last_enabled or not enabled[min(np.searchsorted(times, actuation), len(times) - 1)]:
+            continue
+
+        true_pos = np.array([np.interp(actuation, times, true_positions[:, k]) for k in range(3)])
+        true_quat = np.array([np.interp(actuation, times, true_quats[:, k]) for k in range(4)])
+
+        horizon = prediction_horizon(tick, t_sample, t_recv, actuation_s, max_horizon_s, stale_after_s)
+        pred_pos, pred_quat = predictor.predict(horizon)
+
+        raw_pos_err.append(np.linalg.norm(positions[newest] - true_pos))
+        raw_rot_err.append(_rotation_error_deg(quats[newest], true_quat))
+        pred_pos_err.append(np.linalg.norm(pred_pos - true_pos))
+        pred_rot_err.append(_rotation_error_deg(pred_quat, true_quat))
+
+    def rms_mm(errors):
+        return float(np.sqrt(np.mean(np.square(errors))) * 1000.0) if errors else float("nan")
+
+    def mean_deg(errors):
+        return float(np.mean(errors)) if errors else float("nan")
+
+    return {
+        "latency_ms": latency_s * 1000.0,
+        "ticks": len(raw_pos_err),
+        "raw_pos_rms_mm": rms_mm(raw_pos_err),
+        "pred_pos_rms_mm": rms_mm(pred_pos_err),
+        "raw_rot_mean_deg": mean_deg(raw_rot_err),
+        "pred_rot_mean_deg": mean_deg(pred_rot_err),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate VR pose prediction error vs. latency")
+    parser.add_argument("--recording", help="JSONL recording written by VRHeadset(record_path=...)")
+    parser.add_argument("--hand", default="right", choices=["left", "right"])
+    parser.add_argument("--latencies", type=float, nargs="+", default=[0, 20, 40, 60, 80, 100, 150], help="ms")
+    parser.add_argument("--jitter", type=float, default=5.0, help="Mean queueing jitter on top of the latency (ms)")
+    parser.add_argument("--tick-hz", type=float, default=30.0)
+    parser.add_argument("--min-cutoff", type=float, default=3.0)
+    parser.add_argument("--beta", type=float, default=20.0)
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    if args.recording:
+        data = load_recording(args.recording, args.hand)
+        source = args.recording
+    else:
+        data = synthetic_trajectory()
+        source = "synthetic"
+    if len(data[0]) < 2:
+        raise SystemExit(f"Not enough {args.hand} hand samples in {source}")
+
+    results = [
+        evaluate(
+            *data,
+            latency_s=latency_ms / 1000.0,
+            jitter_s=args.jitter / 1000.0,
+            tick_hz=args.tick_hz,
+            min_cutoff=args.min_cutoff,
+            beta=args.beta,
+        )
+        for latency_ms in args.latencies
+    ]
+
+    print(f"Pose prediction on {source} ({len(data[0])} samples, {args.jitter:.0f} ms mean jitter)")
+    print(f"{'latency':>9} {'raw pos':>10} {'pred pos':>10} {'raw rot':>9} {'pred rot':>9}")
+    for r in results:
+        print(
+            f"{r['latency_ms']:>7.0f}ms {r['raw_pos_rms_mm']:>8.2f}mm {r['pred_pos_rms_mm']:>8.2f}mm "
+            f"{r['raw_rot_mean_deg']:>7.2f}° {r['pred_rot_mean_deg']:>7.2f}°"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"source": source, "hand": args.hand, "results": results}, f, indent=2)
+        print(f"Saved report to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Serve a recorded session to the web-ui, in place of the robot.
+
+Plays the camera videos and joint states recorded by `SessionRecorder`
+(`record_session_dir` in vr_teleop.py) through the regular camera server and
+VR WebSocket, so the headset client gets the same streams and state push as
+with a robot, from a deterministic, repeatable workload. Playback runs at the
+recorded timing (scaled by --speed) or with --asap as fast as possible.
+
+Seek or change the speed while running:
+    curl -X POST http://localhost:8765/playback -d '{"seek": 12.5, "speed": 2.0}'
+
+Usage:
+    python -m tools.playback_session sessions/pick_cube
+    python -m tools.playback_session sessions/pick_cube --speed 0.5 --start 30 --no-loop
+    python -m tools.playback_session sessions/pick_cube --asap --no-mmap
+    python -m tools.playback_session sessions/pick_cube --ssl --cert ssl_cert/server.crt --key ssl_cert/server.key
+"""
+
+import argparse
+import asyncio
+import json
+
+from aiohttp import web
+
+from server.recorded_session import SessionPlayback
+from server.vr_headset import VRHeadset
+from server.webrtc_camera_server import create_camera_server
+
+
+async def run(args):
+    server = create_camera_server(
+        [], use_https=args.ssl, cert_file=args.cert, key_file=args.key, ice_servers=[]
+    )
+    headset = VRHeadset(use_ssl=args.ssl, cert_file=args.cert, key_file=args.key, state_hz=args.state_hz)
+    playback = SessionPlayback(
+        args.session,
+        camera_sink=server.update_camera_captured_frame,
+        state_sink=headset.publish_state,
+        speed=None if args.asap else args.speed,
+        loop=args.loop,
+        use_mmap=args.mmap,
+    )
+    for camera in playback.cameras:
+        server.add_camera(camera)
+
+    async def get_playback(request):
+        return web.json_response(playback.status())
+
+    async def post_playback(request):
+        try:
+            body = await request.json()
+        except json.JSONDecodeError:
+            raise web.HTTPBadRequest(text="Expected a JSON body")
+        if "speed" in body:
+            playback.set_speed(None if body["speed"] is None else float(body["speed"]))
+        if "seek" in body:
+            playback.seek(float(body["seek"]))
+        return web.json_response(playback.status())
+
+    server.app.router.add_get("/playback", get_playback)
+    server.app.router.add_post("/playback", post_playback)
+
+    await server.start_server()
+    await headset.start()
+    playback.start(args.start)
+    print(f"▶️  Playing {args.session}: {len(playback.cameras)} cameras, {playback.duration:.1f} s")
+    try:
+        while True:
+            await asyncio.sleep(args.report_interval)
+            status = playback.status()
+            print(
+                f"t={status['position']:.1f}/{status['duration']:.1f} s: {status['frames_pushed']} frames, "
+                f"{status['states_pushed']} states, decode {status['decode_ms_per_frame']:.2f} ms/frame, "
+                f"late {status['max_lateness_ms']:.1f} ms max"
+            )
+    finally:
+        playback.stop()
+        await headset.stop()
+        await server.stop_server()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a recorded session to the web-ui")
+    parser.add_argument("session", help="Session directory written by SessionRecorder")
+    parser.add_argument("--speed", type=float, default=1.0, help="Playback speed relative to the recording")
+    parser.add_argument("--asap", action="store_true", help="Play as fast as possible")
+    parser.add_argument("--start", type=float, default=0.0, help="Start position (s)")
+    parser.add_argument("--no-loop", dest="loop", action="store_false")
+    parser.add_argument("--no-mmap", dest="mmap", action="store_false", help="Stream the videos from disk")
+    parser.add_argument("--state-hz", type=float, default=10.0)
+    parser.add_argument("--ssl", action="store_true", help="Serve HTTPS/WSS with --cert and --key")
+    parser.add_argument("--cert", default="ssl_cert/server.crt", help="Certificate of both servers")
+    parser.add_argument("--key", default="ssl_cert/server.key", help="Private key of both servers")
+    parser.add_argument("--report-interval", type=float, default=5.0)
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
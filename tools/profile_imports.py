@@ -0,0 +1,71 @@
+"""
+Import-time profile of the teleop entry points.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter and
+reports the modules with the largest cumulative import time, so regressions
+in startup (a heavy dependency pulled back to module level) are easy to spot.
+The full startup timeline, including robot connection and solver construction,
+is printed by `StartupProfiler` when the teleop script starts.
+
+Usage:
+    python -m tools.profile_imports
+    python -m tools.profile_imports --module phone_teleop --top 30 --output import_profile.json
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S.*)$")
+
+
+def profile_imports(module: str) -> tuple[float, list[dict]]:
+    """Import module in a subprocess and return (wall time in s, per-module import times)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import time; t = time.perf_counter(); import {module}; "
+         f"print(time.perf_counter() - t)"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr.splitlines()[-1] if result.stderr else ''}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        entries.append({
+            "module": name,
+            "self_ms": int(self_us) / 1000.0,
+            "cumulative_ms": int(cumulative_us) / 1000.0,
+            "depth": len(indent) // 2,
+        })
+    return float(result.stdout.strip().splitlines()[-1]), entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile the import time of a teleop entry point")
+    parser.add_argument("--module", default="vr_teleop")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--output", help="Optional JSON report path")
+    args = parser.parse_args()
+
+    wall_s, entries = profile_imports(args.module)
+    top = sorted(entries, key=lambda entry: -entry["cumulative_ms"])[: args.top]
+
+    print(f"import {args.module}: {wall_s * 1000.0:.1f} ms, {len(entries)} modules")
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    for entry in top:
+        print(f"{entry['cumulative_ms']:10.1f}ms {entry['self_ms']:8.1f}ms  {'  ' * entry['depth']}{entry['module']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"module": args.module, "wall_s": wall_s, "modules": top}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
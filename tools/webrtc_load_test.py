@@ -0,0 +1,189 @@
+"""
+Load test of `WebRTCCameraServer` with many concurrent viewers.
+
+Launches the camera server on loopback in a separate process, fed by the
+synthetic camera source, then for each load level opens N viewers through
+the regular `/offer` endpoint, one aiortc peer connection per viewer and
+camera. For every level it reports received FPS, inter-frame jitter, drops
+and latency per peer, and the server process CPU in total and per peer,
+and writes everything to a JSON report for comparison across releases.
+
+Usage:
+    python -m tools.webrtc_load_test
+    python -m tools.webrtc_load_test --viewers 1 2 4 8 16 --duration 15 --output webrtc_load_report.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+from aiohttp import ClientSession
+
+from server.synthetic_camera import FrameCodeStats
+from tools.webrtc_probe import receive_camera
+
+
+def process_cpu_seconds(pid: int) -> float | None:
+    """User + system CPU time of a process, from /proc (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/stat", encoding="utf-8") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    # utime and stime are fields 14 and 15 of stat, i.e. 11 and 12 after the command name
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def serve(args):
+    """Server side, run in its own process so its CPU usage can be measured."""
+    from server.synthetic_camera import SyntheticCameraSource
+    from server.webrtc_camera_server import WebRTCCameraServer
+
+    server = WebRTCCameraServer(host="127.0.0.1", port=args.port)
+    for camera in args.cameras:
+        server.add_camera(camera)
+    source = SyntheticCameraSource(server.update_camera_frame, args.cameras, args.width, args.height, args.fps)
+    await server.start_server()
+    source.start()
+    try:
+        await asyncio.Future()
+    finally:
+        source.stop()
+        await server.stop_server()
+
+
+async def wait_until_healthy(base_url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with ClientSession() as session:
+        while True:
+            try:
+                async with session.get(f"{base_url}/health") as response:
+                    if response.status == 200:
+                        return
+            except OSError:
+                pass
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Camera server at {base_url} did not come up")
+            await asyncio.sleep(0.2)
+
+
+async def run_level(base_url: str, viewers: int, args, server_pid: int) -> dict:
+    peers = [(viewer, camera) for viewer in range(viewers) for camera in args.cameras]
+    stats = [FrameCodeStats() for _ in peers]
+    tasks = [
+        asyncio.create_task(receive_camera(base_url, camera, args.duration, peer_stats, warmup=args.warmup))
+        for (_, camera), peer_stats in zip(peers, stats)
+    ]
+
+    # Server CPU is sampled over the measurement window only, after the warm-up
+    await asyncio.sleep(args.warmup)
+    cpu_start, wall_start = process_cpu_seconds(server_pid), time.perf_counter()
+    await asyncio.sleep(args.duration)
+    cpu_end, wall_end = process_cpu_seconds(server_pid), time.perf_counter()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    failed = sum(isinstance(result, BaseException) for result in results)
+    summaries = [s.summary() for s, result in zip(stats, results) if not isinstance(result, BaseException)]
+    fps = np.array([summary["fps"] for summary in summaries]) if summaries else np.zeros(1)
+    cpu = None
+    if cpu_start is not None and cpu_end is not None:
+        cpu = (cpu_end - cpu_start) / (wall_end - wall_start)
+    return {
+        "viewers": viewers,
+        "peers": len(peers),
+        "failed_peers": failed,
+        "fps_mean": float(fps.mean()),
+        "fps_min": float(fps.min()),
+        "jitter_ms_mean": float(np.mean([s["jitter_ms"] for s in summaries])) if summaries else None,
+        "drop_ratio_mean": float(np.mean([s["drop_ratio"] for s in summaries])) if summaries else None,
+        "latency_ms_p50_mean": float(np.mean([s["latency_ms_p50"] for s in summaries])) if summaries else None,
+        "server_cpu": cpu,
+        "server_cpu_per_peer": cpu / len(peers) if cpu is not None else None,
+        "per_peer": [{"camera": camera, **summary} for (_, camera), summary in zip(peers, summaries)],
+    }
+
+
+async def run_load_test(args) -> dict:
+    base_url = f"http://127.0.0.1:{args.port}"
+    command = [
+        sys.executable, "-m", "tools.webrtc_load_test", "--serve",
+        "--port", str(args.port), "--width", str(args.width), "--height", str(args.height),
+        "--fps", str(args.fps), "--cameras", *args.cameras,
+    ]
+    server = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        await wait_until_healthy(base_url)
+        levels = []
+        for viewers in args.viewers:
+            level = await run_level(base_url, viewers, args, server.pid)
+            levels.append(level)
+            cpu = f"{level['server_cpu']:.0%}" if level["server_cpu"] is not None else "n/a"
+            print(
+                f"📊 {viewers:>3} viewers ({level['peers']} peers): {level['fps_mean']:.1f} FPS mean, "
+                f"{level['fps_min']:.1f} min, jitter {level['jitter_ms_mean'] or 0:.1f} ms, "
+                f"server CPU {cpu}, {level['failed_peers']} failed"
+            )
+            # Let the server tear the previous peers down before the next level
+            await asyncio.sleep(1.0)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+    return {
+        "date": datetime.now(timezone.utc).isoformat(),
+        "revision": git_revision(),
+        "host": {"platform": platform.platform(), "cpus": os.cpu_count(), "python": platform.python_version()},
+        "params": {
+            "cameras": args.cameras,
+            "width": args.width,
+            "height": args.height,
+            "fps": args.fps,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+        },
+        "levels": levels,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test WebRTCCameraServer with N concurrent viewers")
+    parser.add_argument("--viewers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--cameras", nargs="+", default=["left_wrist", "right_wrist", "main"])
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--duration", type=float, default=10.0, help="Measurement window per level (s)")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Connection warm-up per level (s)")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--output", default="webrtc_load_report.json")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        asyncio.run(serve(args))
+        return
+
+    report = asyncio.run(run_load_test(args))
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+End-to-end probe of the WebRTC video path with a synthetic camera.
+
+Starts `WebRTCCameraServer` on loopback fed by `SyntheticCameraSource`,
+connects an aiortc client through the regular `/offer` endpoint, decodes the
+frame code of every received frame and reports received FPS, dropped and
+duplicated frames and capture-to-receive latency. No camera or browser needed.
+
+Usage:
+    python -m tools.webrtc_probe
+    python -m tools.webrtc_probe --width 1280 --height 720 --fps 60 --duration 20
+    python -m tools.webrtc_probe --pattern sim
+"""
+
+import argparse
+import asyncio
+import json
+
+from aiohttp import ClientSession
+from aiortc import RTCPeerConnection, RTCSessionDescription
+
+from server.synthetic_camera import FrameCodeStats, SyntheticCameraSource, decode_frame_code
+from server.webrtc_camera_server import WebRTCCameraServer
+
+
+async def receive_camera(
+    base_url: str,
+    camera: str,
+    duration: float,
+    stats: FrameCodeStats,
+    block: int = 16,
+    warmup: float = 0.0,
+):
+    """Open one receive-only peer connection for camera and record the decoded frames into stats."""
+    pc = RTCPeerConnection()
+    pc.addTransceiver("video", direction="recvonly")
+    track_ready = asyncio.get_running_loop().create_future()
+
+    @pc.on("track")
+    def on_track(track):
+        if not track_ready.done():
+            track_ready.set_result(track)
+
+    await pc.setLocalDescription(await pc.createOffer())
+    async with ClientSession() as session:
+        async with session.post(
+            f"{base_url}/offer",
+            json={"sdp": pc.localDescription.sdp, "type": pc.localDescription.type, "camera": camera},
+        ) as response:
+            answer = await response.json()
+    await pc.setRemoteDescription(RTCSessionDescription(sdp=answer["sdp"], type=answer["type"]))
+
+    track = await asyncio.wait_for(track_ready, timeout=10.0)
+    loop = asyncio.get_running_loop()
+    record_from = loop.time() + warmup
+    end = record_from + duration
+    try:
+        while loop.time() < end:
+            frame = await asyncio.wait_for(track.recv(), timeout=5.0)
+            # Frames during the warm-up (ICE, first keyframe, encoder ramp-up) are not recorded
+            if loop.time() >= record_from:
+                stats.record(decode_frame_code(frame.to_ndarray(format="rgb24"), block))
+    finally:
+        await pc.close()
+
+
+async def run_probe(args) -> dict:
+    server = WebRTCCameraServer(host="127.0.0.1", port=args.port)
+    server.add_camera(args.camera)
+    source = SyntheticCameraSource(
+        server.update_camera_frame, [args.camera], args.width, args.height, args.fps, pattern=args.pattern
+    )
+    await server.start_server()
+    source.start()
+    try:
+        stats = FrameCodeStats()
+        await receive_camera(f"http://127.0.0.1:{args.port}", args.camera, args.duration, stats)
+    finally:
+        source.stop()
+        await server.stop_server()
+    return {**stats.summary(), "source_frames": source.frames_generated, "source_overruns": source.overruns}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure drops, duplicates and latency through WebRTCCameraServer")
+    parser.add_argument("--camera", default="main")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--pattern", default="bars", choices=["bars", "sim"])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--output", help="Optional JSON report path")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_probe(args))
+    print(
+        f"📊 {report['fps']:.1f} FPS received, {report['dropped']} dropped ({report['drop_ratio']:.1%}), "
+        f"{report['duplicates']} duplicated, {report['undecodable']} undecodable"
+    )
+    print(f"📊 Latency p50 {report['latency_ms_p50']:.1f} ms, p95 {report['latency_ms_p95']:.1f} ms, "
+          f"jitter {report['jitter_ms']:.1f} ms")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import time
 from dataclasses import dataclass, field
 
 from lerobot.configs.types import FeatureType, PipelineFeatureType, PolicyFeature
@@ -5,6 +6,89 @@ from lerobot.processor import ProcessorStepRegistry, RobotAction, RobotActionPro
 from lerobot.teleoperators.phone.config_phone import PhoneOS
 from lerobot.utils.rotation import Rotation
 
+from base.gripper_control import GripperController
+from base.pose_filter import PosePredictor, prediction_horizon
+from base.reachability import SO101_REACHABILITY_PATH, ReachabilityMap
+
+
+@ProcessorStepRegistry.register("vr_pose_predictor")
+@dataclass
+class VRPosePredictor(RobotActionProcessorStep):
+    """
+    Smooths the VR controller pose and extrapolates it to the actuation time.
+
+    The VR pose reaching the control loop is already stale by the network
+    delay plus the time it waited for the tick. This step keeps a short history of timestamped
+    poses, rejects jitter with a One-Euro filter and predicts where the hand
+    will be when the resulting joint command is applied. It must run before
+    `MapVRActionToRobotAction`.
+
+    Poses are timestamped by `VRHeadset` with the client sample time `t`
+    (milliseconds), the server receive time `t_recv` (seconds, perf_counter)
+    and `t_sample`, the sample time on the server clock estimated from the
+    client clock offset and the ping round trip. The horizon is the age of
+    the sample since `t_sample` - network delay included - plus latency_s
+    (`prediction_horizon`). The web-ui stops sending a hand that is not
+    moving, so a hand not received for `stale_after_s` is held instead of
+    extrapolated.
+
+    Attributes:
+        latency_s: Expected delay between the control tick and the actuation.
+        max_horizon_s: Upper bound on the extrapolation horizon.
+        stale_after_s: Sample age after which the hand is assumed at rest.
+        history: Number of samples used to estimate velocities.
+        min_cutoff: One-Euro cutoff frequency (Hz) at rest.
+        beta: One-Euro speed coefficient.
+    """
+
+    latency_s: float = 0.05
+    max_horizon_s: float = 0.1
+    stale_after_s: float = 0.1
+    history: int = 6
+    min_cutoff: float = 3.0
+    beta: float = 20.0
+
+    _predictor: PosePredictor = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._predictor = PosePredictor(history=self.history, min_cutoff=self.min_cutoff, beta=self.beta)
+
+    def action(self, action: RobotAction) -> RobotAction:
+        t_client = action.pop("t", None)
+        t_recv = action.pop("t_recv", None)
+        t_server = action.pop("t_sample", None)
+
+        # The pose is a delta from the grab start, restart the history on every grab
+        if not action.get("enabled") or action.get("pos") is None or action.get("rot") is None:
+            self._predictor.reset()
+            return action
+
+        now = time.perf_counter()
+        t_recv = now if t_recv is None else t_recv
+        t_sample = t_recv if t_client is None else t_client / 1000.0
+        self._predictor.update(t_sample, action["pos"], action["rot"])
+
+        horizon = prediction_horizon(
+            now,
+            t_recv if t_server is None else t_server,
+            t_recv,
+            self.latency_s,
+            self.max_horizon_s,
+            self.stale_after_s,
+        )
+        pos, quat = self._predictor.predict(horizon)
+        action["pos"] = pos.tolist()
+        action["rot"] = quat.tolist()
+        return action
+
+    def reset(self):
+        self._predictor.reset()
+
+    def transform_features(
+        self, features: dict[PipelineFeatureType, dict[str, PolicyFeature]]
+    ) -> dict[PipelineFeatureType, dict[str, PolicyFeature]]:
+        return features
+
 
 @ProcessorStepRegistry.register("map_phone_action_to_robot_action")
 @dataclass
@@ -41,8 +125,14 @@ class MapVRActionToRobotAction(RobotActionProcessorStep):
         # Pop them from the action
         enabled = bool(action.pop("enabled"))
         joystickY = action.pop("joystickY")
+        # Absolute gripper command, consumed by the GripperController before the pipeline
+        action.pop("trigger", None)
         pos = action.pop("pos")
         rot = action.pop("rot")
+        # Timestamps added by VRHeadset when no VRPosePredictor consumed them
+        action.pop("t", None)
+        action.pop("t_recv", None)
+        action.pop("t_sample", None)
 
         if pos is None or rot is None:
             raise ValueError("pos and rot must be present in action")
@@ -98,3 +188,76 @@ class MapVRActionToRobotAction(RobotActionProcessorStep):
             )
 
         return features
+
+
+@ProcessorStepRegistry.register("gripper_command_to_joint")
+@dataclass
+class GripperCommandToJoint(RobotActionProcessorStep):
+    """
+    Replaces the gripper velocity with the command of a `GripperController`.
+
+    Drop-in for lerobot's `GripperVelocityToJoint`, which adds a fixed step per
+    tick and so makes the gripper speed depend on the loop rate. The
+    controller is shared by both arms and stepped once per tick with the
+    measured dt, before the pipelines run; this step only picks the arm's
+    command. It must run before `InverseKinematicsEEToJoints`.
+
+    Attributes:
+        controller: Controller stepped by the control loop.
+        index: Gripper of this arm in the controller.
+    """
+
+    controller: GripperController = field(repr=False)
+    index: int = 0
+
+    def action(self, action: RobotAction) -> RobotAction:
+        action.pop("gripper_vel", None)
+        action["ee.gripper_pos"] = float(self.controller.command[self.index])
+        return action
+
+    def transform_features(
+        self, features: dict[PipelineFeatureType, dict[str, PolicyFeature]]
+    ) -> dict[PipelineFeatureType, dict[str, PolicyFeature]]:
+        features[PipelineFeatureType.ACTION].pop("gripper_vel", None)
+        features[PipelineFeatureType.ACTION]["ee.gripper_pos"] = PolicyFeature(type=FeatureType.ACTION, shape=(1,))
+        return features
+
+
+@ProcessorStepRegistry.register("ee_reachability_clamp")
+@dataclass
+class EEReachabilityClamp(RobotActionProcessorStep):
+    """
+    Clamps the end-effector target to the precomputed reachable workspace.
+
+    `EEBoundsAndSafety` only enforces a coarse box, so targets the arm cannot
+    reach (or only reach at full extension) used to go straight to IK, which
+    then iterates against the regularizer and oscillates near the singularity.
+    This step looks the target up in a `ReachabilityMap` (O(1), memory-mapped)
+    and moves unreachable targets onto the nearest reachable voxel. It must run
+    after `EEBoundsAndSafety` and before `InverseKinematicsEEToJoints`.
+
+    Attributes:
+        map_path: Directory written by `tools/build_reachability_map.py`.
+        clamped: Number of targets moved so far.
+    """
+
+    map_path: str = SO101_REACHABILITY_PATH
+    clamped: int = field(default=0, init=False)
+
+    _map: ReachabilityMap = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._map = ReachabilityMap(self.map_path)
+
+    def action(self, action: RobotAction) -> RobotAction:
+        target = (action["ee.x"], action["ee.y"], action["ee.z"])
+        position, clamped = self._map.clamp(target)
+        if clamped:
+            self.clamped += 1
+            action["ee.x"], action["ee.y"], action["ee.z"] = (float(v) for v in position)
+        return action
+
+    def transform_features(
+        self, features: dict[PipelineFeatureType, dict[str, PolicyFeature]]
+    ) -> dict[PipelineFeatureType, dict[str, PolicyFeature]]:
+        return features
@@ -1,95 +1,181 @@
+from base.profiling import StartupProfiler
+
+# Created first so the startup profile covers the imports below
+profiler = StartupProfiler()
+
+import copy
+import functools
+import json
+import os
 import time
-import cv2
-from lerobot.cameras.opencv.configuration_opencv import OpenCVCameraConfig
+
 import numpy as np
-import copy
-import threading
-
-from lerobot.model.kinematics import RobotKinematics
-from lerobot.processor import RobotAction, RobotObservation, RobotProcessorPipeline
-from lerobot.processor.converters import (
-    robot_action_observation_to_transition,
-    transition_to_robot_action,
-)
-from lerobot.robots.so100_follower.config_so100_follower import SO100FollowerConfig
-from lerobot.robots.so100_follower.robot_kinematic_processor import (
-    EEBoundsAndSafety,
-    EEReferenceAndDelta,
-    GripperVelocityToJoint,
-    InverseKinematicsEEToJoints,
-)
-from lerobot.robots.so100_follower.so100_follower import SO100Follower
-from lerobot.robots.bi_so100_follower.config_bi_so100_follower import BiSO100FollowerConfig
-from lerobot.robots.bi_so100_follower.bi_so100_follower import BiSO100Follower
-from lerobot.teleoperators.phone.config_phone import PhoneConfig, PhoneOS
-# from lerobot.teleoperators.phone.phone_processor import MapPhoneActionToRobotAction
-from lerobot.teleoperators.phone.teleop_phone import Phone
-from lerobot.utils.robot_utils import busy_wait
-from lerobot.utils.visualization_utils import init_rerun, log_rerun_data
-
-from server import VRHeadset, create_camera_server
-from vr_processor import MapVRActionToRobotAction
 
-FPS = 30
+from base.collision import DualArmCollisionChecker, side_by_side_base_poses
+from base.duo_bus_io import DuoBusIO
+from base.frame_cache import FrameProductCache
+from base.gripper_control import GripperController
+from base.kinematics import SO101_URDF_PATH, get_kinematics_solver, prewarm_kinematics_solvers
+from base.observation_cache import TickObservationCache, make_cached_transition_converter
+from base.reachability import SO101_REACHABILITY_PATH
+from base.rerun_logger import AsyncRerunLogger
+from base.runtime import TeleopRuntime
+from base.trajectory_streamer import JointTrajectoryStreamer
+
+# Heavy dependencies (lerobot processors, placo, cv2, aiortc, av, rerun) are
+# imported inside the startup services, so they load concurrently with the
+# robot connection instead of serially before it.
 
-# Initialize the robot and teleoperator
-duo_camera_config = {
-    "left_wrist": OpenCVCameraConfig(index_or_path=1, width=640, height=480, fps=FPS),
-    "right_wrist": OpenCVCameraConfig(index_or_path=0, width=640, height=480, fps=FPS),
-    "main": OpenCVCameraConfig(index_or_path=2, width=640, height=480, fps=FPS)
-}
-duo_robot_config = BiSO100FollowerConfig(
-    left_arm_port="/dev/tty.usbmodem5A460842561", 
-    right_arm_port="/dev/tty.usbmodem58FA0963791",
-    id="duo_robot", 
-    left_arm_use_degrees=True, 
-    right_arm_use_degrees=True,
-    cameras=duo_camera_config
-)
-duo_robot = BiSO100Follower(duo_robot_config)
-
-teleop_device = VRHeadset()
+FPS = 30
+COMMAND_HZ = 120  # Rate of interpolated servo commands, IK still runs at FPS
+STATS_INTERVAL_S = 5.0
+RUNTIME_WORKERS = 4  # Control tick, camera capture and headroom for blocking service calls
+# Thread roles (control, camera, encode, network) -> cpus / fifo_priority / nice / threads,
+# see base/thread_policy.py. None leaves every thread to the OS scheduler. For example:
+#   {"control": {"cpus": [2], "fifo_priority": 50}, "camera": {"cpus": [3]},
+#    "encode": {"cpus": [0, 1], "nice": 5}, "network": {"cpus": [0, 1]}}
+THREAD_POLICY = None
+
+# Robot and teleoperator configuration. These are the settings of a single station;
+# launch_stations.py runs several from a station file, see `configure`.
+station_name = "duo"
+teleop_mode = "vr"  # "vr": Quest controllers over the VR WebSocket, "phone": see phone_teleop.py
+use_sim = False  # Set to True to drive the MuJoCo duo simulation instead of the hardware
+LEFT_ARM_PORT = "/dev/tty.usbmodem5A460842561"
+RIGHT_ARM_PORT = "/dev/tty.usbmodem58FA0963791"
+CAMERA_INDICES = {"left_wrist": 1, "right_wrist": 0, "main": 2}
+CAMERA_WIDTH, CAMERA_HEIGHT = 640, 480
+# Read timeout per camera name, cameras not listed here wait CAMERA_TIMEOUT_MS
+CAMERA_TIMEOUT_MS = 50
+CAMERA_TIMEOUTS_MS = {"main": 500}
+# Known up front so the solvers can be built while the buses are still connecting
+MOTOR_NAMES = ["shoulder_pan", "shoulder_lift", "elbow_flex", "wrist_flex", "wrist_roll", "gripper"]
+
+# Distance between the two arm bases (left arm at +y), measure it on your setup
+ARM_SPACING_M = 0.40
+COLLISION_MARGIN_M = 0.01
+
+# Built offline with `python -m tools.build_reachability_map`, the clamp is skipped without it
+REACHABILITY_MAP_PATH = SO101_REACHABILITY_PATH
+
+# Width of the camera images logged to rerun, None logs them at full resolution
+RERUN_IMAGE_WIDTH = None
+RERUN_HZ = 15  # Rerun is logged from its own thread at up to this rate, off the control tick
+
+# Region-of-interest encoding of the wrist cameras: full resolution around the gripper
+# (or where the operator looks), a coarser periphery. None streams a camera in full.
+ROI_CAMERAS = {"left_wrist": {"mode": "foveate"}, "right_wrist": {"mode": "foveate"}}
+
+# "joystick": the thumbstick opens / closes the gripper at a speed set by its deflection,
+# "trigger": the analog trigger sets the opening directly (released = open, pulled = closed)
+GRIPPER_MODE = "joystick"
+GRIPPER_INDEX = {"left_arm": 0, "right_arm": 1}
+
+# Phone mode: arm -> phone OS ("ios" / "android"), None uses phone_teleop.PHONE_ARMS
+phone_arms = None
+
+# Ports of the VR WebSocket and of the WebRTC camera server (which serves the web-ui)
+VR_PORT = 8080
+CAMERA_PORT = 8765
+# Every stats report is also written to this JSON file, read by launch_stations.py
+metrics_path = None
 
 # Initialize WebRTC camera server with HTTPS
 use_https = True  # Set to False for HTTP
 cert_file = "ssl_cert/server.crt"
 key_file = "ssl_cert/server.key"
-
-camera_server = create_camera_server(
-    duo_robot.cameras.keys(), 
-    use_https=use_https,
-    cert_file=cert_file,
-    key_file=key_file
-)
-
-# Start camera server in background thread
-server_thread = threading.Thread(target=camera_server.run_in_thread, daemon=True)
-server_thread.start()
-
-if use_https:
-    print("🔒 HTTPS WebRTC camera server started on https://0.0.0.0:8765")
-    print("📱 Access from Quest 3: https://YOUR_IP:8765")
-else:
-    print("🎥 HTTP WebRTC camera server started on http://0.0.0.0:8765")
-
-# NOTE: It is highly recommended to use the urdf in the SO-ARM100 repo: https://github.com/TheRobotStudio/SO-ARM100/blob/main/Simulation/SO101/so101_new_calib.urdf
-def get_kinematics_solver(motor_names: list[str]) -> RobotKinematics:
-    kin = RobotKinematics(
-        urdf_path="Simulation/SO101/so101_new_calib.urdf",
-        target_frame_name="gripper_frame_link",
-        joint_names=motor_names,
+# The headset is on the same LAN: host ICE candidates only, no STUN lookup per (re)connect
+ice_servers = []
+web_ui_dev_mode = False  # Reload edited web-ui files without restarting (no immutable caching)
+# Record cameras and joint states to this directory, replayed with `python -m tools.playback_session`
+record_session_dir = None
+
+
+def configure(station):
+    """Apply a `StationConfig` to the settings above; called by launch_stations.py before `main`."""
+    global station_name, teleop_mode, use_sim, LEFT_ARM_PORT, RIGHT_ARM_PORT, CAMERA_INDICES
+    global CAMERA_WIDTH, CAMERA_HEIGHT, FPS, COMMAND_HZ, ARM_SPACING_M, GRIPPER_MODE, ROI_CAMERAS
+    global phone_arms, VR_PORT, CAMERA_PORT, use_https, cert_file, key_file, ice_servers
+    global web_ui_dev_mode, record_session_dir, THREAD_POLICY
+
+    station_name = station.name
+    teleop_mode = station.mode
+    use_sim = station.use_sim
+    LEFT_ARM_PORT, RIGHT_ARM_PORT = station.left_arm_port, station.right_arm_port
+    CAMERA_INDICES = dict(station.cameras)
+    CAMERA_WIDTH, CAMERA_HEIGHT = station.camera_width, station.camera_height
+    FPS, COMMAND_HZ = station.fps, station.command_hz
+    ARM_SPACING_M = station.arm_spacing_m
+    GRIPPER_MODE = station.gripper_mode
+    ROI_CAMERAS = dict(station.roi_cameras)
+    phone_arms = dict(station.phone_arms)
+    VR_PORT, CAMERA_PORT = station.vr_port, station.camera_port
+    use_https, cert_file, key_file = station.use_https, station.cert_file, station.key_file
+    ice_servers = list(station.ice_servers)
+    web_ui_dev_mode = station.web_ui_dev_mode
+    record_session_dir = station.record_session_dir
+    THREAD_POLICY = station.thread_policy
+
+
+def make_duo_robot():
+    if use_sim:
+        from base.sim_duo_robot import SimDuoRobot, SimDuoRobotConfig
+
+        return SimDuoRobot(SimDuoRobotConfig(arm_spacing=ARM_SPACING_M, camera_fps=FPS))
+
+    from lerobot.cameras.opencv.configuration_opencv import OpenCVCameraConfig
+    from lerobot.robots.bi_so100_follower.bi_so100_follower import BiSO100Follower
+    from lerobot.robots.bi_so100_follower.config_bi_so100_follower import BiSO100FollowerConfig
+
+    duo_camera_config = {
+        name: OpenCVCameraConfig(index_or_path=index, width=CAMERA_WIDTH, height=CAMERA_HEIGHT, fps=FPS)
+        for name, index in CAMERA_INDICES.items()
+    }
+    duo_robot_config = BiSO100FollowerConfig(
+        left_arm_port=LEFT_ARM_PORT,
+        right_arm_port=RIGHT_ARM_PORT,
+        id="duo_robot",
+        left_arm_use_degrees=True,
+        right_arm_use_degrees=True,
+        cameras=duo_camera_config
     )
-    # Regularization prevents singularity-induced oscillation at full extension.
-    # The L2 penalty on ||dq||² keeps the QP well-conditioned so the solver
-    # returns a stable, unique solution near workspace boundaries.
-    kin.solver.add_regularization_task(2e-3)
-    return kin
-
-# Build pipeline to convert phone action to ee pose action to joint action
-def get_vr_to_arm_processor(motor_names: list[str]) -> RobotProcessorPipeline[tuple[RobotAction, RobotObservation], RobotAction]:
-    kinematics_solver = get_kinematics_solver(motor_names)
+    return BiSO100Follower(duo_robot_config)
+
+
+# Build pipeline to convert phone action to ee pose action to joint action.
+# The observation is taken from the tick-scoped cache, so every step of the
+# pipeline shares the single bus read done at the start of the tick.
+@functools.cache
+def reachability_map_available(path: str) -> bool:
+    """Whether the reachability map exists; a missing one is reported once, not on every pipeline rebuild."""
+    if os.path.isdir(path):
+        return True
+    print(f"⚠️ No reachability map at {path}, targets are only bounded by EEBoundsAndSafety")
+    return False
+
+
+def get_vr_to_arm_processor(
+    motor_names: list[str], arm: str, obs_cache: TickObservationCache, gripper: GripperController
+):
+    from lerobot.processor import RobotAction, RobotObservation, RobotProcessorPipeline
+    from lerobot.processor.converters import transition_to_robot_action
+    from lerobot.robots.so100_follower.robot_kinematic_processor import (
+        EEBoundsAndSafety,
+        EEReferenceAndDelta,
+        InverseKinematicsEEToJoints,
+    )
+
+    from vr_processor import EEReachabilityClamp, GripperCommandToJoint, MapVRActionToRobotAction, VRPosePredictor
+
+    # Cached per arm: rebuilding the pipeline on reset does not parse the URDF again
+    kinematics_solver = get_kinematics_solver(motor_names, key=arm)
+    # Unreachable targets are clamped before they reach IK
+    reachability_steps = []
+    if reachability_map_available(REACHABILITY_MAP_PATH):
+        reachability_steps.append(EEReachabilityClamp(map_path=REACHABILITY_MAP_PATH))
     return RobotProcessorPipeline[tuple[RobotAction, RobotObservation], RobotAction](
         steps=[
+            VRPosePredictor(latency_s=1.0 / FPS),
             MapVRActionToRobotAction(),
             EEReferenceAndDelta(
                 kinematics=kinematics_solver,
@@ -101,124 +187,499 @@ def get_vr_to_arm_processor(motor_names: list[str]) -> RobotProcessorPipeline[tu
                 end_effector_bounds={"min": [-1.0, -1.0, -1.0], "max": [1.0, 1.0, 1.0]},
                 max_ee_step_m=0.20,
             ),
-            GripperVelocityToJoint(
-                speed_factor=20.0,
-            ),
+            *reachability_steps,
+            # Stepped with the measured tick dt by VRDuoTeleop.step_grippers
+            GripperCommandToJoint(controller=gripper, index=GRIPPER_INDEX[arm]),
             InverseKinematicsEEToJoints(
                 kinematics=kinematics_solver,
                 motor_names=motor_names,
                 initial_guess_current_joints=True,
             ),
         ],
-        to_transition=robot_action_observation_to_transition,
+        to_transition=make_cached_transition_converter(obs_cache, arm),
         to_output=transition_to_robot_action,
     )
 
-processors = {
-    "left_arm": get_vr_to_arm_processor(list(duo_robot.left_arm.bus.motors.keys())),
-    "right_arm": get_vr_to_arm_processor(list(duo_robot.right_arm.bus.motors.keys())),
-    "has_initial_position": True
-}
-
-# Connect to the robot and teleoperator
-duo_robot.connect()
-teleop_device.connect()
-
-# Init rerun viewer
-init_rerun(session_name="vr_lerobot_duo_teleop")
-
-if not duo_robot.is_connected or not teleop_device.is_connected:
-    raise ValueError("Robot or teleop is not connected!")
-
-initial_right_arm_obs = duo_robot.right_arm.get_observation()
-initial_left_arm_obs = duo_robot.left_arm.get_observation()
-
-def reset_robot_to_initial_position(processors):
-    print("Resetting robot to initial position...")
-    _ = duo_robot.right_arm.send_action(initial_right_arm_obs)
-    _ = duo_robot.left_arm.send_action(initial_left_arm_obs)
-
-    processors["left_arm"] = get_vr_to_arm_processor(list(duo_robot.left_arm.bus.motors.keys()))
-    processors["right_arm"] = get_vr_to_arm_processor(list(duo_robot.right_arm.bus.motors.keys()))
-    processors["has_initial_position"] = True
-
-
-print("Starting teleop loop. Move your phone to teleoperate the robot...")
-while True:
-    t0 = time.perf_counter()
-
-    # Get robot observation
-    right_arm_obs = duo_robot.right_arm.get_observation()
-    left_arm_obs = duo_robot.left_arm.get_observation()
-    # robot_obs = {'shoulder_pan.pos': 1.3186813186813187, 'shoulder_lift.pos': -20.703296703296704, 'elbow_flex.pos': 8.131868131868131, 'wrist_flex.pos': 60.35164835164835, 'wrist_roll.pos': 8.483516483516484, 'gripper.pos': 1.2303485987696514}
-
-    # Capture and stream camera frames
-    try:
-        # Get frames from cameras
-        left_wrist_frame = duo_robot.cameras["left_wrist"].async_read(timeout_ms=50)
-        right_wrist_frame = duo_robot.cameras["right_wrist"].async_read(timeout_ms=50)
-        main_frame = duo_robot.cameras["main"].async_read(timeout_ms=500)
-        
-        # Update WebRTC streams
-        if left_wrist_frame is not None:
-            camera_server.update_camera_frame("left_wrist", left_wrist_frame)
-        if right_wrist_frame is not None:
-            camera_server.update_camera_frame("right_wrist", right_wrist_frame)
-        if main_frame is not None:
-            camera_server.update_camera_frame("main", main_frame)
-            
-    except Exception as e:
-        print(f"Error capturing camera frames: {e}")
-
-    # Get teleop action
-    vr_obs = teleop_device.last_observation
-
-    if vr_obs is None:
-        # print("No VR observation received yet.")
-        # log_rerun_data(observation=left_arm_obs, action=None)
-        log_rerun_data(observation=duo_robot.get_observation(), action=None)
-    elif vr_obs['reset'] and not processors["has_initial_position"]:
-        reset_robot_to_initial_position(processors)
-    else:
-        print("VR Observation: ", vr_obs)
 
-        right_controller_obs = copy.deepcopy(vr_obs["right"])
-        # print(f"VR Observation: {right_controller_obs}")
-
-        if right_controller_obs["enabled"]:
-            processors["has_initial_position"] = False
-            print(f"Right Arm VR Position: {right_controller_obs['pos']}")
+class VRDuoTeleop:
+    """
+    State and per-tick work of the VR -> duo arm teleoperation.
+
+    Also the base of the other teleop modes (`phone_teleop.PhoneDuoTeleop`):
+    they share the robot connection, cached solvers, trajectory streamers,
+    collision check, gripper controller, camera capture, asynchronous rerun
+    logging and statistics, and override the pipelines and the control step.
+    """
+
+    def __init__(self, teleop_device):
+        self.teleop_device = teleop_device
+        self.duo_robot = None
+        self.camera_server = None
+        self.bus_io = None
+        # The buses only exist once the robot is connected, resolve them at call time
+        self.obs_cache = TickObservationCache(
+            read_one=lambda arm: self.bus_io.read_arm(arm),
+            read_all=lambda: self.bus_io.read(),
+        )
+        self.motor_names = {"left_arm": list(MOTOR_NAMES), "right_arm": list(MOTOR_NAMES)}
+        # Arms with an input and thus a pipeline (and solver), the others hold
+        self.driven_arms = ("left_arm", "right_arm")
+        self.processors = {"has_initial_position": True}
+        self.streamers = {}
+        self.initial_arm_obs = {}
+        # lerobot cameras (and the simulation) deliver RGB; RGB, YUV420 and thumbnails
+        # are derived once per frame and shared by the WebRTC tracks and rerun logging
+        self.frame_cache = FrameProductCache(CAMERA_INDICES, color_order="rgb")
+        self._sent_first_command = False
+        # Last seen VRHeadset.controller_changes, a new pose source gets fresh pipelines
+        self._controller_changes = 0
+        self.collision_checker = None
+        self.collisions_avoided = 0
+        self._holding = False  # Warn once per hold, not on every tick of it
+        # Both grippers in one vectorized controller, integrated with the measured tick time
+        self.gripper = GripperController(count=len(GRIPPER_INDEX))
+        self._gripper_velocity = np.zeros(len(GRIPPER_INDEX))
+        self._gripper_position = np.full(len(GRIPPER_INDEX), np.nan)
+        self.rerun_logger = AsyncRerunLogger(max_hz=RERUN_HZ)
+        self.recorder = None
+        if record_session_dir is not None:
+            from server.recorded_session import SessionRecorder
+
+            self.recorder = SessionRecorder(record_session_dir, fps=FPS, gop=FPS)
+
+    def make_arm_processor(self, arm: str):
+        return get_vr_to_arm_processor(self.motor_names[arm], arm, self.obs_cache, self.gripper)
+
+    def build_processors(self):
+        """Build both arms' solvers concurrently, then their pipelines (blocking)."""
+        with profiler.phase("kinematics solvers"):
+            prewarm_kinematics_solvers({arm: self.motor_names[arm] for arm in self.driven_arms})
+        with profiler.phase("processor pipelines"):
+            self.reset_pipelines()
+        with profiler.phase("collision geometry"):
+            self.collision_checker = DualArmCollisionChecker(
+                SO101_URDF_PATH,
+                side_by_side_base_poses(ARM_SPACING_M),
+                joint_names=MOTOR_NAMES,
+                margin=COLLISION_MARGIN_M,
+            )
+
+    def connect(self):
+        """Connect the robot and start streaming from its current position (blocking)."""
+        with profiler.phase("robot import"):
+            self.duo_robot = make_duo_robot()
+        with profiler.phase("robot connect"):
+            self.duo_robot.connect()
+        if not self.duo_robot.is_connected:
+            raise ValueError("Robot is not connected!")
+
+        for arm, follower in (("left_arm", self.duo_robot.left_arm), ("right_arm", self.duo_robot.right_arm)):
+            bus_motors = list(follower.bus.motors.keys())
+            if bus_motors != self.motor_names[arm]:
+                raise ValueError(f"Unexpected motors on {arm}: {bus_motors}")
+
+        # One sync read/write per bus per tick, both buses overlapped
+        self.bus_io = DuoBusIO(self.duo_robot)
+        self.initial_arm_obs = self.bus_io.read()
+        # Each bus is shared by the control loop (reads) and its streamer thread (writes)
+        for arm in ("left_arm", "right_arm"):
+            self.streamers[arm] = JointTrajectoryStreamer(
+                self.motor_names[arm],
+                self.bus_io.arms[arm].send_action,
+                command_hz=COMMAND_HZ,
+                lock=self.bus_io.locks[arm],
+                name=f"{arm}_streamer",
+            )
+            self.streamers[arm].start(self.initial_arm_obs[arm])
+
+    def disconnect(self):
+        """Stop streaming and disconnect the robot (blocking)."""
+        for streamer in self.streamers.values():
+            streamer.stop()
+        if self.bus_io is not None:
+            self.bus_io.close()
+        if self.duo_robot is not None and self.duo_robot.is_connected:
+            self.duo_robot.disconnect()
+        if self.recorder is not None:
+            self.recorder.close()
+
+    def reset_robot_to_initial_position(self):
+        print("Resetting robot to initial position...")
+        self.streamers["right_arm"].set_target(self.initial_arm_obs["right_arm"])
+        self.streamers["left_arm"].set_target(self.initial_arm_obs["left_arm"])
+
+        self.reset_pipelines()
+        self.gripper.reset()
+        self.processors["has_initial_position"] = True
+        # The arms are about to move, later consumers in this tick must not see stale joints
+        self.obs_cache.invalidate()
+
+    def reset_pipelines(self):
+        """Rebuild the driven arms' pipelines, dropping latched references, filters and predictor history."""
+        for arm in self.driven_arms:
+            self.processors[arm] = self.make_arm_processor(arm)
+
+    def camera_tick(self, dt: float):
+        """Capture and stream camera frames."""
+        # Every configured camera, whatever its name; one failing camera does not stop the others
+        for name, camera in self.duo_robot.cameras.items():
+            try:
+                frame = camera.async_read(timeout_ms=CAMERA_TIMEOUTS_MS.get(name, CAMERA_TIMEOUT_MS))
+                if frame is None:
+                    continue
+                # Publishing evicts the previous frame's products; update WebRTC streams
+                captured = self.frame_cache.publish(name, frame)
+                if self.camera_server is not None:
+                    self.camera_server.update_camera_captured_frame(name, captured)
+                if self.recorder is not None:
+                    self.recorder.record_frame(name, captured)
+            except Exception as e:
+                print(f"Error capturing camera frames from {name}: {e}")
+
+    def rerun_images(self) -> dict:
+        """Latest camera images for rerun, from the shared per-frame products."""
+        return {
+            name: captured.rgb if RERUN_IMAGE_WIDTH is None else captured.thumbnail(RERUN_IMAGE_WIDTH)
+            for name, captured in self.frame_cache.latest_frames().items()
+        }
+
+    def check_streamers(self):
+        """Stop the teleop (by raising from the control tick) if a streamer died: its arm is no longer commanded."""
+        for arm, streamer in self.streamers.items():
+            if not streamer.is_running:
+                raise RuntimeError(f"{arm} trajectory streamer stopped ({streamer.error!r}), stopping the teleop")
+
+    def control_tick(self, dt: float):
+        """Run one control step and push the resulting robot state to the VR clients."""
+        self.check_streamers()
+        start = time.perf_counter()
+        try:
+            self.control_step(dt)
+        finally:
+            self.publish_robot_state((time.perf_counter() - start) * 1000.0)
+
+    def publish_robot_state(self, tick_ms: float):
+        """Hand this tick's joints (already in the observation cache) to the headset's state push."""
+        if self.bus_io is None:
+            return
+        vr_obs = self.teleop_device.last_observation or {}
+        joints = {arm: self.obs_cache.get(arm) for arm in ("left_arm", "right_arm")}
+        enabled = {hand: bool((vr_obs.get(hand) or {}).get("enabled")) for hand in ("left", "right")}
+        self.teleop_device.publish_state(joints=joints, tick_ms=tick_ms, enabled=enabled)
+        if self.recorder is not None:
+            self.recorder.record_state(joints, tick_ms, enabled)
+
+    def step_grippers(self, dt: float, commands: dict[str, tuple[float, float | None]]):
+        """
+        Advance both grippers by the tick time; the pipelines then read their commands.
+
+        commands maps an arm to its (velocity, trigger) input, trigger None in
+        velocity mode. Arms without a command hold their gripper.
+        """
+        measured = np.empty(len(GRIPPER_INDEX))
+        for arm, i in GRIPPER_INDEX.items():
+            velocity, trigger = commands.get(arm, (0.0, None))
+            self._gripper_velocity[i] = velocity
+            self._gripper_position[i] = np.nan if trigger is None else trigger
+            measured[i] = self.obs_cache.get(arm)["gripper.pos"]
+        self.gripper.step(dt, self._gripper_velocity, self._gripper_position, measured)
+
+    def log_robot(self, action: dict | None = None):
+        """Queue the robot for rerun, reusing this tick's bus read and camera frames."""
+        arm_obs = {
+            **{f"left_{key}": value for key, value in self.obs_cache.get("left_arm").items()},
+            **{f"right_{key}": value for key, value in self.obs_cache.get("right_arm").items()},
+        }
+        self.rerun_logger.log(observation={**arm_obs, **self.rerun_images()}, action=action)
+
+    def send_targets(self, left_joint_action: dict, right_joint_action: dict) -> bool:
+        """Hand both arms' targets to the streamers unless they would collide (then the arms hold)."""
+        # The streamers interpolate from their current commands, so the whole path is checked
+        if self.collision_checker is not None and self.collision_checker.check(
+            left_joint_action,
+            right_joint_action,
+            self.streamers["left_arm"].command(),
+            self.streamers["right_arm"].command(),
+        ):
+            self.collisions_avoided += 1
+            if not self._holding:
+                self._holding = True
+                (arm1, link1), (arm2, link2) = self.collision_checker.last_pair
+                print(f"⚠️ Collision predicted between {arm1} {link1} and {arm2} {link2}, holding")
+            return False
+        self._holding = False
+        self.streamers["right_arm"].set_target(right_joint_action)
+        self.streamers["left_arm"].set_target(left_joint_action)
+
+        if not self._sent_first_command:
+            self._sent_first_command = True
+            profiler.mark("first command")
+            print(f"⏱️ Time to first command: {profiler.report()['marks']['first command']:.2f} s")
+        return True
+
+    def control_step(self, dt: float):
+        """Read the arms, run the VR -> joint pipelines and publish the new targets."""
+        # Read both arms once; every consumer in this tick goes through the cache
+        self.obs_cache.begin_tick()
+        # robot_obs = {'shoulder_pan.pos': 1.3186813186813187, 'shoulder_lift.pos': -20.703296703296704, 'elbow_flex.pos': 8.131868131868131, 'wrist_flex.pos': 60.35164835164835, 'wrist_roll.pos': 8.483516483516484, 'gripper.pos': 1.2303485987696514}
+
+        # Another controller, or a resume from a reloaded page: the old references and
+        # predictor samples (on the old client clock) must not carry over
+        if self.teleop_device.controller_changes != self._controller_changes:
+            self._controller_changes = self.teleop_device.controller_changes
+            self.reset_pipelines()
+
+        processors = self.processors
+
+        # Get teleop action
+        vr_obs = self.teleop_device.last_observation
+
+        if vr_obs is None:
+            # print("No VR observation received yet.")
+            self.log_robot()
+        elif vr_obs.get('reset') and not processors["has_initial_position"]:
+            self.reset_robot_to_initial_position()
         else:
-            print("Right controller not enabled.")
-
-        right_joint_action = processors["right_arm"]((right_controller_obs, right_arm_obs))
-        _ = duo_robot.right_arm.send_action(right_joint_action)
-
-
-        left_controller_obs = copy.deepcopy(vr_obs["left"])
-        # print(f"VR Observation: {left_controller_obs}")
+            print("VR Observation: ", vr_obs)
+            self.step_grippers(dt, {
+                arm: (hand.get("joystickY", 0.0), hand.get("trigger") if GRIPPER_MODE == "trigger" else None)
+                for arm, hand in (("left_arm", vr_obs.get("left") or {}), ("right_arm", vr_obs.get("right") or {}))
+            })
+
+            right_controller_obs = copy.deepcopy(vr_obs["right"])
+            # print(f"VR Observation: {right_controller_obs}")
+
+            if right_controller_obs["enabled"]:
+                processors["has_initial_position"] = False
+                print(f"Right Arm VR Position: {right_controller_obs['pos']}")
+            else:
+                print("Right controller not enabled.")
+
+            right_joint_action = processors["right_arm"]((right_controller_obs, None))
+
+
+            left_controller_obs = copy.deepcopy(vr_obs["left"])
+            # print(f"VR Observation: {left_controller_obs}")
+
+            if left_controller_obs["enabled"]:
+                processors["has_initial_position"] = False
+                print(f"Left Arm VR Position: {left_controller_obs['pos']}")
+            else:
+                print("Left controller not enabled.")
+
+            left_joint_action = processors["left_arm"]((left_controller_obs, None))
+
+            # Both targets are checked together, a colliding pair is dropped and the arms hold
+            self.send_targets(left_joint_action, right_joint_action)
+
+    def print_device_stats(self):
+        stats = self.teleop_device.get_receive_stats()
+        print(f"📊 VR packets: {stats['rate_hz']:.1f} Hz, duplicates: {stats['duplicate_ratio']:.0%}")
+        validation = stats["validation"]
+        rejected = {reason: count for reason, count in validation["rejected"].items() if count}
+        if rejected or validation["clipped"]:
+            print(
+                f"📊 VR packets rejected: {rejected or 'none'}, "
+                f"{validation['clipped']} clipped, {validation['normalized']} renormalized"
+            )
+        session = self.teleop_device.get_session_stats()
+        print(
+            f"📊 VR clients: {session['clients']} (controller: {session['controller_id']}), "
+            f"takeovers: {session['takeovers']}, state pushes skipped: {session['state_skipped']}"
+        )
+        if session["resumes"]:
+            print(f"📊 VR session resumes: {session['resumes']}, last gap {session['last_resume_gap_ms']:.0f} ms")
+        if self.camera_server is not None and self.camera_server.connect_times_ms:
+            print(
+                f"📊 Camera connects: last {self.camera_server.connect_times_ms[-1]:.0f} ms after the offer, "
+                f"{self.camera_server.reconnects} reconnects"
+            )
+
+    def print_stats(self):
+        self.print_device_stats()
+        if self.collision_checker is not None:
+            print(
+                f"📊 Collisions avoided: {self.collisions_avoided}, "
+                f"last clearance {self.collision_checker.last_min_distance * 1000:.0f} mm"
+            )
+        for arm, streamer in self.streamers.items():
+            print(
+                f"📊 {arm} streamer: {streamer.commands_sent} commands, {streamer.overruns} overruns, "
+                f"{streamer.send_errors} send errors"
+            )
+        cache_stats = self.obs_cache.stats()
+        print(
+            f"📊 Observation cache: {cache_stats['hit_ratio']:.0%} hits, "
+            f"{cache_stats['bus_reads_per_tick']:.2f} bus reads/tick"
+        )
+        frame_stats = self.frame_cache.stats()
+        print(
+            f"📊 Frame products: {frame_stats['computations_per_frame']:.2f} conversions/frame, "
+            f"{frame_stats['hit_ratio']:.0%} shared"
+        )
+        rerun_stats = self.rerun_logger.stats()
+        print(
+            f"📊 Rerun: {rerun_stats['logged']} logged, {rerun_stats['dropped']} dropped, "
+            f"{rerun_stats['mean_log_ms']:.1f} ms per log"
+        )
+
+    def metrics(self) -> dict:
+        """The numbers of `print_stats` as one JSON-able dict, for the station metrics file."""
+        metrics = {
+            "observation_cache": self.obs_cache.stats(),
+            "frame_products": self.frame_cache.stats(),
+            "rerun": self.rerun_logger.stats(),
+            "collisions_avoided": self.collisions_avoided,
+            "streamers": {
+                arm: {
+                    "running": streamer.is_running,
+                    "commands_sent": streamer.commands_sent,
+                    "overruns": streamer.overruns,
+                    "send_errors": streamer.send_errors,
+                }
+                for arm, streamer in self.streamers.items()
+            },
+        }
+        if self.teleop_device is not None:
+            metrics["vr_packets"] = self.teleop_device.get_receive_stats()
+            metrics["vr_session"] = self.teleop_device.get_session_stats()
+        return metrics
+
+
+def write_metrics(runtime: TeleopRuntime, teleop: VRDuoTeleop, path: str):
+    """Replace the metrics file of this station with the current runtime and teleop stats."""
+    snapshot = {
+        "station": station_name,
+        "mode": teleop_mode,
+        "pid": os.getpid(),
+        "time": time.time(),
+        "usage": runtime.last_usage,
+        "periodic": runtime.periodic_stats(),
+        "teleop": teleop.metrics(),
+    }
+    if runtime.thread_policy is not None:
+        snapshot["thread_policy"] = runtime.thread_policy.stats()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, default=float)
+    os.replace(tmp_path, path)
+
+
+def main(mode: str | None = None, teleop: VRDuoTeleop | None = None):
+    """
+    Run the teleop in mode ("vr" or "phone", default teleop_mode) until interrupted.
+
+    The entry point of every mode (phone_teleop.py and launch_stations.py run it too).
+    A script passes its own teleop, so its module is not imported a second time.
+    """
+    mode = mode or teleop_mode
+    if mode not in ("vr", "phone"):
+        raise ValueError(f"Unknown teleop mode {mode!r}, expected 'vr' or 'phone'")
+    if teleop is None and mode == "vr":
+        from server import VRHeadset
+
+        teleop = VRDuoTeleop(VRHeadset(use_ssl=use_https, cert_file=cert_file, key_file=key_file, port=VR_PORT))
+    elif teleop is None:
+        from phone_teleop import PhoneDuoTeleop
+
+        teleop = PhoneDuoTeleop(phone_arms)
+
+    # Both servers share the runtime event loop; bus, IK and camera work run on its thread pool.
+    # Services start concurrently so imports, solver construction and connections overlap.
+    thread_policy = None
+    if THREAD_POLICY is not None:
+        from base.thread_policy import ThreadPolicy
+
+        thread_policy = ThreadPolicy.from_dict(THREAD_POLICY)
+    runtime = TeleopRuntime(
+        workers=RUNTIME_WORKERS,
+        stats_interval_s=STATS_INTERVAL_S,
+        profiler=profiler,
+        thread_policy=thread_policy,
+        encode_workers=len(CAMERA_INDICES),
+    )
 
-        if left_controller_obs["enabled"]:
-            processors["has_initial_position"] = False
-            print(f"Left Arm VR Position: {left_controller_obs['pos']}")
+    async def start_robot():
+        await runtime.run_blocking(teleop.connect)
+
+    async def stop_robot():
+        await runtime.run_blocking(teleop.disconnect)
+
+    async def start_kinematics():
+        await runtime.run_blocking(teleop.build_processors)
+
+    async def start_rerun():
+        def init():
+            from lerobot.utils.visualization_utils import init_rerun
+
+            # Init rerun viewer
+            init_rerun(session_name=f"{mode}_lerobot_duo_teleop")
+            teleop.rerun_logger.start()
+
+        await runtime.run_blocking(init)
+
+    async def stop_rerun():
+        teleop.rerun_logger.stop()
+
+    async def start_camera_server():
+        def create():
+            # aiortc / av are only imported here, off the event loop
+            from server import RoiConfig, create_camera_server
+
+            return create_camera_server(
+                CAMERA_INDICES.keys(),
+                use_https=use_https,
+                cert_file=cert_file,
+                key_file=key_file,
+                roi={name: RoiConfig(**options) for name, options in ROI_CAMERAS.items() if options is not None},
+                dev_mode=web_ui_dev_mode,
+                ice_servers=ice_servers,
+                port=CAMERA_PORT,
+                vr_port=VR_PORT,
+            )
+
+        teleop.camera_server = await runtime.run_blocking(create)
+        await teleop.camera_server.start_server()
+        if use_https:
+            print(f"🔒 HTTPS WebRTC camera server started on https://0.0.0.0:{CAMERA_PORT}")
+            print(f"📱 Access from Quest 3: https://YOUR_IP:{CAMERA_PORT}")
         else:
-            print("Left controller not enabled.")
+            print(f"🎥 HTTP WebRTC camera server started on http://0.0.0.0:{CAMERA_PORT}")
 
-        left_joint_action = processors["left_arm"]((left_controller_obs, left_arm_obs))
-        _ = duo_robot.left_arm.send_action(left_joint_action)
+    async def stop_camera_server():
+        await teleop.camera_server.stop_server()
 
-        # # Add prefixes back
-        # prefixed_send_action_left = {f"left_{key}": value for key, value in left_joint_action.items()}
-        # prefixed_send_action_right = {f"right_{key}": value for key, value in right_joint_action.items()}
+    async def start_phones():
+        await runtime.run_blocking(teleop.connect_phones)
 
-        # joint_action = {**prefixed_send_action_left, **prefixed_send_action_right}
-    
-        # _ = duo_robot.send_action(joint_action)
+    async def stop_phones():
+        await runtime.run_blocking(teleop.disconnect_phones)
 
-    # busy_wait(max(1.0 / FPS - (time.perf_counter() - t0), 0.0))
+    runtime.add_service("robot", start_robot, stop_robot)
+    runtime.add_service("kinematics", start_kinematics)
+    runtime.add_service("rerun", start_rerun, stop_rerun)
+    if mode == "vr":
+        runtime.add_service("VR websocket server", teleop.teleop_device.start, teleop.teleop_device.stop)
+        runtime.add_service("WebRTC camera server", start_camera_server, stop_camera_server)
+    else:
+        # The phones show no video, the cameras are only logged to rerun
+        runtime.add_service("phones", start_phones, stop_phones)
+    runtime.add_periodic("camera", teleop.camera_tick, hz=FPS, role="camera")
+    runtime.add_periodic("control", teleop.control_tick, hz=FPS, role="control")
+    runtime.add_report_callback(teleop.print_stats)
+    if metrics_path is not None:
+        runtime.add_report_callback(lambda: write_metrics(runtime, teleop, metrics_path))
+
+    if mode == "vr":
+        print("Starting teleop loop. Move your VR controllers to teleoperate the robot...")
+    else:
+        print("Starting teleop loop. Move your phone to teleoperate the robot...")
+    runtime.run()
 
-    ## TODO remove - for testing only
-    teleoperation_fps = 30
-    busy_wait(max(1.0 / teleoperation_fps - (time.perf_counter() - t0), 0.0))
 
+if __name__ == "__main__":
+    # Run the importable module rather than this __main__ copy: the phone mode imports
+    # phone_teleop, which imports vr_teleop, and both must share one copy of the settings
+    import vr_teleop
 
+    vr_teleop.main()
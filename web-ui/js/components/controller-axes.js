@@ -28,6 +28,9 @@ AFRAME.registerComponent('controller-axes', {
     
     // Joystick Y value (thumbstick forward/backward)
     this.joystickY = 0;
+
+    // Analog trigger value (0 released .. 1 pulled), the absolute gripper command
+    this.trigger = 0;
     
     // Current delta values for WebSocket transmission
     this.currentDelta = {
@@ -39,6 +42,7 @@ AFRAME.registerComponent('controller-axes', {
     this.onGripDown = this.onGripDown.bind(this);
     this.onGripUp = this.onGripUp.bind(this);
     this.onThumbstickMoved = this.onThumbstickMoved.bind(this);
+    this.onTriggerChanged = this.onTriggerChanged.bind(this);
     
     // Listen for grip/squeeze button events
     this.el.addEventListener('gripdown', this.onGripDown);
@@ -49,6 +53,7 @@ AFRAME.registerComponent('controller-axes', {
     // Listen for thumbstick/joystick events
     this.el.addEventListener('thumbstickmoved', this.onThumbstickMoved);
     this.el.addEventListener('axismove', this.onThumbstickMoved);
+    this.el.addEventListener('triggerchanged', this.onTriggerChanged);
     
     this.createAxes();
     this.tick = AFRAME.utils.throttleTick(this.tick, 16, this); // ~60fps for smooth rotation
@@ -65,6 +70,12 @@ AFRAME.registerComponent('controller-axes', {
     }
   },
 
+  onTriggerChanged: function(evt) {
+    if (evt.detail && typeof evt.detail.value === 'number') {
+      this.trigger = evt.detail.value;
+    }
+  },
+
   onGripDown: function() {
     if (!this.el.object3D) return;
     
@@ -266,10 +277,11 @@ AFRAME.registerComponent('controller-axes', {
         pos,
         rot,
         this.joystickY,
-        enabled
+        enabled,
+        this.trigger
       );
       
-      // Send data (the manager will batch both controllers' data as FramePacket)
+      // Request a send (the manager coalesces both controllers into one FramePacket per frame)
       window.webSocketManager.sendControllerData();
     }
   },
@@ -282,6 +294,7 @@ AFRAME.registerComponent('controller-axes', {
     this.el.removeEventListener('squeezeend', this.onGripUp);
     this.el.removeEventListener('thumbstickmoved', this.onThumbstickMoved);
     this.el.removeEventListener('axismove', this.onThumbstickMoved);
+    this.el.removeEventListener('triggerchanged', this.onTriggerChanged);
     
     if (this.axesContainer && this.axesContainer.parentNode) {
       this.axesContainer.parentNode.removeChild(this.axesContainer);
@@ -14,7 +14,10 @@ AFRAME.registerComponent('video-panel', {
     maxHeight: { type: 'number', default: 1.8 },   // Max panel height
     smoothing: { type: 'number', default: 0.08 },  // Look-at smoothing
     padding: { type: 'number', default: 0.02 },    // Padding between streams
-    mainCameraName: { type: 'string', default: 'main' }  // Name of the main camera
+    mainCameraName: { type: 'string', default: 'main' },  // Name of the main camera
+    gazeRateHz: { type: 'number', default: 5 },     // Gaze reports for ROI encoding
+    gazeThreshold: { type: 'number', default: 0.03 }, // Min normalized gaze move to report
+    gazeHeartbeatMs: { type: 'number', default: 500 }  // Re-report a still gaze, the server recenters after 1 s
   },
 
   init: async function() {
@@ -22,6 +25,19 @@ AFRAME.registerComponent('video-panel', {
     this.videoStreams = [];
     this.streamDimensions = {};  // Store video dimensions as they load
     this.streamsReady = 0;
+
+    // Gaze tracking for region-of-interest encoding
+    this.gazeRaycaster = new THREE.Raycaster();
+    this.gazeOrigin = new THREE.Vector3();
+    this.gazeDirection = new THREE.Vector3();
+    this.lastGazeAt = 0;
+    this.lastGazeReportAt = 0;
+    this.gazeTarget = null;       // { cameraName, x, y } last reported
+    this.gazeIgnored = new Set(); // Cameras whose ROI does not follow the gaze
+
+    // A camera that reconnected delivers a new stream, the rendered asset video must follow it
+    this.onCameraStream = this.onCameraStream.bind(this);
+    window.addEventListener('camera-stream', this.onCameraStream);
     
     // Wait for scene to be fully loaded
     if (this.el.sceneEl.hasLoaded) {
@@ -80,6 +96,69 @@ AFRAME.registerComponent('video-panel', {
     });
   },
 
+  /**
+   * Report which camera image the headset looks at, and where, a few times per second
+   */
+  tick: function(time) {
+    if (time - this.lastGazeAt < 1000 / this.data.gazeRateHz) return;
+    this.lastGazeAt = time;
+
+    const planes = this.videoStreams
+      .filter(stream => stream.planeEl && !this.gazeIgnored.has(stream.cameraName))
+      .map(stream => stream.planeEl.object3D);
+    if (planes.length === 0) return;
+
+    const camera = this.el.sceneEl.camera;
+    if (!camera) return;
+    camera.getWorldPosition(this.gazeOrigin);
+    camera.getWorldDirection(this.gazeDirection);
+    this.gazeRaycaster.set(this.gazeOrigin, this.gazeDirection);
+
+    const hit = this.gazeRaycaster.intersectObjects(planes, true)[0];
+    const stream = hit && this.videoStreams.find(s => s.planeEl && s.planeEl.object3D.getObjectById(hit.object.id));
+    const previous = this.gazeTarget;
+
+    if (!stream || !hit.uv) {
+      // Looking away: let the previous camera recenter its ROI
+      if (previous) {
+        WebRTCManager.reportGaze(previous.cameraName, null, null);
+        this.gazeTarget = null;
+      }
+      return;
+    }
+
+    // Texture v grows upwards, image rows grow downwards
+    const gaze = { cameraName: stream.cameraName, x: hit.uv.x, y: 1 - hit.uv.y };
+    if (previous && previous.cameraName === gaze.cameraName &&
+        Math.hypot(gaze.x - previous.x, gaze.y - previous.y) < this.data.gazeThreshold &&
+        time - this.lastGazeReportAt < this.data.gazeHeartbeatMs) {
+      return;
+    }
+    if (previous && previous.cameraName !== gaze.cameraName) {
+      WebRTCManager.reportGaze(previous.cameraName, null, null);
+    }
+    this.gazeTarget = gaze;
+    this.lastGazeReportAt = time;
+    WebRTCManager.reportGaze(gaze.cameraName, gaze.x, gaze.y).then(followsGaze => {
+      if (!followsGaze) this.gazeIgnored.add(gaze.cameraName);
+    });
+  },
+
+  onCameraStream: function(event) {
+    const { cameraName, stream } = event.detail;
+    const streamData = this.videoStreams.find(s => s.cameraName === cameraName);
+    if (!streamData) return;
+    const assetVideo = document.getElementById(`asset-video-stream-${streamData.index}`);
+    if (assetVideo && assetVideo.srcObject !== stream) {
+      assetVideo.srcObject = stream;
+      assetVideo.play().catch(e => console.log('Asset video play error:', e));
+    }
+  },
+
+  remove: function() {
+    window.removeEventListener('camera-stream', this.onCameraStream);
+  },
+
   createPlaceholderPanel: function() {
     const { radius, height, maxWidth, maxHeight, smoothing } = this.data;
 
@@ -409,6 +488,8 @@ AFRAME.registerComponent('video-panel', {
     });
     this.videoStreams = [];
     this.streamsReady = 0;
+    this.gazeTarget = null;
+    this.gazeIgnored.clear();
 
     while (this.el.firstChild) {
       this.el.removeChild(this.el.firstChild);
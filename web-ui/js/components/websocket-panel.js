@@ -5,7 +5,7 @@
 AFRAME.registerComponent('websocket-panel', {
   schema: {
     width: { type: 'number', default: 0.5 },
-    height: { type: 'number', default: 0.5 },
+    height: { type: 'number', default: 0.62 },
     position: { type: 'vec3', default: { x: -1.5, y: 1.2, z: -1.5 } }
   },
 
@@ -16,6 +16,7 @@ AFRAME.registerComponent('websocket-panel', {
     // Bind methods
     this.onConnectButtonAction = this.onConnectButtonAction.bind(this);
     this.onResetButtonAction = this.onResetButtonAction.bind(this);
+    this.onControlButtonAction = this.onControlButtonAction.bind(this);
     this.onPassthroughButtonAction = this.onPassthroughButtonAction.bind(this);
     
     this.createPanel();
@@ -44,7 +45,7 @@ AFRAME.registerComponent('websocket-panel', {
     const title = document.createElement('a-text');
     title.setAttribute('value', 'WebSocket');
     title.setAttribute('align', 'center');
-    title.setAttribute('position', `0 ${height * 0.32} 0.015`);
+    title.setAttribute('position', `0 ${height * 0.40} 0.015`);
     title.setAttribute('width', width * 1.5);
     title.setAttribute('color', '#ffffff');
     this.panel.appendChild(title);
@@ -52,7 +53,7 @@ AFRAME.registerComponent('websocket-panel', {
     // Status indicator (circle)
     this.statusIndicator = document.createElement('a-circle');
     this.statusIndicator.setAttribute('radius', '0.02');
-    this.statusIndicator.setAttribute('position', `${-width * 0.3} ${height * 0.18} 0.015`);
+    this.statusIndicator.setAttribute('position', `${-width * 0.3} ${height * 0.28} 0.015`);
     this.statusIndicator.setAttribute('color', '#ff4444'); // Red = disconnected
     this.panel.appendChild(this.statusIndicator);
     
@@ -60,7 +61,7 @@ AFRAME.registerComponent('websocket-panel', {
     this.statusText = document.createElement('a-text');
     this.statusText.setAttribute('value', 'Disconnected');
     this.statusText.setAttribute('align', 'left');
-    this.statusText.setAttribute('position', `${-width * 0.2} ${height * 0.18} 0.015`);
+    this.statusText.setAttribute('position', `${-width * 0.2} ${height * 0.28} 0.015`);
     this.statusText.setAttribute('width', width * 1.2);
     this.statusText.setAttribute('color', '#cccccc');
     this.panel.appendChild(this.statusText);
@@ -69,32 +70,47 @@ AFRAME.registerComponent('websocket-panel', {
     this.connectButton = document.createElement('a-entity');
     this.connectButton.setAttribute('vr-button', {
       width: width * 0.7,
-      height: height * 0.14,
+      height: height * 0.12,
       color: '#4CAF50',
       hoverColor: '#66BB6A',
       pressedColor: '#2E7D32',
       text: 'Connect',
       textWidth: width * 1.5
     });
-    this.connectButton.setAttribute('position', `0 ${height * 0.02} 0.015`);
+    this.connectButton.setAttribute('position', `0 ${height * 0.13} 0.015`);
     
     // Listen for button action event
     this.connectButton.addEventListener('button-action', this.onConnectButtonAction);
     
     this.panel.appendChild(this.connectButton);
+
+    // Take / release control of the robot (other clients observe)
+    this.controlButton = document.createElement('a-entity');
+    this.controlButton.setAttribute('vr-button', {
+      width: width * 0.7,
+      height: height * 0.12,
+      color: '#3F51B5',
+      hoverColor: '#5C6BC0',
+      pressedColor: '#283593',
+      text: 'Take control',
+      textWidth: width * 1.5
+    });
+    this.controlButton.setAttribute('position', `0 ${-height * 0.03} 0.015`);
+    this.controlButton.addEventListener('button-action', this.onControlButtonAction);
+    this.panel.appendChild(this.controlButton);
     
     // Reset button using vr-button component
     this.resetButton = document.createElement('a-entity');
     this.resetButton.setAttribute('vr-button', {
       width: width * 0.7,
-      height: height * 0.14,
+      height: height * 0.12,
       color: '#FF9800',
       hoverColor: '#FFB74D',
       pressedColor: '#E65100',
       text: 'Reset',
       textWidth: width * 1.5
     });
-    this.resetButton.setAttribute('position', `0 ${-height * 0.16} 0.015`);
+    this.resetButton.setAttribute('position', `0 ${-height * 0.19} 0.015`);
     
     // Listen for reset button action event
     this.resetButton.addEventListener('button-action', this.onResetButtonAction);
@@ -105,14 +121,14 @@ AFRAME.registerComponent('websocket-panel', {
     this.passthroughButton = document.createElement('a-entity');
     this.passthroughButton.setAttribute('vr-button', {
       width: width * 0.7,
-      height: height * 0.14,
+      height: height * 0.12,
       color: '#607D8B',
       hoverColor: '#78909C',
       pressedColor: '#455A64',
       text: 'Passthrough: OFF',
       textWidth: width * 1.5
     });
-    this.passthroughButton.setAttribute('position', `0 ${-height * 0.34} 0.015`);
+    this.passthroughButton.setAttribute('position', `0 ${-height * 0.35} 0.015`);
     
     // Listen for passthrough button action event
     this.passthroughButton.addEventListener('button-action', this.onPassthroughButtonAction);
@@ -156,6 +172,17 @@ AFRAME.registerComponent('websocket-panel', {
     // Update will happen in tick
   },
 
+  onControlButtonAction: function(event) {
+    const manager = window.webSocketManager;
+    if (!manager || !manager.isConnected) return;
+
+    if (manager.role === 'controller') {
+      manager.releaseControl();
+    } else {
+      manager.takeControl();
+    }
+  },
+
   onResetButtonAction: async function(event) {
     // Prevent multiple reset triggers
     if (this.isResetting) {
@@ -220,8 +247,22 @@ AFRAME.registerComponent('websocket-panel', {
     // Update status indicator
     this.statusIndicator.setAttribute('color', isConnected ? '#44ff44' : '#ff4444');
     
-    // Update status text
-    this.statusText.setAttribute('value', isConnected ? 'Connected' : 'Disconnected');
+    // Update status text with the session role and the pushed robot state
+    const manager = window.webSocketManager;
+    let status = 'Disconnected';
+    if (isConnected) {
+      status = manager.role === 'controller' ? 'Controlling' : 'Observing';
+      if (manager.robotState) {
+        status += ` ${manager.robotState.tick_ms.toFixed(1)} ms`;
+      }
+    }
+    this.statusText.setAttribute('value', status);
+
+    const controlButtonComponent = this.controlButton.components['vr-button'];
+    if (controlButtonComponent) {
+      controlButtonComponent.setDisabled(!isConnected);
+      controlButtonComponent.setText(manager.role === 'controller' ? 'Release control' : 'Take control');
+    }
     
     // Update connect button via vr-button component
     const buttonComponent = this.connectButton.components['vr-button'];
@@ -245,6 +286,7 @@ AFRAME.registerComponent('websocket-panel', {
   remove: function() {
     this.connectButton.removeEventListener('button-action', this.onConnectButtonAction);
     this.resetButton.removeEventListener('button-action', this.onResetButtonAction);
+    this.controlButton.removeEventListener('button-action', this.onControlButtonAction);
     this.passthroughButton.removeEventListener('button-action', this.onPassthroughButtonAction);
     
     if (this.panel && this.panel.parentNode) {
@@ -5,6 +5,15 @@
 const WebRTCManager = {
   serverUrl: window.location.origin,
   connections: {},
+  // Identifies this page's connections, so the server drops the stale one when a camera reconnects
+  sessionId: sessionStorage.getItem('webrtcSessionId') || (() => {
+    const id = Math.random().toString(36).slice(2) + Date.now().toString(36);
+    sessionStorage.setItem('webrtcSessionId', id);
+    return id;
+  })(),
+  reconnectGraceMs: 500,   // A 'disconnected' ICE state that lasts longer triggers a reconnect
+  reconnectTimers: {},
+  reconnectStats: [],      // { cameraName, connectedMs, firstFrameMs }
 
   /**
    * Fetch the list of available cameras from the server
@@ -26,7 +35,7 @@ const WebRTCManager = {
    * @param {HTMLVideoElement} videoElement - The video element to stream to
    * @returns {Promise<boolean>} True if connection was successful
    */
-  async connectToCamera(cameraName, videoElement) {
+  async connectToCamera(cameraName, videoElement, reconnectStartedAt = null) {
     try {
       const pc = new RTCPeerConnection({
         iceServers: [{ urls: 'stun:stun.l.google.com:19302' }]
@@ -36,10 +45,33 @@ const WebRTCManager = {
         console.log(`Received track for camera: ${cameraName}`);
         videoElement.srcObject = event.streams[0];
         videoElement.play().catch(e => console.log('Autoplay prevented:', e));
+        // Panels rendering this camera through another element follow the new stream
+        window.dispatchEvent(new CustomEvent('camera-stream', {
+          detail: { cameraName, stream: event.streams[0] }
+        }));
+        if (reconnectStartedAt !== null) {
+          this.measureFirstFrame(cameraName, videoElement, reconnectStartedAt);
+        }
       };
 
       pc.oniceconnectionstatechange = () => {
-        console.log(`ICE state for ${cameraName}: ${pc.iceConnectionState}`);
+        const state = pc.iceConnectionState;
+        console.log(`ICE state for ${cameraName}: ${state}`);
+        if (this.connections[cameraName] !== pc) return;
+
+        if (state === 'connected' || state === 'completed') {
+          clearTimeout(this.reconnectTimers[cameraName]);
+        } else if (state === 'failed') {
+          this.reconnect(cameraName, videoElement);
+        } else if (state === 'disconnected') {
+          // Often recovers by itself after a short WiFi blip, give it a moment
+          clearTimeout(this.reconnectTimers[cameraName]);
+          this.reconnectTimers[cameraName] = setTimeout(() => {
+            if (this.connections[cameraName] === pc && pc.iceConnectionState === 'disconnected') {
+              this.reconnect(cameraName, videoElement);
+            }
+          }, this.reconnectGraceMs);
+        }
       };
 
       // Create offer
@@ -54,7 +86,8 @@ const WebRTCManager = {
         body: JSON.stringify({
           sdp: offer.sdp,
           type: offer.type,
-          camera: cameraName
+          camera: cameraName,
+          session: this.sessionId
         })
       });
 
@@ -70,11 +103,71 @@ const WebRTCManager = {
     }
   },
 
+  /**
+   * Replace a dropped connection with a new one to the same camera.
+   * The server (aiortc) has no ICE restart, so this is a fresh offer; the server closes
+   * the stale connection of this session right away and keeps its camera pipeline running.
+   * @param {string} cameraName - The camera to reconnect
+   * @param {HTMLVideoElement} videoElement - The video element to stream to
+   */
+  async reconnect(cameraName, videoElement) {
+    const startedAt = performance.now();
+    console.log(`🔄 Reconnecting camera ${cameraName}...`);
+    const stale = this.connections[cameraName];
+    delete this.connections[cameraName];
+    if (stale) stale.close();
+
+    const connected = await this.connectToCamera(cameraName, videoElement, startedAt);
+    if (!connected) {
+      // Server unreachable for now, retry until the link is back
+      this.reconnectTimers[cameraName] = setTimeout(() => this.reconnect(cameraName, videoElement), 1000);
+    }
+  },
+
+  /**
+   * Record the time from the start of a reconnect to the first decoded frame
+   */
+  measureFirstFrame(cameraName, videoElement, startedAt) {
+    const done = () => {
+      const entry = { cameraName, firstFrameMs: Math.round(performance.now() - startedAt) };
+      this.reconnectStats = [...this.reconnectStats.slice(-49), entry];
+      console.log(`⏱️ Camera ${cameraName} back in ${entry.firstFrameMs} ms`);
+    };
+    if (videoElement.requestVideoFrameCallback) {
+      videoElement.requestVideoFrameCallback(done);
+    } else {
+      videoElement.addEventListener('loadeddata', done, { once: true });
+    }
+  },
+
+  /**
+   * Report where the viewer looks in a camera image, for region-of-interest encoding
+   * @param {string} cameraName - The camera being looked at
+   * @param {number|null} x - Normalized horizontal position (0 = left), null to recenter
+   * @param {number|null} y - Normalized vertical position (0 = top), null to recenter
+   * @returns {Promise<boolean>} True if the server moves this camera's ROI with the gaze
+   */
+  async reportGaze(cameraName, x, y) {
+    try {
+      const response = await fetch(`${this.serverUrl}/roi`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ camera: cameraName, x, y })
+      });
+      const result = await response.json();
+      return Boolean(result.follow_gaze);
+    } catch (error) {
+      console.error(`Failed to report gaze for ${cameraName}:`, error);
+      return false;
+    }
+  },
+
   /**
    * Disconnect from a camera stream
    * @param {string} cameraName - The name of the camera to disconnect from
    */
   disconnect(cameraName) {
+    clearTimeout(this.reconnectTimers[cameraName]);
     if (this.connections[cameraName]) {
       this.connections[cameraName].close();
       delete this.connections[cameraName];
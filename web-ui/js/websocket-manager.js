@@ -7,13 +7,21 @@ class WebSocketManager {
     this.socket = null;
     this.isConnected = false;
     this.isToggling = false; // Prevent multiple toggle operations
-    // Build WebSocket URL from current origin with port 8080
+    // Build WebSocket URL from current origin with the port the camera server put in the page
+    // (one per station when several run on a host), 8080 by default
     // Use wss:// for HTTPS pages, ws:// for HTTP pages
     const origin = new URL(window.location.origin);
     const wsProtocol = origin.protocol === 'https:' ? 'wss:' : 'ws:';
-    this.serverUrl = `${wsProtocol}//${origin.hostname}:8080`;
+    const portMeta = document.querySelector('meta[name="vr-ws-port"]');
+    const wsPort = (portMeta && portMeta.content) || '8080';
+    this.serverUrl = `${wsProtocol}//${origin.hostname}:${wsPort}`;
     this.reconnectAttempts = 0;
-    this.maxReconnectAttempts = 3;
+    this.maxReconnectAttempts = 20;
+    this.reconnectDelaysMs = [0, 100, 250, 500, 1000]; // Then 1 s per attempt
+    this.reconnectTimer = null;
+    this.userDisconnected = false;
+    this.reconnectStartedAt = null; // performance.now() when the link dropped
+    this.reconnectOpenedAt = null;
     this.resetActive = false; // Flag to send reset=true with controller updates
     
     // Store controller data
@@ -21,6 +29,35 @@ class WebSocketManager {
       left: null,
       right: null
     };
+
+    // Send scheduler: both controllers call sendControllerData() from their
+    // own tick, so sends are coalesced into one packet per frame, capped at
+    // sendRateHz and suppressed while the poses stay within the thresholds.
+    this.sendRateHz = 30;        // Match the server control loop FPS
+    this.heartbeatMs = 250;      // Send both hands at least this often
+    this.posThreshold = 0.001;   // Meters
+    this.rotThreshold = 0.002;   // Radians
+    this.axisThreshold = 0.01;   // Joystick units
+    this.flushScheduled = false;
+    // Deadline of the next send slot, advanced by one period per send so the
+    // average rate is sendRateHz whatever the XR frame rate (72 / 90 / 120 Hz)
+    this.nextSendAt = 0;
+    this.lastKeyframeAt = 0;
+    this.lastSentData = { left: null, right: null };
+    this.lastSentReset = false;
+    this.seq = 0;
+    this.sendStats = { sent: 0, suppressed: 0 };
+
+    // Session: only the controller drives the robot, other clients observe.
+    // A client claims control by sending while nobody has it, or takes it over.
+    this.clientId = null;
+    this.role = null;            // 'controller' | 'observer'
+    this.controllerId = null;
+    this.wantsControl = true;    // Cleared by releaseControl(), set by takeControl()
+    this.robotState = null;      // Last {type: 'state'} pushed by the server
+    this.controlReserved = false; // A dropped controller may still resume
+    // Resumes the session after a drop or a page reload (same tab)
+    this.sessionToken = sessionStorage.getItem('vrSessionToken');
   }
 
   /**
@@ -28,6 +65,7 @@ class WebSocketManager {
    * @returns {Promise<boolean>} - True if connected successfully
    */
   connect() {
+    this.userDisconnected = false;
     return new Promise((resolve, reject) => {
       if (this.isConnected && this.socket) {
         console.log('🔌 WebSocket already connected');
@@ -44,6 +82,16 @@ class WebSocketManager {
           console.log('✅ WebSocket connected successfully');
           this.isConnected = true;
           this.reconnectAttempts = 0;
+          // Start every connection with a full packet
+          this.lastSentData = { left: null, right: null };
+          this.lastKeyframeAt = 0;
+          if (this.reconnectStartedAt !== null) {
+            this.reconnectOpenedAt = performance.now();
+          }
+          // Ask for our previous session back before sending any pose
+          if (this.sessionToken) {
+            this.socket.send(JSON.stringify({ type: 'resume', token: this.sessionToken }));
+          }
           resolve(true);
         };
 
@@ -51,6 +99,12 @@ class WebSocketManager {
           console.log(`🔌 WebSocket disconnected (code: ${event.code})`);
           this.isConnected = false;
           this.socket = null;
+          this.role = null;
+          this.controllerId = null;
+          this.robotState = null;
+          if (!this.userDisconnected) {
+            this.scheduleReconnect();
+          }
         };
 
         this.socket.onerror = (error) => {
@@ -59,10 +113,7 @@ class WebSocketManager {
           reject(error);
         };
 
-        this.socket.onmessage = (event) => {
-          // Handle incoming messages if needed
-          console.log('📥 Received message:', event.data);
-        };
+        this.socket.onmessage = (event) => this.handleMessage(event.data);
 
       } catch (error) {
         console.error('❌ Failed to create WebSocket:', error);
@@ -71,12 +122,132 @@ class WebSocketManager {
     });
   }
 
+  /**
+   * Handle a server message: session role changes and the robot state push
+   * @param {string} data - JSON message
+   */
+  handleMessage(data) {
+    let message;
+    try {
+      message = JSON.parse(data);
+    } catch (error) {
+      console.error('❌ Invalid message from server:', data);
+      return;
+    }
+
+    if (message.type === 'session') {
+      const previousRole = this.role;
+      this.clientId = message.client_id;
+      this.role = message.role;
+      this.controllerId = message.controller_id;
+      this.controlReserved = Boolean(message.reserved);
+      if (message.token && message.token !== this.sessionToken) {
+        this.sessionToken = message.token;
+        sessionStorage.setItem('vrSessionToken', message.token);
+      }
+      if (this.reconnectStartedAt !== null) {
+        this.reportReconnectTiming();
+      }
+      if (previousRole !== this.role) {
+        console.log(`🎮 Session role: ${this.role} (client ${this.clientId}, controller ${this.controllerId})`);
+        // Resend full poses once we (re)gain control
+        this.lastSentData = { left: null, right: null };
+        this.lastKeyframeAt = 0;
+      }
+      window.dispatchEvent(new CustomEvent('vr-session', { detail: message }));
+    } else if (message.type === 'state') {
+      this.robotState = message;
+      this.controllerId = message.controller_id;
+      window.dispatchEvent(new CustomEvent('robot-state', { detail: message }));
+    }
+  }
+
+  /**
+   * Whether pose packets from this client would drive the robot
+   * @returns {boolean}
+   */
+  get canControl() {
+    return this.wantsControl &&
+      (this.role === 'controller' || (this.controllerId === null && !this.controlReserved));
+  }
+
+  /**
+   * Reconnect after an unexpected close, quickly at first, then once per second
+   */
+  scheduleReconnect() {
+    if (this.reconnectStartedAt === null) {
+      this.reconnectStartedAt = performance.now();
+    }
+    if (this.reconnectAttempts >= this.maxReconnectAttempts) {
+      console.error(`❌ WebSocket reconnect gave up after ${this.reconnectAttempts} attempts`);
+      this.reconnectStartedAt = null;
+      return;
+    }
+    const delays = this.reconnectDelaysMs;
+    const delay = delays[Math.min(this.reconnectAttempts, delays.length - 1)];
+    this.reconnectAttempts++;
+    clearTimeout(this.reconnectTimer);
+    this.reconnectTimer = setTimeout(() => {
+      this.connect().catch(() => {
+        // onclose follows the error and schedules the next attempt
+      });
+    }, delay);
+  }
+
+  /**
+   * Log and report how long the link was down: until the socket reopened and until the
+   * session (and control, for the controller) was back
+   */
+  reportReconnectTiming() {
+    const now = performance.now();
+    const timing = {
+      type: 'reconnect_timing',
+      open_ms: Math.round((this.reconnectOpenedAt ?? now) - this.reconnectStartedAt),
+      resume_ms: Math.round(now - this.reconnectStartedAt),
+      attempts: this.reconnectAttempts,
+      role: this.role
+    };
+    this.reconnectStartedAt = null;
+    this.reconnectOpenedAt = null;
+    console.log(`⏱️ Reconnected in ${timing.resume_ms} ms (socket open after ${timing.open_ms} ms, ${timing.attempts} attempts) as ${timing.role}`);
+    this.sendSessionMessage('reconnect_timing', timing);
+  }
+
+  /**
+   * Take control of the robot from the current controller
+   */
+  takeControl() {
+    this.wantsControl = true;
+    this.sendSessionMessage('takeover');
+  }
+
+  /**
+   * Give up control and stay connected as an observer
+   */
+  releaseControl() {
+    this.wantsControl = false;
+    this.sendSessionMessage('release');
+  }
+
+  sendSessionMessage(type, fields = {}) {
+    if (this.isConnected && this.socket && this.socket.readyState === WebSocket.OPEN) {
+      this.socket.send(JSON.stringify({ ...fields, type }));
+    }
+  }
+
   /**
    * Disconnect from the WebSocket server
    */
   disconnect() {
+    this.userDisconnected = true;
+    clearTimeout(this.reconnectTimer);
+    this.reconnectStartedAt = null;
     if (this.socket) {
       console.log('🔌 Disconnecting WebSocket...');
+      // An explicit disconnect ends the session, nothing to resume
+      this.sendSessionMessage('release');
+      this.sessionToken = null;
+      sessionStorage.removeItem('vrSessionToken');
       this.socket.close();
       this.socket = null;
       this.isConnected = false;
@@ -123,36 +294,126 @@ class WebSocketManager {
    * @param {number[]} rot - [x, y, z, w] quaternion rotation array
    * @param {number} joystickY - Y-axis joystick value
    * @param {boolean} enabled - Whether the controller is enabled/grabbing
+   * @param {number} trigger - Analog trigger value (0 released .. 1 pulled)
    */
-  updateControllerData(hand, pos, rot, joystickY = 0, enabled = false) {
+  updateControllerData(hand, pos, rot, joystickY = 0, enabled = false, trigger = 0) {
+    // Quantize to keep packets small (0.1 mm, 1e-5 quaternion units)
     this.controllerData[hand] = {
-      pos: pos,
-      rot: rot,
-      joystickY: joystickY,
+      pos: pos.map(v => Math.round(v * 1e4) / 1e4),
+      rot: rot.map(v => Math.round(v * 1e5) / 1e5),
+      joystickY: Math.round(joystickY * 100) / 100,
+      trigger: Math.round(trigger * 100) / 100,
       enabled: enabled
     };
   }
 
   /**
-   * Send current controller data to the server (matches FramePacket structure)
+   * Request a send of the current controller data (matches FramePacket structure).
+   * Calls made during the same frame are coalesced into a single packet.
    */
   sendControllerData() {
+    if (this.flushScheduled) {
+      return;
+    }
+    this.flushScheduled = true;
+    // Runs after every component tick of the current frame
+    queueMicrotask(() => this.flushControllerData());
+  }
+
+  /**
+   * Send the coalesced packet if the rate limit allows and something changed.
+   * Only hands that moved are included; both hands are sent as a heartbeat.
+   */
+  flushControllerData() {
+    this.flushScheduled = false;
+
     if (!this.isConnected || !this.socket || this.socket.readyState !== WebSocket.OPEN) {
       return;
     }
+    // Observers' poses would be ignored by the server anyway
+    if (!this.canControl) {
+      return;
+    }
+
+    const now = performance.now();
+    if (now < this.nextSendAt) {
+      return;
+    }
+
+    const keyframe = now - this.lastKeyframeAt >= this.heartbeatMs;
 
-    // FramePacket structure: { left: PosePacket, right: PosePacket }
+    // FramePacket structure: { seq, t, reset, left?: PosePacket, right?: PosePacket }
     const payload = {
-      reset: this.resetActive,
-      left: this.controllerData.left,
-      right: this.controllerData.right
+      seq: this.seq,
+      t: Math.round(now),
+      reset: this.resetActive
     };
+    let changed = keyframe || this.resetActive !== this.lastSentReset;
+
+    for (const hand of ['left', 'right']) {
+      const data = this.controllerData[hand];
+      if (data && (keyframe || this.hasPoseChanged(data, this.lastSentData[hand]))) {
+        payload[hand] = data;
+        changed = true;
+      }
+    }
+
+    if (!changed) {
+      this.sendStats.suppressed++;
+      return;
+    }
 
     try {
       this.socket.send(JSON.stringify(payload));
     } catch (error) {
       console.error('❌ Failed to send controller data:', error);
+      return;
+    }
+
+    this.seq++;
+    this.sendStats.sent++;
+    const period = 1000 / this.sendRateHz;
+    this.nextSendAt += period;
+    if (this.nextSendAt <= now) {
+      // Fell behind (idle, suppressed or a stalled frame): re-anchor instead of bursting
+      this.nextSendAt = now + period;
     }
+    this.lastSentReset = this.resetActive;
+    if (keyframe) {
+      this.lastKeyframeAt = now;
+    }
+    for (const hand of ['left', 'right']) {
+      if (payload[hand]) {
+        this.lastSentData[hand] = payload[hand];
+      }
+    }
+  }
+
+  /**
+   * Check whether a pose moved beyond the send thresholds
+   * @param {Object} current - PosePacket about to be sent
+   * @param {Object|null} previous - Last PosePacket sent for the same hand
+   * @returns {boolean}
+   */
+  hasPoseChanged(current, previous) {
+    if (!previous) return true;
+    if (current.enabled !== previous.enabled) return true;
+    if (Math.abs(current.joystickY - previous.joystickY) > this.axisThreshold) return true;
+    if (Math.abs(current.trigger - previous.trigger) > this.axisThreshold) return true;
+
+    const dx = current.pos[0] - previous.pos[0];
+    const dy = current.pos[1] - previous.pos[1];
+    const dz = current.pos[2] - previous.pos[2];
+    if (dx * dx + dy * dy + dz * dz > this.posThreshold * this.posThreshold) return true;
+
+    // Angle between the two quaternions
+    const dot = Math.abs(
+      current.rot[0] * previous.rot[0] +
+      current.rot[1] * previous.rot[1] +
+      current.rot[2] * previous.rot[2] +
+      current.rot[3] * previous.rot[3]
+    );
+    return 2 * Math.acos(Math.min(dot, 1)) > this.rotThreshold;
   }
 
   /**